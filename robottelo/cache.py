@@ -0,0 +1,226 @@
+"""In-memory caches with least recently used eviction and expiration."""
+import hashlib
+import json
+import six
+import threading
+import time
+
+from collections import OrderedDict
+
+
+class LRUCache(object):
+    """A thread-safe mapping holding at most ``max_size`` items.
+
+    When full, the least recently used item is evicted to make room for a new
+    one. Items older than ``ttl`` seconds are expired and not returned.
+
+    The number of hits, misses, evictions and expirations is kept in the
+    attributes of the same name.
+
+    :param int max_size: The maximum number of items.
+    :param ttl: The number of seconds items are kept, or ``None`` to keep them
+        until they are evicted.
+
+    """
+    def __init__(self, max_size=128, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._items = OrderedDict()  # key => (value, time it was set)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key, default=None):
+        """Return the value of ``key`` or ``default`` if it is not cached."""
+        with self._lock:
+            try:
+                value, set_at = self._items.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            if self.ttl is not None and time.time() - set_at > self.ttl:
+                self.expirations += 1
+                self.misses += 1
+                return default
+            # Move the item to the end, as the most recently used
+            self._items[key] = (value, set_at)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, set_at=None):
+        """Cache ``value`` as the value of ``key``.
+
+        :param float set_at: The time the value was got, used to expire it.
+            Defaults to now.
+
+        """
+        with self._lock:
+            self._items.pop(key, None)
+            while self._items and len(self._items) >= self.max_size:
+                self._items.popitem(last=False)
+                self.evictions += 1
+            if self.max_size > 0:
+                self._items[key] = (
+                    value, time.time() if set_at is None else set_at)
+
+    def items(self):
+        """Return the items not expired, the least recently used first.
+
+        :return: A list of ``(key, value, set_at)`` tuples.
+
+        """
+        now = time.time()
+        with self._lock:
+            return [
+                (key, value, set_at)
+                for key, (value, set_at) in self._items.items()
+                if self.ttl is None or now - set_at <= self.ttl
+            ]
+
+    def invalidate(self, predicate=None):
+        """Remove the items whose key matches ``predicate``.
+
+        :param predicate: Called with each key, the item is removed if it
+            returns ``True``. If it is ``None`` all the items are removed.
+        :return: The number of items removed.
+
+        """
+        with self._lock:
+            if predicate is None:
+                keys = list(self._items)
+            else:
+                keys = [key for key in self._items if predicate(key)]
+            for key in keys:
+                del self._items[key]
+            return len(keys)
+
+
+def options_key(options):
+    """Return a hash of ``options`` not depending on their order.
+
+    Options whose value is ``None`` are ignored, as the factories do.
+
+    """
+    normalized = dict(
+        (name, value) for name, value in (options or {}).items()
+        if value is not None
+    )
+    return hashlib.sha1(json.dumps(
+        normalized, sort_keys=True, default=six.text_type
+    ).encode('utf-8')).hexdigest()
+
+
+class ObjectCache(object):
+    """Objects created by functions, keyed on the function name and the hash
+    of the options it was called with.
+
+    Concurrent calls for the same key wait for the first one to create the
+    object, so it is created once. The cache can be saved to and loaded from
+    a JSON file, so it can be reused by another process.
+
+    :param int max_size: The maximum number of objects.
+    :param ttl: The number of seconds objects are kept, or ``None`` to keep
+        them until they are evicted.
+
+    """
+    def __init__(self, max_size=256, ttl=None):
+        self._objects = LRUCache(max_size, ttl)
+        # key => [lock held while creating its object, number of callers
+        # using the lock], removed when the last caller is done
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._objects)
+
+    @property
+    def ttl(self):
+        """The number of seconds objects are kept."""
+        return self._objects.ttl
+
+    @ttl.setter
+    def ttl(self, ttl):
+        self._objects.ttl = ttl
+
+    @property
+    def stats(self):
+        """Hits, misses, evictions and expirations of the cache."""
+        return {
+            'hits': self._objects.hits,
+            'misses': self._objects.misses,
+            'evictions': self._objects.evictions,
+            'expirations': self._objects.expirations,
+        }
+
+    @staticmethod
+    def key(name, options):
+        """Return the key of the object created by ``name`` with
+        ``options``.
+        """
+        return u'{0}:{1}'.format(name, options_key(options))
+
+    def get(self, name, options=None, default=None):
+        """Return the object created by ``name`` with ``options``, or
+        ``default`` if it is not cached.
+        """
+        return self._objects.get(self.key(name, options), default)
+
+    def set(self, name, options, value):
+        """Cache ``value`` as the object created by ``name`` with
+        ``options``.
+        """
+        self._objects.set(self.key(name, options), value)
+
+    def get_or_create(self, name, options, create):
+        """Return the object created by ``name`` with ``options``, calling
+        ``create`` to create it if it is not cached.
+        """
+        key = self.key(name, options)
+        with self._locks_lock:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                missing = object()
+                value = self._objects.get(key, missing)
+                if value is missing:
+                    value = create()
+                    self._objects.set(key, value)
+        finally:
+            with self._locks_lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._locks[key]
+        return value
+
+    def clear(self):
+        """Remove all the objects."""
+        self._objects.invalidate()
+
+    def load(self, path):
+        """Add the objects saved in ``path`` by :meth:`save`.
+
+        :return: The number of objects loaded, expired ones excluded.
+
+        """
+        with open(path) as handler:
+            saved = json.load(handler)
+        now = time.time()
+        loaded = 0
+        for key, value, set_at in saved:
+            if self.ttl is not None and now - set_at > self.ttl:
+                continue
+            self._objects.set(key, value, set_at)
+            loaded += 1
+        return loaded
+
+    def save(self, path):
+        """Write the objects not expired to ``path`` as JSON."""
+        with open(path, 'w') as handler:
+            json.dump(
+                [list(item) for item in self._objects.items()], handler)
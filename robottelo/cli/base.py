@@ -1,12 +1,45 @@
 # -*- encoding: utf-8 -*-
 """Generic base class for cli hammer commands."""
 import logging
+import time
+import uuid
 
+from multiprocessing.pool import ThreadPool
 from robottelo import ssh
-from robottelo.cli import hammer
+from robottelo.cli import (
+    cache,
+    command_tree,
+    hammer,
+    metrics,
+    rest,
+    session,
+    shell,
+)
 from robottelo.config import settings
 
 
+# Number of records fetched per ``list`` call by ``Base.iter_list``
+DEFAULT_PAGE_SIZE = 100
+
+# Runs a create command and, if it printed the id of the new object, an info
+# command fetching it. The id is found by looking for the "Id" column of the
+# CSV output. Quoted values may contain commas, so lines with quotes are not
+# split and the id is left to be fetched by a second call.
+CREATE_AND_INFO_SCRIPT = u"""output=$({create})
+status=$?
+printf '%s\\n' "$output"
+[ $status -eq 0 ] || exit $status
+id=$(printf '%s\\n' "$output" | awk -F, \\
+    'NR == 1 && !/"/ {{
+         for (i = 1; i <= NF; i++) if ($i == "Id") c = i
+         n = NF
+     }}
+     NR == 2 && c && NF == n && !/"/ && $c ~ /^[0-9]+$/ {{ print $c }}')
+[ -n "$id" ] || exit 0
+echo {boundary}
+{info}"""
+
+
 class CLIError(Exception):
     """Indicates that a CLI command could not be run."""
 
@@ -86,19 +119,27 @@ class Base(object):
     @since: 27.Nov.2013
     """
     command_base = None  # each inherited instance should define this
-    command_sub = None  # specific to instance, like: create, update, etc
     command_requires_org = False  # True when command requires organization-id
 
     logger = logging.getLogger('robottelo')
 
     @classmethod
-    def _handle_response(cls, response, ignore_stderr=None):
+    def _requires_org(cls, command_sub):
+        """Tell whether the ``command_sub`` subcommand requires the
+        ``organization-id`` option.
+        """
+        return cls.command_requires_org
+
+    @classmethod
+    def _handle_response(cls, response, command, ignore_stderr=None):
         """Verify ``return_code`` of the CLI command.
 
         Check for a non-zero return code or any stderr contents.
 
         :param response: a ``SSHCommandResult`` object, returned by
             :mod:`robottelo.ssh.command`.
+        :param command: the hammer command which was run, used in the error
+            message.
         :param ignore_stderr: indicates whether to throw a warning in logs if
             ``stderr`` is not empty.
         :returns: contents of ``stdout``.
@@ -109,11 +150,10 @@ class Base(object):
             raise CLIReturnCodeError(
                 response.return_code,
                 response.stderr,
-                u'Command "{0} {1}" finished with return_code {2}\n'
-                'stderr contains following message:\n{3}'
+                u'Command "{0}" finished with return_code {1}\n'
+                'stderr contains following message:\n{2}'
                 .format(
-                    cls.command_base,
-                    cls.command_sub,
+                    command,
                     response.return_code,
                     response.stderr,
                 )
@@ -125,60 +165,202 @@ class Base(object):
             )
         return response.stdout
 
+    @classmethod
+    def _execute_rest(cls, command_sub, options=None):
+        """Run the ``command_sub`` subcommand through the REST backend.
+
+        :raises robottelo.cli.base.CLIReturnCodeError: If the API request
+            fails.
+        """
+        try:
+            return rest.execute(
+                cls.command_base,
+                command_sub,
+                options,
+                auth=cls._get_username_password(),
+            )
+        except rest.RESTError as err:
+            raise CLIReturnCodeError(
+                err.return_code,
+                err.message,
+                u'Command "{0} {1}" finished with return_code {2}\n'
+                'stderr contains following message:\n{3}'
+                .format(
+                    cls.command_base,
+                    command_sub,
+                    err.return_code,
+                    err.message,
+                )
+            )
+        finally:
+            cache.invalidate(cls.command_base, command_sub)
+
+    @classmethod
+    def _read_through_cache(cls, command_sub, options, output_format, fetch):
+        """Return the result of ``fetch()`` or the cached result of an
+        identical command, when the CLI cache is enabled.
+        """
+        cli_cache = cache.get_cache()
+        if cli_cache is None:
+            return fetch()
+        key = cli_cache.key(
+            cls.command_base,
+            command_sub,
+            options,
+            cls._get_username_password()[0],
+            output_format,
+        )
+        return cli_cache.get_or_fetch(key, fetch)
+
+    @classmethod
+    def _command_sub(cls, command):
+        """Return the subcommand of the hammer ``command``, or ``None`` if it
+        is not a ``command_base`` command.
+        """
+        words = command.split()
+        base = cls.command_base.split() if cls.command_base else []
+        if words[:len(base)] != base:
+            return None
+        sub = []
+        for word in words[len(base):]:
+            if word.startswith('-'):
+                break
+            sub.append(word)
+        return u' '.join(sub)
+
     @classmethod
     def add_operating_system(cls, options=None):
         """
         Adds OS to record.
         """
 
-        cls.command_sub = 'add-operatingsystem'
-
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(
+            cls._construct_command('add-operatingsystem', options))
 
         return result
 
     @classmethod
-    def create(cls, options=None):
+    def create(cls, options=None, fetch=True):
         """
         Creates a new record using the arguments passed via dictionary.
-        """
 
-        cls.command_sub = 'create'
+        When ``fetch`` is true the new record is read with the ``info``
+        subcommand and returned. Both commands are run by a single script on
+        the server, so it costs one SSH round trip.
+        """
 
         if options is None:
             options = {}
 
+        if rest.handles(cls.command_base, 'create', options):
+            # The API returns the whole entity, no need to fetch it
+            return cls._execute_rest('create', options)
+
+        if fetch and not shell.is_enabled() and not cls._overrides_info():
+            return cls._create_and_fetch(options)
+
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command('create', options), output_format='csv')
+
+        if fetch:
+            result = cls._fetch_created(options, result)
+
+        return result
+
+    @classmethod
+    def _overrides_info(cls):
+        """Whether the class overrides :meth:`info`, for example to require
+        more options or to process its output.
+        """
+        return cls.info.__func__ is not Base.info.__func__
+
+    @classmethod
+    def _fetch_created(cls, options, result):
+        """Fetch the object created with ``options``, if its id is found in
+        the parsed CSV ``result`` of ``create``.
 
+        :return: The fetched object, or ``result`` if it could not be
+            fetched.
+        """
         # Extract new object ID if it was successfully created
         if len(result) > 0 and 'id' in result[0]:
-            obj_id = result[0]['id']
-
             # Fetch new object
-            # Some Katello obj require the organization-id for subcommands
-            info_options = {u'id': obj_id}
-            if cls.command_requires_org:
-                if 'organization-id' not in options:
-                    raise CLIError(
-                        'organization-id option is required for {0}.create'
-                        .format(cls.__name__)
-                    )
-                info_options[u'organization-id'] = options[u'organization-id']
-
-            new_obj = cls.info(info_options)
+            new_obj = cls.info(cls._info_options(options, result[0]['id']))
             # stdout should be a dictionary containing the object
             if len(new_obj) > 0:
                 result = new_obj
+        return result
 
+    @classmethod
+    def _info_options(cls, options, obj_id):
+        """Return the ``info`` options to fetch an object created with
+        ``options``.
+        """
+        info_options = {u'id': obj_id}
+        # Some Katello obj require the organization-id for subcommands
+        if cls._requires_org('create'):
+            if 'organization-id' not in options:
+                raise CLIError(
+                    'organization-id option is required for {0}.create'
+                    .format(cls.__name__)
+                )
+            info_options[u'organization-id'] = options[u'organization-id']
+        return info_options
+
+    @classmethod
+    def _create_and_fetch(cls, options):
+        """Create a record and read it back in one SSH round trip.
+
+        The script prints the CSV output of ``create``, then, if an id was
+        found in it, a boundary line followed by the output of ``info``. If
+        the script could not find the id, it is fetched by a second call.
+        """
+        user, password = cls._get_username_password()
+        info_options = cls._info_options(options, u'$id')
+        command = cls._construct_command('create', options)
+        create_cmd = cls._hammer_command(command, user, password, 'csv')
+        info_cmd = cls._hammer_command(
+            cls._construct_command('info', info_options), user, password)
+        boundary = u'robottelo-info-{0}'.format(uuid.uuid4().hex)
+        start = time.time()
+        response = None
+        try:
+            response = cls._run_authenticated(
+                user,
+                password,
+                lambda: cls._run_remote(CREATE_AND_INFO_SCRIPT.format(
+                    create=create_cmd, info=info_cmd, boundary=boundary)),
+            )
+        finally:
+            cache.invalidate(cls.command_base, 'create')
+            cls._record_metrics(
+                command, 'create', time.time() - start, response)
+        output = cls._handle_response(response, command)
+        if boundary in output:
+            create_output = output[:output.index(boundary)]
+            info_output = output[output.index(boundary) + 1:]
+        else:
+            create_output = output
+            info_output = []
+
+        result = []
+        if any(create_output):
+            result = hammer.parse_csv(create_output)
+        if boundary not in output:
+            return cls._fetch_created(options, result)
+        new_obj = hammer.parse_info(info_output)
+        # stdout should be a dictionary containing the object
+        if len(new_obj) > 0:
+            result = new_obj
         return result
 
     @classmethod
     def delete(cls, options=None):
         """Deletes existing record."""
-        cls.command_sub = 'delete'
+        if rest.handles(cls.command_base, 'delete', options):
+            return cls._execute_rest('delete', options)
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command('delete', options),
             ignore_stderr=True,
         )
 
@@ -188,9 +370,8 @@ class Base(object):
         Deletes parameter from record.
         """
 
-        cls.command_sub = 'delete-parameter'
-
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(
+            cls._construct_command('delete-parameter', options))
 
         return result
 
@@ -200,9 +381,7 @@ class Base(object):
         Displays the content for existing partition table.
         """
 
-        cls.command_sub = 'dump'
-
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(cls._construct_command('dump', options))
 
         return result
 
@@ -237,31 +416,140 @@ class Base(object):
                 timeout=None, ignore_stderr=None, return_raw_response=None):
         """Executes the cli ``command`` on the server via ssh"""
         user, password = cls._get_username_password(user, password)
+        start = time.time()
+        response = None
+        try:
+            if shell.is_enabled():
+                response = shell.command(
+                    command, user, password, output_format, timeout)
+            else:
+                response = cls._execute_hammer(
+                    command, user, password, output_format, timeout)
+        finally:
+            command_sub = cls._command_sub(command)
+            if command_sub is None:
+                cache.invalidate()
+            else:
+                cache.invalidate(cls.command_base, command_sub)
+            cls._record_metrics(
+                command, command_sub, time.time() - start, response)
+        if return_raw_response:
+            return response
+        else:
+            return cls._handle_response(
+                response,
+                command,
+                ignore_stderr=ignore_stderr,
+            )
+
+    @classmethod
+    def _record_metrics(cls, command, command_sub, wall_time, response):
+        """Record a hammer call in the metrics registry, see
+        :mod:`robottelo.cli.metrics`.
+
+        :param command: The hammer command which was run.
+        :param command_sub: Its subcommand, see :meth:`_command_sub`.
+        :param wall_time: The seconds the call took.
+        :param response: The ``SSHCommandResult`` of the call, ``None`` if it
+            raised an exception.
+        """
+        if command_sub is None:
+            words = []
+            for word in command.split():
+                if word.startswith('-'):
+                    break
+                words.append(word)
+            path = u' '.join(words)
+        else:
+            path = u' '.join((cls.command_base, command_sub)).strip()
+        metrics.get_registry().record(
+            path,
+            wall_time,
+            real_time=(
+                metrics.parse_real_time(response.stderr)
+                if response is not None else None
+            ),
+            bytes_sent=len(command.encode('utf-8')),
+            bytes_received=(
+                response.received_bytes if response is not None else 0),
+            failed=response is None or response.return_code != 0,
+        )
+
+    @classmethod
+    def _hammer_command(cls, command, user, password, output_format=None):
+        """Build the shell command running hammer with ``command``"""
         time_hammer = False
         if settings.performance:
             time_hammer = settings.performance.time_hammer
 
+        if session.is_enabled():
+            environment = u'{0} '.format(session.environment(user))
+            credentials = u''
+        else:
+            environment = u''
+            credentials = u'-u {0} -p {1}'.format(user, password)
+
         # add time to measure hammer performance
-        cmd = u'LANG={0} {1} hammer -v -u {2} -p {3} {4} {5}'.format(
+        return u'{0}LANG={1} {2} hammer -v {3} {4} {5}'.format(
+            environment,
             settings.locale,
             u'time -p' if time_hammer else '',
-            user,
-            password,
+            credentials,
             u'--output={0}'.format(output_format) if output_format else u'',
             command,
         )
-        response = ssh.command(
+
+    @classmethod
+    def _execute_hammer(cls, command, user, password, output_format=None,
+                        timeout=None):
+        """Start ``hammer`` on the server via ssh to run ``command``"""
+        return cls._run_authenticated(
+            user,
+            password,
+            lambda: cls._run_remote(
+                cls._hammer_command(command, user, password, output_format),
+                output_format,
+                timeout,
+            ),
+        )
+
+    @classmethod
+    def _run_authenticated(cls, user, password, run):
+        """Call ``run``, which runs hammer commands as ``user``, after
+        starting a hammer session for ``user`` if sessions are enabled. See
+        :mod:`robottelo.cli.session`.
+
+        :raises robottelo.cli.base.CLIReturnCodeError: If the session could
+            not be started.
+        """
+        if not session.is_enabled():
+            return run()
+        try:
+            return session.run(user, password, run, cls._run_remote)
+        except session.HammerSessionError as err:
+            raise CLIReturnCodeError(
+                err.return_code,
+                err.message,
+                u'Command "hammer auth login" for user {0} finished with '
+                u'return_code {1}\nstderr contains following message:\n{2}'
+                .format(user, err.return_code, err.message)
+            )
+
+    @classmethod
+    def _run_remote(cls, cmd, output_format=None, timeout=None):
+        """Run the shell command ``cmd`` on the server via ssh"""
+        if settings.server.ssh_backend == 'asyncio':
+            # The asyncio backend requires Python 3.5+, so only import it
+            # when it is used.
+            from robottelo import ssh_async
+            command = ssh_async.command
+        else:
+            command = ssh.command
+        return command(
             cmd.encode('utf-8'),
             output_format=output_format,
             timeout=timeout,
         )
-        if return_raw_response:
-            return response
-        else:
-            return cls._handle_response(
-                response,
-                ignore_stderr=ignore_stderr,
-            )
 
     @classmethod
     def exists(cls, options=None, search=None):
@@ -282,34 +570,96 @@ class Base(object):
             options.update({u'search': u'{0}=\\"{1}\\"'.format(
                 search[0], search[1])})
 
-        result = cls.list(options)
-
-        if result:
-            result = result[0]
+        for result in cls.iter_list(options, page_size=1):
+            return result
 
-        return result
+        return []
 
     @classmethod
     def info(cls, options=None, output_format=None):
         """Reads the entity information."""
-        cls.command_sub = 'info'
-
         if options is None:
             options = {}
 
-        if cls.command_requires_org and 'organization-id' not in options:
+        if cls._requires_org('info') and 'organization-id' not in options:
             raise CLIError(
                 'organization-id option is required for {0}.info'
                 .format(cls.__name__)
             )
 
-        result = cls.execute(
-            command=cls._construct_command(options),
-            output_format=output_format
-        )
-        if output_format != 'json':
-            result = hammer.parse_info(result)
-        return result
+        if (output_format != 'json' and
+                rest.handles(cls.command_base, 'info', options)):
+            return cls._execute_rest('info', options)
+
+        def fetch():
+            """Run the info subcommand."""
+            result = cls.execute(
+                command=cls._construct_command('info', options),
+                output_format=output_format
+            )
+            if output_format != 'json':
+                result = hammer.parse_info(result)
+            return result
+
+        return cls._read_through_cache('info', options, output_format, fetch)
+
+    @classmethod
+    def iter_list(cls, options=None, page_size=DEFAULT_PAGE_SIZE,
+                  prefetch=False):
+        """Iterate over the records listed by :meth:`list`, one page at a time.
+
+        A page is fetched when the records of the previous one were consumed,
+        so callers stopping at the first match do not make the server render
+        and hammer print all the records.
+
+        :param options: The options of ``list``. Its ``page`` and ``per-page``
+            options are set for each page.
+        :param page_size: The number of records fetched by each ``list`` call.
+        :param prefetch: If true the next page is fetched in a background
+            thread while the records of the current one are consumed. If the
+            caller stops early, the page being fetched is waited for and an
+            error fetching it is logged.
+
+        """
+        options = dict(options or {})
+        options[u'per-page'] = page_size
+
+        def fetch(page):
+            """Return the records of page ``page``."""
+            page_options = dict(options)
+            page_options[u'page'] = page
+            return cls.list(page_options)
+
+        pool = ThreadPool(1) if prefetch else None
+        next_records = None  # the page being fetched in the background
+        try:
+            page = 1
+            records = fetch(page)
+            while records:
+                last_page = len(records) < page_size
+                if pool is not None and not last_page:
+                    next_records = pool.apply_async(fetch, (page + 1,))
+                for record in records:
+                    yield record
+                if last_page:
+                    return
+                page += 1
+                if pool is not None:
+                    pending, next_records = next_records, None
+                    records = pending.get()
+                else:
+                    records = fetch(page)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+                if next_records is not None and not next_records.successful():
+                    try:
+                        next_records.get()
+                    except Exception as err:  # pylint:disable=broad-except
+                        cls.logger.warning(
+                            u'Prefetching page %s of %s list failed: %s',
+                            page + 1, cls.command_base, err)
 
     @classmethod
     def list(cls, options=None, per_page=True):
@@ -318,24 +668,28 @@ class Base(object):
         @param options: ID (sometimes name works as well) to retrieve info.
         """
 
-        cls.command_sub = 'list'
-
         if options is None:
             options = {}
 
         if 'per-page' not in options and per_page:
             options[u'per-page'] = 10000
 
-        if cls.command_requires_org and 'organization-id' not in options:
+        if cls._requires_org('list') and 'organization-id' not in options:
             raise CLIError(
                 'organization-id option is required for {0}.list'
                 .format(cls.__name__)
             )
 
-        result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+        if rest.handles(cls.command_base, 'list', options):
+            return cls._execute_rest('list', options)
 
-        return result
+        return cls._read_through_cache(
+            'list',
+            options,
+            'csv',
+            lambda: cls.execute(
+                cls._construct_command('list', options), output_format='csv'),
+        )
 
     @classmethod
     def puppetclasses(cls, options=None):
@@ -343,10 +697,9 @@ class Base(object):
         Lists all puppet classes.
         """
 
-        cls.command_sub = 'puppet-classes'
-
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command('puppet-classes', options),
+            output_format='csv')
 
         return result
 
@@ -356,9 +709,8 @@ class Base(object):
         Removes OS from record.
         """
 
-        cls.command_sub = 'remove-operatingsystem'
-
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(
+            cls._construct_command('remove-operatingsystem', options))
 
         return result
 
@@ -368,10 +720,8 @@ class Base(object):
         Lists all smart class parameters.
         """
 
-        cls.command_sub = 'sc-params'
-
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command('sc-params', options), output_format='csv')
 
         return result
 
@@ -381,9 +731,7 @@ class Base(object):
         Creates or updates parameter for a record.
         """
 
-        cls.command_sub = 'set-parameter'
-
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(cls._construct_command('set-parameter', options))
 
         return result
 
@@ -393,10 +741,11 @@ class Base(object):
         Updates existing record.
         """
 
-        cls.command_sub = 'update'
+        if rest.handles(cls.command_base, 'update', options):
+            return cls._execute_rest('update', options)
 
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command('update', options), output_format='csv')
 
         return result
 
@@ -419,9 +768,14 @@ class Base(object):
         return Wrapper
 
     @classmethod
-    def _construct_command(cls, options=None):
+    def _construct_command(cls, command_sub, options=None):
         """
-        Build a hammer cli command based on the options passed
+        Build a hammer cli command for the ``command_sub`` subcommand based on
+        the options passed
+
+        :raises robottelo.cli.base.CLIReturnCodeError: If the validation of
+            commands is enabled, see :mod:`robottelo.cli.command_tree`, and
+            the subcommand or an option is unknown.
         """
 
         tail = u''
@@ -429,6 +783,22 @@ class Base(object):
         if options is None:
             options = {}
 
+        if command_tree.is_enabled():
+            try:
+                command_tree.validate(
+                    cls.command_base,
+                    command_sub,
+                    [key for key, val in options.items()
+                     if val is not None and val is not False],
+                )
+            except command_tree.CommandTreeError as err:
+                raise CLIReturnCodeError(
+                    command_tree.USAGE_ERROR_RETURN_CODE,
+                    err.message,
+                    u'Command "{0}" was rejected without running hammer\n'
+                    u'{1}'.format(err.command, err.message)
+                )
+
         for key, val in options.items():
             if val is None:
                 continue
@@ -440,7 +810,7 @@ class Base(object):
                 tail += u' --{0}="{1}"'.format(key, val)
         cmd = u'{0} {1} {2}'.format(
             cls.command_base,
-            cls.command_sub,
+            command_sub,
             tail.strip()
         )
 
@@ -0,0 +1,237 @@
+"""Read-through cache for the ``info`` and ``list`` CLI commands.
+
+When enabled, the results of :meth:`robottelo.cli.base.Base.info` and
+:meth:`robottelo.cli.base.Base.list` are cached, keyed on the hammer command,
+its subcommand, the options, the output format and the user running it. Any
+other subcommand run through :class:`robottelo.cli.base.Base` is assumed to
+change the server state and removes the cached results of its command and of
+the related commands.
+
+Changes done without the CLI wrappers, for example through the API, are not
+seen: use a short ``ttl`` or :func:`invalidate` in that case.
+
+Test classes opt in by setting ``use_cli_cache = True``, see
+:class:`robottelo.test.CLITestCase`. Other code can use :func:`enable` and
+:func:`disable`.
+
+"""
+import copy
+import logging
+import six
+import threading
+
+from robottelo.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SIZE = 1024
+DEFAULT_TTL = 300
+
+# Subcommands which do not change anything on the server. Only the last word
+# of subcommands like ``content-view version info`` is checked.
+READ_SUBCOMMANDS = frozenset((
+    'dump',
+    'facts',
+    'info',
+    'list',
+    'logs',
+    'puppet-classes',
+    'reports',
+    'sc-params',
+))
+
+# Commands showing data changed by another command
+RELATED_COMMANDS = {
+    'activation-key': ('content-host', 'host-collection'),
+    'content-host': ('activation-key', 'host', 'host-collection'),
+    'content-view': (
+        'activation-key', 'content-host', 'lifecycle-environment',
+        'repository',
+    ),
+    'host': ('content-host', 'hostgroup'),
+    'host-collection': ('activation-key', 'content-host'),
+    'lifecycle-environment': (
+        'activation-key', 'content-host', 'content-view'),
+    'product': ('repository', 'repository-set', 'subscription', 'sync-plan'),
+    'repository': (
+        'content-view', 'docker image', 'erratum', 'package',
+        'package-group', 'product', 'puppet-module',
+    ),
+    'repository-set': ('product', 'repository'),
+    'subscription': (
+        'activation-key', 'content-host', 'product', 'repository',
+        'repository-set',
+    ),
+    'sync-plan': ('product',),
+    'user': ('role', 'user-group'),
+    'user-group': ('role', 'user'),
+}
+
+# Commands whose changes can be seen in almost every other command, for
+# example the organizations of an entity.
+GLOBAL_COMMANDS = frozenset(('location', 'organization'))
+
+_cache = None
+
+
+class CLICache(object):
+    """Cache of ``info`` and ``list`` results with per command statistics.
+
+    :param int max_size: The maximum number of cached results.
+    :param ttl: The number of seconds results are kept, or ``None`` to keep
+        them until they are evicted or invalidated.
+
+    """
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, ttl=DEFAULT_TTL):
+        self._results = LRUCache(max_size, ttl)
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+        # Invalidations of all the results and of the results of each
+        # command, so that results fetched meanwhile are not cached
+        self._generation = 0
+        self._generations = {}
+        self._generation_lock = threading.Lock()
+
+    @staticmethod
+    def key(command_base, command_sub, options, user, output_format=None):
+        """Return the cache key of a command.
+
+        Options are normalized the same way the command line is built:
+        ``None`` and ``False`` values are ignored and the order of the
+        options does not matter.
+
+        """
+        normalized = []
+        for name, value in (options or {}).items():
+            if value is None or value is False:
+                continue
+            if isinstance(value, list):
+                value = tuple(six.text_type(item) for item in value)
+            elif value is not True:
+                value = six.text_type(value)
+            normalized.append((name, value))
+        return (
+            command_base,
+            command_sub,
+            tuple(sorted(normalized)),
+            user,
+            output_format,
+        )
+
+    def _count(self, command_base, stat, count=1):
+        """Add ``count`` to the ``stat`` statistic of ``command_base``."""
+        with self._stats_lock:
+            stats = self._stats.setdefault(
+                command_base, {'hits': 0, 'misses': 0, 'invalidations': 0})
+            stats[stat] += count
+
+    def get_or_fetch(self, key, fetch):
+        """Return the cached result for ``key``, calling ``fetch`` to get it
+        on a miss.
+
+        A copy of the result is returned, so callers may change it. The
+        result is not cached if the results of its command were invalidated
+        while fetching it, as it may have been read before the change.
+
+        """
+        missing = object()
+        result = self._results.get(key, missing)
+        if result is missing:
+            self._count(key[0], 'misses')
+            generation = self._get_generation(key[0])
+            result = fetch()
+            with self._generation_lock:
+                if self._get_generation(key[0]) == generation:
+                    self._results.set(key, copy.deepcopy(result))
+            return result
+        self._count(key[0], 'hits')
+        return copy.deepcopy(result)
+
+    def _get_generation(self, command_base):
+        """Return the number of invalidations of the results of
+        ``command_base``, of all the results and of ``command_base`` alone.
+        """
+        return (self._generation, self._generations.get(command_base, 0))
+
+    def invalidate(self, command_base=None, command_sub=None):
+        """Remove the results changed by a command.
+
+        :param command_base: The command which was run. If it is ``None``
+            all the results are removed.
+        :param command_sub: Its subcommand. Nothing is removed if it does
+            not change the server state.
+
+        """
+        if command_sub and command_sub.split()[-1] in READ_SUBCOMMANDS:
+            return
+        if command_base is None or command_base in GLOBAL_COMMANDS:
+            with self._generation_lock:
+                self._generation += 1
+            removed = self._results.invalidate()
+        else:
+            commands = set(RELATED_COMMANDS.get(command_base, ()))
+            commands.add(command_base)
+            with self._generation_lock:
+                for command in commands:
+                    self._generations[command] = (
+                        self._generations.get(command, 0) + 1)
+            removed = self._results.invalidate(lambda key: key[0] in commands)
+        if removed:
+            self._count(command_base, 'invalidations', removed)
+
+    @property
+    def stats(self):
+        """Hits, misses and invalidated results of each command."""
+        with self._stats_lock:
+            return dict(
+                (command_base, dict(stats))
+                for command_base, stats in self._stats.items()
+            )
+
+    def report(self):
+        """Return a table of the statistics of each command."""
+        lines = [u'{0:<28} {1:>8} {2:>8} {3:>13}'.format(
+            u'Command', u'Hits', u'Misses', u'Invalidations')]
+        for command_base, stats in sorted(
+                self.stats.items(), key=lambda item: str(item[0])):
+            lines.append(u'{0:<28} {1:>8} {2:>8} {3:>13}'.format(
+                command_base or u'(all)',
+                stats['hits'],
+                stats['misses'],
+                stats['invalidations'],
+            ))
+        return u'\n'.join(lines)
+
+
+def enable(max_size=DEFAULT_MAX_SIZE, ttl=DEFAULT_TTL):
+    """Start caching ``info`` and ``list`` results in a new cache."""
+    global _cache  # pylint:disable=global-statement
+    _cache = CLICache(max_size, ttl)
+
+
+def disable():
+    """Stop caching and discard the cache.
+
+    :return: The discarded :class:`CLICache`, or ``None`` if it was not
+        enabled.
+
+    """
+    global _cache  # pylint:disable=global-statement
+    cache, _cache = _cache, None
+    return cache
+
+
+def get_cache():
+    """Return the :class:`CLICache` in use, or ``None`` if not enabled."""
+    return _cache
+
+
+def invalidate(command_base=None, command_sub=None):
+    """Remove the cached results changed by a command, if enabled.
+
+    See :meth:`CLICache.invalidate`.
+
+    """
+    cache = _cache
+    if cache is not None:
+        cache.invalidate(command_base, command_sub)
@@ -0,0 +1,218 @@
+"""Local validation of hammer commands using the cached command tree.
+
+``tests/foreman/data/hammer_commands.json``, generated by
+``scripts/hammer_command_tree.py``, describes every hammer subcommand and its
+options. It is loaded once, the first time it is needed, into an index mapping
+each command path, like ``u'content-view version info'``, to the options and
+subcommands of that command. Checking a command is then a dictionary lookup
+and a set difference.
+
+When enabled, :meth:`robottelo.cli.base.Base._construct_command` calls
+:func:`validate` and unknown subcommands and options are rejected without
+running hammer. Commands not found in the tree, for example those of a plugin
+installed after it was generated, are not checked.
+
+Test classes opt in by setting ``validate_hammer_options = True``, see
+:class:`robottelo.test.CLITestCase`. Other code can use :func:`enable` and
+:func:`disable`.
+
+:func:`fetch_command_tree` builds the tree from the help of the hammer
+installed on a server.
+
+"""
+import json
+import logging
+import threading
+
+from robottelo import ssh
+from robottelo.cli import hammer
+from robottelo.helpers import get_data_file
+
+logger = logging.getLogger(__name__)
+
+COMMAND_TREE_FILE = 'hammer_commands.json'
+
+# Return code of hammer when called with invalid options or subcommands
+USAGE_ERROR_RETURN_CODE = 64
+
+_index = None
+_index_lock = threading.Lock()
+_enabled = False
+
+
+class CommandTreeError(Exception):
+    """Indicates that a hammer command is not valid.
+
+    :param command: The invalid command, like ``u'org info'``.
+    :param message: The error message, as hammer would print it.
+
+    """
+    def __init__(self, command, message):
+        super(CommandTreeError, self).__init__(message)
+        self.command = command
+        self.message = message
+
+
+def build_index(tree):
+    """Return the index of a command tree.
+
+    :param dict tree: A command tree, as generated by
+        ``scripts/hammer_command_tree.py``.
+    :return: A dictionary mapping each command path, without the leading
+        ``hammer``, to a tuple of the frozensets of its option names and of
+        its subcommand names. The root command has the ``u''`` path.
+
+    """
+    index = {}
+    pending = [(u'', tree)]
+    while pending:
+        path, command = pending.pop()
+        subcommands = command.get('subcommands', ())
+        index[path] = (
+            frozenset(option['name'] for option in command.get('options', ())),
+            frozenset(subcommand['name'] for subcommand in subcommands),
+        )
+        for subcommand in subcommands:
+            pending.append((
+                u'{0} {1}'.format(path, subcommand['name']).lstrip(),
+                subcommand,
+            ))
+    return index
+
+
+def get_index():
+    """Return the index of the cached command tree, loading it if needed."""
+    global _index  # pylint:disable=global-statement
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                with open(get_data_file(COMMAND_TREE_FILE)) as handler:
+                    _index = build_index(json.load(handler))
+    return _index
+
+
+def validate(command_base, command_sub, option_names, index=None):
+    """Check that a command and its options are known by hammer.
+
+    :param str command_base: The command, like ``u'content-view'``.
+    :param str command_sub: The subcommand, like ``u'version info'``.
+    :param option_names: The names of the options passed, without the
+        leading ``--``.
+    :param dict index: The index to check against, as returned by
+        :func:`build_index`. Defaults to the cached command tree.
+    :raises robottelo.cli.command_tree.CommandTreeError: If the subcommand or
+        an option is unknown.
+
+    """
+    if index is None:
+        index = get_index()
+    path = u' '.join(u'{0} {1}'.format(command_base, command_sub).split())
+    node = index.get(path)
+    if node is None:
+        # Find the closest known parent to tell whether the command is
+        # missing from the tree or really unknown
+        words = path.split()
+        for length in range(len(words) - 1, 0, -1):
+            parent = index.get(u' '.join(words[:length]))
+            if parent is None:
+                continue
+            if not parent[1]:
+                # The parent takes no subcommand, the extra words are
+                # arguments
+                return
+            raise CommandTreeError(
+                path,
+                u"Error: unknown subcommand '{0}' of '{1}'".format(
+                    words[length], u' '.join(words[:length]))
+            )
+        return
+    unknown = sorted(set(option_names) - node[0])
+    if unknown:
+        raise CommandTreeError(
+            path,
+            u"Error: Unrecognised option '--{0}' for '{1}'".format(
+                unknown[0], path)
+        )
+
+
+def enable():
+    """Validate the commands built by the CLI wrappers."""
+    global _enabled  # pylint:disable=global-statement
+    _enabled = True
+
+
+def disable():
+    """Stop validating the commands built by the CLI wrappers."""
+    global _enabled  # pylint:disable=global-statement
+    _enabled = False
+
+
+def is_enabled():
+    """Whether the commands built by the CLI wrappers are validated."""
+    return _enabled
+
+
+def _help_signature(command):
+    """Return what the help of ``command`` shows, to compare it."""
+    return (
+        [sorted(option.items()) for option in command['options']],
+        [(subcommand['name'], subcommand.get('description'))
+         for subcommand in command['subcommands']],
+    )
+
+
+def fetch_command_tree(previous=None, hostname=None,
+                       max_parallel=ssh.DEFAULT_MAX_PARALLEL):
+    """Build the hammer command tree from the help of every command.
+
+    The tree is walked one level at a time and the ``--help`` commands of a
+    level run concurrently with :func:`robottelo.ssh.command_many`, so
+    fetching the whole tree takes as many round trips as the tree is deep.
+
+    :param dict previous: A tree fetched before. The commands without
+        subcommands, most of the tree, are copied from it instead of being
+        fetched again when the help of their parent did not change. A new
+        option of such a command is then not seen: pass ``None`` to fetch the
+        whole tree.
+    :param str hostname: The server to run hammer on. Defaults to
+        ``server.hostname`` from the configuration.
+    :param int max_parallel: Maximum number of hammer commands running at a
+        time.
+    :return: A dictionary with the ``options`` and ``subcommands`` of
+        ``hammer``, as parsed by :func:`robottelo.cli.hammer.parse_help`.
+        Each subcommand also has its own ``options`` and ``subcommands``.
+
+    """
+    tree = {}
+    pending = [(u'hammer', tree, previous)]
+    while pending:
+        results = ssh.command_many(
+            [u'{0} --help'.format(path) for path, _, _ in pending],
+            hostname=hostname,
+            max_parallel=max_parallel,
+        )
+        logger.debug('Fetched the help of %s hammer commands', len(pending))
+        next_pending = []
+        for (path, command, old), result in zip(pending, results):
+            command.update(hammer.parse_help(result.stdout))
+            unchanged = (
+                old is not None and
+                _help_signature(command) == _help_signature(old)
+            )
+            old_subcommands = dict(
+                (subcommand['name'], subcommand)
+                for subcommand in (old or {}).get('subcommands', ())
+            )
+            for subcommand in command['subcommands']:
+                old_subcommand = old_subcommands.get(subcommand['name'])
+                if unchanged and not old_subcommand['subcommands']:
+                    subcommand['options'] = old_subcommand['options']
+                    subcommand['subcommands'] = old_subcommand['subcommands']
+                else:
+                    next_pending.append((
+                        u'{0} {1}'.format(path, subcommand['name']),
+                        subcommand,
+                        old_subcommand,
+                    ))
+        pending = next_pending
+    return tree
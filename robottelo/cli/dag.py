@@ -0,0 +1,227 @@
+"""Dependency graph executor for the multi-step CLI factories.
+
+A :class:`TaskGraph` holds named steps and the steps each one needs. Running
+the graph starts every step as soon as the steps it needs are done, so
+independent steps, for example creating a product and a content view in the
+same organization, run at the same time while dependent ones wait on their
+inputs.
+
+Each step is called with the results of the steps it needs as keyword
+arguments::
+
+    graph = TaskGraph()
+    graph.add('org', lambda: make_org()['id'])
+    graph.add('product', lambda org: make_product(
+        {u'organization-id': org}), requires=('org',))
+    results = graph.run()
+
+After a run, :meth:`TaskGraph.critical_path` tells which chain of steps
+determined the total time: making any other step faster does not make the
+whole graph faster.
+
+"""
+import logging
+import six
+import sys
+import time
+
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
+from six.moves import queue
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of steps running at a time. Keep it at most the
+# ``MaxSessions`` value of the server's sshd when steps run hammer commands.
+DEFAULT_MAX_WORKERS = 4
+
+
+class TaskGraphError(Exception):
+    """Indicates that a task graph can not be run, for example because of a
+    dependency cycle.
+    """
+
+
+class TaskGraph(object):
+    """Named steps run concurrently in the order of their dependencies."""
+
+    def __init__(self):
+        self._tasks = OrderedDict()  # name => (function, requires)
+        self.timings = {}  # name => (start, finish), relative to the run
+
+    def __contains__(self, name):
+        return name in self._tasks
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def add(self, name, function, requires=()):
+        """Add a step.
+
+        :param str name: The name of the step, also the name of the keyword
+            argument its result is passed as.
+        :param function: Called with the results of ``requires`` as keyword
+            arguments. Its return value is the result of the step.
+        :param requires: The names of the steps to run before this one.
+        :raises robottelo.cli.dag.TaskGraphError: If a step with the same
+            name was already added.
+
+        """
+        if name in self._tasks:
+            raise TaskGraphError(u'Step {0} added twice'.format(name))
+        self._tasks[name] = (function, tuple(requires))
+
+    def order(self):
+        """Return the names of the steps in an order satisfying their
+        dependencies.
+
+        :raises robottelo.cli.dag.TaskGraphError: If a step requires an
+            unknown step or if the steps depend on each other in a cycle.
+
+        """
+        for name, (_, requires) in self._tasks.items():
+            for required in requires:
+                if required not in self._tasks:
+                    raise TaskGraphError(
+                        u'Step {0} requires unknown step {1}'
+                        .format(name, required)
+                    )
+        order = []
+        done = set()
+        remaining = list(self._tasks)
+        while remaining:
+            ready = [
+                name for name in remaining
+                if done.issuperset(self._tasks[name][1])
+            ]
+            if not ready:
+                raise TaskGraphError(
+                    u'Dependency cycle between steps {0}'
+                    .format(u', '.join(remaining))
+                )
+            order.extend(ready)
+            done.update(ready)
+            remaining = [name for name in remaining if name not in done]
+        return order
+
+    def _call(self, name, kwargs, done, start):
+        """Run the step ``name`` and put its outcome in the ``done`` queue."""
+        function = self._tasks[name][0]
+        started = time.time() - start
+        try:
+            result = function(**kwargs)
+        except Exception:  # pylint:disable=broad-except
+            done.put((name, False, sys.exc_info(), started,
+                      time.time() - start))
+        else:
+            done.put((name, True, result, started, time.time() - start))
+
+    def run(self, max_workers=DEFAULT_MAX_WORKERS):
+        """Run all the steps.
+
+        If a step raises an exception, no other step is started, the running
+        ones are waited for and the exception is raised again.
+
+        :param int max_workers: Maximum number of steps running at a time.
+        :return: A dictionary mapping the name of each step to its result.
+        :raises robottelo.cli.dag.TaskGraphError: If the steps can not be
+            ordered, see :meth:`order`.
+
+        """
+        self.order()
+        self.timings = {}
+        results = {}
+        waiting = OrderedDict(
+            (name, set(requires))
+            for name, (_, requires) in self._tasks.items()
+        )
+        done = queue.Queue()
+        error = None
+        running = 0
+        pool = ThreadPool(max(1, min(max_workers, len(self._tasks) or 1)))
+        start = time.time()
+        try:
+            while True:
+                if error is None:
+                    ready = [
+                        name for name, requires in waiting.items()
+                        if not requires
+                    ]
+                    for name in ready:
+                        del waiting[name]
+                        kwargs = dict(
+                            (required, results[required])
+                            for required in self._tasks[name][1]
+                        )
+                        running += 1
+                        pool.apply_async(
+                            self._call, (name, kwargs, done, start))
+                if not running:
+                    break
+                name, succeeded, value, started, finished = done.get()
+                running -= 1
+                self.timings[name] = (started, finished)
+                if not succeeded:
+                    logger.debug('Step %s failed after %.3fs',
+                                 name, finished - started)
+                    if error is None:
+                        error = value
+                    continue
+                logger.debug('Step %s done in %.3fs', name, finished - started)
+                results[name] = value
+                for requires in waiting.values():
+                    requires.discard(name)
+        finally:
+            pool.close()
+            pool.join()
+        if error is not None:
+            six.reraise(*error)
+        return results
+
+    def critical_path(self):
+        """Return the chain of steps which determined the duration of the
+        last run.
+
+        Starting from the step which finished last, the path goes back
+        through the required step which finished last, the one it waited for.
+
+        :return: A tuple of the list of step names, in the order they ran, and
+            of the number of seconds from the start of the run to the end of
+            the last of them.
+
+        """
+        if not self.timings:
+            return [], 0.0
+        last = max(self.timings, key=lambda name: self.timings[name][1])
+        path = [last]
+        while True:
+            requires = [
+                required for required in self._tasks[path[-1]][1]
+                if required in self.timings
+            ]
+            if not requires:
+                break
+            path.append(max(
+                requires, key=lambda name: self.timings[name][1]))
+        path.reverse()
+        return path, self.timings[last][1]
+
+    def report(self):
+        """Return a table of the timing of each step of the last run, the
+        steps of the critical path being marked with a ``*``.
+        """
+        path, total = self.critical_path()
+        critical = set(path)
+        lines = [u'  {0:<28} {1:>9} {2:>9}'.format(
+            u'Step', u'Start', u'Duration')]
+        for name in sorted(self.timings, key=lambda name: self.timings[name]):
+            started, finished = self.timings[name]
+            lines.append(u'{0} {1:<28} {2:>8.3f}s {3:>8.3f}s'.format(
+                u'*' if name in critical else u' ',
+                name,
+                started,
+                finished - started,
+            ))
+        lines.append(u'Critical path: {0} ({1:.3f}s)'.format(
+            u' > '.join(path), total))
+        return u'\n'.join(lines)
@@ -32,7 +32,7 @@ class DockerContainer(Base):
     command_base = 'docker container'
 
     @classmethod
-    def create(cls, options=None):
+    def create(cls, options=None, fetch=True):
         """Creates a docker container
 
         Usage::
@@ -79,7 +79,7 @@ class DockerContainer(Base):
                                                       yes/no, 1/0.
 
         """
-        return super(DockerContainer, cls).create(options)
+        return super(DockerContainer, cls).create(options, fetch)
 
     @classmethod
     def delete(cls, options=None):
@@ -158,8 +158,7 @@ class DockerContainer(Base):
                                                       Default: 100
 
         """
-        cls.command_sub = 'logs'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command('logs', options))
 
     @classmethod
     def start(cls, options=None):
@@ -177,8 +176,7 @@ class DockerContainer(Base):
             --name NAME                               Name to search by
 
         """
-        cls.command_sub = 'start'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command('start', options))
 
     @classmethod
     def status(cls, options=None):
@@ -196,8 +194,7 @@ class DockerContainer(Base):
             --name NAME                               Name to search by
 
         """
-        cls.command_sub = 'status'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command('status', options))
 
     @classmethod
     def stop(cls, options=None):
@@ -215,8 +212,7 @@ class DockerContainer(Base):
             --name NAME                               Name to search by
 
         """
-        cls.command_sub = 'stop'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command('stop', options))
 
 
 class DockerImage(Base):
@@ -327,7 +323,7 @@ class DockerRegistry(Base):
     command_base = 'docker registry'
 
     @classmethod
-    def create(cls, options=None):
+    def create(cls, options=None, fetch=True):
         """Creates a docker registry
 
         Usage::
@@ -343,7 +339,7 @@ class DockerRegistry(Base):
             --username USERNAME
 
         """
-        return super(DockerRegistry, cls).create(options)
+        return super(DockerRegistry, cls).create(options, fetch)
 
     @classmethod
     def delete(cls, options=None):
@@ -26,6 +26,7 @@ from robottelo.cli.base import CLIReturnCodeError
 from robottelo.cli.computeresource import ComputeResource
 from robottelo.cli.contenthost import ContentHost
 from robottelo.cli.contentview import ContentView
+from robottelo.cli.dag import TaskGraph
 from robottelo.cli.docker import DockerContainer, DockerRegistry
 from robottelo.cli.domain import Domain
 from robottelo.cli.environment import Environment
@@ -40,6 +41,7 @@ from robottelo.cli.model import Model
 from robottelo.cli.operatingsys import OperatingSys
 from robottelo.cli.org import Org
 from robottelo.cli.partitiontable import PartitionTable
+from robottelo.cli.pool import pooled
 from robottelo.cli.product import Product
 from robottelo.cli.proxy import Proxy, SSHTunnelError, default_url_on_new_port
 from robottelo.cli.repository import Repository
@@ -69,6 +71,9 @@ logger = logging.getLogger(__name__)
 ORG_KEYS = ['organization', 'organization-id', 'organization-label']
 CONTENT_VIEW_KEYS = ['content-view', 'content-view-id']
 LIFECYCLE_KEYS = ['lifecycle-environment', 'lifecycle-environment-id']
+# Options of the entities pooled by organization when
+# [robottelo] entity_pool_scoped is enabled, see robottelo.cli.pool
+ORG_SCOPE = ('organization-id',)
 
 
 class CLIFactoryError(Exception):
@@ -111,6 +116,7 @@ def create_object(cli_object, options, values):
 
 
 @cacheable
+@pooled(ActivationKey, scope=ORG_SCOPE)
 def make_activation_key(options=None):
     """
     Usage::
@@ -263,6 +269,7 @@ def make_container(options=None):
 
 
 @cacheable
+@pooled(ContentView, scope=ORG_SCOPE)
 def make_content_view(options=None):
     """
     Usage::
@@ -351,6 +358,7 @@ def make_gpg_key(options=None):
 
 
 @cacheable
+@pooled(Location)
 def make_location(options=None):
     """Location CLI factory
 
@@ -516,6 +524,7 @@ def make_partition_table(options=None):
 
 
 @cacheable
+@pooled(Product, scope=ORG_SCOPE)
 def make_product(options=None):
     """
     Usage::
@@ -1038,6 +1047,7 @@ def make_host(options=None):
 
 
 @cacheable
+@pooled(HostCollection, scope=ORG_SCOPE)
 def make_host_collection(options=None):
     """
     Usage::
@@ -1262,6 +1272,7 @@ def make_compute_resource(options=None):
 
 
 @cacheable
+@pooled(Org)
 def make_org(options=None):
     """
     Usage::
@@ -1426,6 +1437,7 @@ def make_os(options=None):
 
 
 @cacheable
+@pooled(Domain)
 def make_domain(options=None):
     """
     Usage::
@@ -1610,6 +1622,7 @@ def make_environment(options=None):
 
 
 @cacheable
+@pooled(LifecycleEnvironment, scope=ORG_SCOPE)
 def make_lifecycle_environment(options=None):
     """
     Usage::
@@ -1757,6 +1770,141 @@ def activationkey_add_subscription_to_repo(options=None):
                 )
 
 
+def _add_org_steps(graph, options):
+    """Add the ``org`` and ``env`` steps to the graph of a ``setup_org_for_*``
+    helper, creating a new organization and lifecycle environment unless they
+    are given in ``options``.
+    """
+    if options.get('organization-id') is None:
+        graph.add('org', lambda: make_org()['id'])
+    else:
+        graph.add('org', lambda: options['organization-id'])
+    if options.get('lifecycle-environment-id') is None:
+        graph.add(
+            'env',
+            lambda org: make_lifecycle_environment(
+                {u'organization-id': org})['id'],
+            requires=('org',),
+        )
+    else:
+        graph.add(
+            'env',
+            lambda org: options['lifecycle-environment-id'],
+            requires=('org',),
+        )
+
+
+def _add_content_view_steps(graph, options):
+    """Add the steps of a ``setup_org_for_*`` helper adding the ``repo`` to a
+    content view, publishing and promoting it once the repository is
+    synchronized by the ``sync`` step, and associating the ``activation_key``
+    with it.
+
+    The content view and the activation key are created unless they are
+    given in ``options``.
+    """
+    if options.get('content-view-id') is None:
+        graph.add(
+            'cv',
+            lambda org: make_content_view({u'organization-id': org})['id'],
+            requires=('org',),
+        )
+    else:
+        graph.add(
+            'cv', lambda org: options['content-view-id'], requires=('org',))
+
+    def cv_repository(cv, org, repo):
+        """Associate the repository with the content view."""
+        try:
+            ContentView.add_repository({
+                u'id': cv,
+                u'organization-id': org,
+                u'repository-id': repo,
+            })
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(
+                u'Failed to add repository to content view\n{0}'
+                .format(err.msg)
+            )
+    graph.add('cv_repository', cv_repository, requires=('cv', 'org', 'repo'))
+
+    def publish(cv, cv_repository, sync):
+        """Publish a new version of the content view."""
+        try:
+            ContentView.publish({u'id': cv})
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(
+                u'Failed to publish new version of content view\n{0}'
+                .format(err.msg)
+            )
+    graph.add('publish', publish, requires=('cv', 'cv_repository', 'sync'))
+
+    def promote(cv, env, org, publish):
+        """Promote the new content view version to the lifecycle
+        environment.
+        """
+        try:
+            cvv = ContentView.info({u'id': cv})['versions'][-1]
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(
+                u'Failed to fetch content view info\n{0}'.format(err.msg))
+        try:
+            ContentView.version_promote({
+                u'id': cvv['id'],
+                u'organization-id': org,
+                u'to-lifecycle-environment-id': env,
+            })
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(
+                u'Failed to promote version to next environment\n{0}'
+                .format(err.msg)
+            )
+    graph.add('promote', promote, requires=('cv', 'env', 'org', 'publish'))
+
+    def activation_key(cv, env, org, promote):
+        """Create the activation key if needed and associate the content view
+        with it.
+        """
+        if options.get('activationkey-id') is None:
+            return make_activation_key({
+                u'content-view-id': cv,
+                u'lifecycle-environment-id': env,
+                u'organization-id': org,
+            })['id']
+        # Given activation key may have no (or different) CV associated.
+        # Associate activation key with CV just to be sure
+        try:
+            ActivationKey.update({
+                u'content-view-id': cv,
+                u'id': options['activationkey-id'],
+                u'organization-id': org,
+            })
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(
+                u'Failed to associate activation-key with CV\n{0}'
+                .format(err.msg)
+            )
+        return options['activationkey-id']
+    graph.add(
+        'activation_key',
+        activation_key,
+        requires=('cv', 'env', 'org', 'promote'),
+    )
+
+
+def _run_setup_graph(graph, helper):
+    """Run the graph of the ``helper`` setup function and log the timing of
+    its steps.
+
+    :return: The results of the steps, see
+        :meth:`robottelo.cli.dag.TaskGraph.run`.
+
+    """
+    results = graph.run()
+    logger.debug('%s steps:\n%s', helper, graph.report())
+    return results
+
+
 def setup_org_for_a_custom_repo(options=None):
     """Sets up Org for the given custom repo by:
 
@@ -1771,6 +1919,10 @@ def setup_org_for_a_custom_repo(options=None):
         associates it with the content view.
     5. Adds the custom repo subscription to the activation key
 
+    Steps not depending on each other, like creating the lifecycle
+    environment, the product and the content view, run at the same time. The
+    timing of each step and the critical path are logged.
+
     Options::
 
         url - URL to custom repository
@@ -1791,99 +1943,52 @@ def setup_org_for_a_custom_repo(options=None):
             not options or
             not options.get('url')):
         raise CLIFactoryError('Please provide valid custom repo URL.')
-    # Create new organization and lifecycle environment if needed
-    if options.get('organization-id') is None:
-        org_id = make_org()['id']
-    else:
-        org_id = options['organization-id']
-    if options.get('lifecycle-environment-id') is None:
-        env_id = make_lifecycle_environment({u'organization-id': org_id})['id']
-    else:
-        env_id = options['lifecycle-environment-id']
+    graph = TaskGraph()
+    _add_org_steps(graph, options)
     # Create custom product and repository
-    custom_product = make_product({u'organization-id': org_id})
-    custom_repo = make_repository({
-        u'content-type': 'yum',
-        u'product-id': custom_product['id'],
-        u'url': options.get('url'),
-    })
-    # Synchronize custom repository
-    try:
-        Repository.synchronize({'id': custom_repo['id']})
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to synchronize repository\n{0}'.format(err.msg))
-    # Create CV if needed and associate repo with it
-    if options.get('content-view-id') is None:
-        cv_id = make_content_view({u'organization-id': org_id})['id']
-    else:
-        cv_id = options['content-view-id']
-    try:
-        ContentView.add_repository({
-            u'id': cv_id,
-            u'organization-id': org_id,
-            u'repository-id': custom_repo['id'],
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to add repository to content view\n{0}'.format(err.msg))
-    # Publish a new version of CV
-    try:
-        ContentView.publish({u'id': cv_id})
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to publish new version of content view\n{0}'
-            .format(err.msg)
-        )
-    # Get the version id
-    cvv = ContentView.info({u'id': cv_id})['versions'][-1]
-    # Promote version to next env
-    try:
-        ContentView.version_promote({
-            u'id': cvv['id'],
-            u'organization-id': org_id,
-            u'to-lifecycle-environment-id': env_id,
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to promote version to next environment\n{0}'
-            .format(err.msg)
-        )
-    # Create activation key if needed and associate content view with it
-    if options.get('activationkey-id') is None:
-        activationkey_id = make_activation_key({
-            u'content-view-id': cv_id,
-            u'lifecycle-environment-id': env_id,
-            u'organization-id': org_id,
-        })['id']
-    else:
-        activationkey_id = options['activationkey-id']
-        # Given activation key may have no (or different) CV associated.
-        # Associate activation key with CV just to be sure
+    graph.add(
+        'product',
+        lambda org: make_product({u'organization-id': org}),
+        requires=('org',),
+    )
+    graph.add(
+        'repo',
+        lambda product: make_repository({
+            u'content-type': 'yum',
+            u'product-id': product['id'],
+            u'url': options.get('url'),
+        })['id'],
+        requires=('product',),
+    )
+
+    def sync(repo):
+        """Synchronize the custom repository."""
         try:
-            ActivationKey.update({
-                u'content-view-id': cv_id,
-                u'id': activationkey_id,
-                u'organization-id': org_id,
-            })
+            Repository.synchronize({'id': repo})
         except CLIReturnCodeError as err:
             raise CLIFactoryError(
-                u'Failed to associate activation-key with CV\n{0}'
-                .format(err.msg)
-            )
+                u'Failed to synchronize repository\n{0}'.format(err.msg))
+    graph.add('sync', sync, requires=('repo',))
+    _add_content_view_steps(graph, options)
     # Add subscription to activation-key
-    activationkey_add_subscription_to_repo({
-        u'activationkey-id': activationkey_id,
-        u'organization-id': org_id,
-        u'subscription': custom_product['name'],
-    })
+    graph.add(
+        'subscription',
+        lambda activation_key, org, product:
+            activationkey_add_subscription_to_repo({
+                u'activationkey-id': activation_key,
+                u'organization-id': org,
+                u'subscription': product['name'],
+            }),
+        requires=('activation_key', 'org', 'product'),
+    )
+    results = _run_setup_graph(graph, 'setup_org_for_a_custom_repo')
     return {
-        u'activationkey-id': activationkey_id,
-        u'content-view-id': cv_id,
-        u'lifecycle-environment-id': env_id,
-        u'organization-id': org_id,
-        u'product-id': custom_product['id'],
-        u'repository-id': custom_repo['id'],
+        u'activationkey-id': results['activation_key'],
+        u'content-view-id': results['cv'],
+        u'lifecycle-environment-id': results['env'],
+        u'organization-id': results['org'],
+        u'product-id': results['product']['id'],
+        u'repository-id': results['repo'],
     }
 
 
@@ -1902,6 +2007,10 @@ def setup_org_for_a_rh_repo(options=None):
         associates it with the content view.
     6. Adds the RH repo subscription to the activation key
 
+    Steps not depending on each other, like cloning the manifest, creating
+    the lifecycle environment and the content view, run at the same time.
+    The timing of each step and the critical path are logged.
+
     Options::
 
         product - RH product name
@@ -1929,130 +2038,81 @@ def setup_org_for_a_rh_repo(options=None):
             not options.get('repository')):
         raise CLIFactoryError(
             'Please provide valid product, repository-set and repo.')
-    # Create new organization and lifecycle environment if needed
-    if options.get('organization-id') is None:
-        org_id = make_org()['id']
-    else:
-        org_id = options['organization-id']
-    if options.get('lifecycle-environment-id') is None:
-        env_id = make_lifecycle_environment({u'organization-id': org_id})['id']
-    else:
-        env_id = options['lifecycle-environment-id']
-    # Clone manifest and upload it
-    with manifests.clone() as manifest:
-        upload_file(manifest.content, manifest.filename)
-    try:
-        Subscription.upload({
-            u'file': manifest.filename,
-            u'organization-id': org_id,
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to upload manifest\n{0}'.format(err.msg))
-    # Enable repo from Repository Set
-    try:
-        RepositorySet.enable({
-            u'basearch': 'x86_64',
-            u'name': options['repository-set'],
-            u'organization-id': org_id,
-            u'product': options['product'],
-            u'releasever': options.get('releasever'),
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to enable repository set\n{0}'.format(err.msg))
-    # Fetch repository info
-    try:
-        rhel_repo = Repository.info({
-            u'name': options['repository'],
-            u'organization-id': org_id,
-            u'product': options['product'],
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to fetch repository info\n{0}'.format(err.msg))
-    # Synchronize the RH repository
-    try:
-        Repository.synchronize({
-            u'name': options['repository'],
-            u'organization-id': org_id,
-            u'product': options['product'],
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to synchronize repository\n{0}'.format(err.msg))
-    # Create CV if needed and associate repo with it
-    if options.get('content-view-id') is None:
-        cv_id = make_content_view({u'organization-id': org_id})['id']
-    else:
-        cv_id = options['content-view-id']
-    try:
-        ContentView.add_repository({
-            u'id': cv_id,
-            u'organization-id': org_id,
-            u'repository-id': rhel_repo['id'],
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to add repository to content view\n{0}'.format(err.msg))
-    # Publish a new version of CV
-    try:
-        ContentView.publish({u'id': cv_id})
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to publish new version of content view\n{0}'
-            .format(err.msg)
-        )
-    # Get the version id
-    try:
-        cvv = ContentView.info({u'id': cv_id})['versions'][-1]
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to fetch content view info\n{0}'.format(err.msg))
-    # Promote version1 to next env
-    try:
-        ContentView.version_promote({
-            u'id': cvv['id'],
-            u'organization-id': org_id,
-            u'to-lifecycle-environment-id': env_id,
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to promote version to next environment\n{0}'
-            .format(err.msg)
-        )
-    # Create activation key if needed and associate content view with it
-    if options.get('activationkey-id') is None:
-        activationkey_id = make_activation_key({
-            u'content-view-id': cv_id,
-            u'lifecycle-environment-id': env_id,
-            u'organization-id': org_id,
-        })['id']
-    else:
-        activationkey_id = options['activationkey-id']
-        # Given activation key may have no (or different) CV associated.
-        # Associate activation key with CV just to be sure
+    graph = TaskGraph()
+    _add_org_steps(graph, options)
+
+    def manifest():
+        """Clone the manifest and copy it to the server."""
+        with manifests.clone() as clone:
+            upload_file(clone.content, clone.filename)
+        return clone.filename
+    graph.add('manifest', manifest)
+
+    def upload(manifest, org):
+        """Import the manifest in the organization."""
         try:
-            ActivationKey.update({
-                u'id': activationkey_id,
-                u'organization-id': org_id,
-                u'content-view-id': cv_id,
+            Subscription.upload({
+                u'file': manifest,
+                u'organization-id': org,
             })
         except CLIReturnCodeError as err:
             raise CLIFactoryError(
-                u'Failed to associate activation-key with CV\n{0}'
-                .format(err.msg)
-            )
+                u'Failed to upload manifest\n{0}'.format(err.msg))
+    graph.add('upload', upload, requires=('manifest', 'org'))
+
+    def repo(org, upload):
+        """Enable repo from Repository Set and fetch its ID."""
+        try:
+            RepositorySet.enable({
+                u'basearch': 'x86_64',
+                u'name': options['repository-set'],
+                u'organization-id': org,
+                u'product': options['product'],
+                u'releasever': options.get('releasever'),
+            })
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(
+                u'Failed to enable repository set\n{0}'.format(err.msg))
+        try:
+            return Repository.info({
+                u'name': options['repository'],
+                u'organization-id': org,
+                u'product': options['product'],
+            })['id']
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(
+                u'Failed to fetch repository info\n{0}'.format(err.msg))
+    graph.add('repo', repo, requires=('org', 'upload'))
+
+    def sync(org, repo):
+        """Synchronize the RH repository."""
+        try:
+            Repository.synchronize({
+                u'name': options['repository'],
+                u'organization-id': org,
+                u'product': options['product'],
+            })
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(
+                u'Failed to synchronize repository\n{0}'.format(err.msg))
+    graph.add('sync', sync, requires=('org', 'repo'))
+    _add_content_view_steps(graph, options)
     # Add subscription to activation-key
-    activationkey_add_subscription_to_repo({
-        u'organization-id': org_id,
-        u'activationkey-id': activationkey_id,
-        u'subscription': DEFAULT_SUBSCRIPTION_NAME,
-    })
+    graph.add(
+        'subscription',
+        lambda activation_key, org, upload:
+            activationkey_add_subscription_to_repo({
+                u'organization-id': org,
+                u'activationkey-id': activation_key,
+                u'subscription': DEFAULT_SUBSCRIPTION_NAME,
+            }),
+        requires=('activation_key', 'org', 'upload'),
+    )
+    results = _run_setup_graph(graph, 'setup_org_for_a_rh_repo')
     return {
-        u'activationkey-id': activationkey_id,
-        u'content-view-id': cv_id,
-        u'lifecycle-environment-id': env_id,
-        u'organization-id': org_id,
-        u'repository-id': rhel_repo['id'],
+        u'activationkey-id': results['activation_key'],
+        u'content-view-id': results['cv'],
+        u'lifecycle-environment-id': results['env'],
+        u'organization-id': results['org'],
+        u'repository-id': results['repo'],
     }
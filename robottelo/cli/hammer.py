@@ -4,7 +4,11 @@ import re
 import six
 
 from six.moves import zip
-from six.moves import cStringIO as StringIO
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
 
 
 def _csv_reader(output):
@@ -26,23 +30,98 @@ def _csv_reader(output):
     :return: generator that will yield a list of unicode string values.
 
     """
-    data = '\n'.join(output)
+    # The lines are read one at a time. Add back the line breaks removed when
+    # the output was split, they are part of values spanning several lines.
     if six.PY2:
-        data = data.encode('utf8')
-    handler = StringIO(data)
+        lines = ((line + u'\n').encode('utf8') for line in output)
+    else:
+        lines = (line + u'\n' for line in output)
 
-    for row in csv.reader(handler):
+    for row in csv.reader(lines):
         if six.PY2:
             yield [value.decode('utf8') for value in row]
         else:
             yield row
 
 
+class CSVHeader(object):
+    """The keys of the rows of a hammer CSV output.
+
+    Shared by all rows of the output, so that each row only stores its
+    values.
+
+    """
+    __slots__ = ('keys', 'index')
+
+    def __init__(self, keys):
+        self.keys = tuple(keys)
+        self.index = dict((key, i) for i, key in enumerate(self.keys))
+
+
+class CSVRow(Mapping):
+    """A read-only mapping of the keys of a :class:`CSVHeader` to the values
+    of a row.
+
+    Rows compare equal to the dictionaries returned by :func:`parse_csv` and
+    ``dict(row)`` converts them to one.
+
+    """
+    __slots__ = ('header', '_values')
+
+    def __init__(self, header, values):
+        self.header = header
+        self._values = tuple(values)
+
+    def __getitem__(self, key):
+        index = self.header.index[key]
+        if index >= len(self._values):
+            raise KeyError(key)
+        return self._values[index]
+
+    def __iter__(self):
+        return iter(self.header.keys[:len(self._values)])
+
+    def __len__(self):
+        return min(len(self.header.keys), len(self._values))
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+def _csv_keys(reader):
+    """Read the header of a CSV output and return the key names.
+
+    Spaces are converted to dashes "-". Return an empty list if there is no
+    output.
+
+    """
+    try:
+        return [header.replace(' ', '-').lower() for header in next(reader)]
+    except StopIteration:
+        return []
+
+
+def parse_csv_iter(output):
+    """Parse CSV output from Hammer CLI lazily.
+
+    :param output: An iterable of lines, for example the ``stdout`` of a
+        :class:`robottelo.ssh.SSHCommandResult` or a
+        :class:`robottelo.ssh.SSHCommandStream` reading the output as it is
+        received.
+    :return: A generator yielding a :class:`CSVRow` for each entry.
+
+    """
+    reader = _csv_reader(output)
+    header = CSVHeader(_csv_keys(reader))
+    for values in reader:
+        if len(values) > 0:
+            yield CSVRow(header, values)
+
+
 def parse_csv(output):
     """Parse CSV output from Hammer CLI and convert it to python dictionary."""
     reader = _csv_reader(output)
-    # Generate the key names, spaces will be converted to dashes "-"
-    keys = [header.replace(' ', '-').lower() for header in next(reader)]
+    keys = _csv_keys(reader)
     # For each entry, create a dict mapping each key with each value
     return [dict(zip(keys, values)) for values in reader if len(values) > 0]
 
@@ -111,6 +190,15 @@ def parse_help(output):
     return contents
 
 
+# A value of a single attribute collection, with or without its number:
+# " 1) value" or " value"
+INFO_LIST_VALUE_REGEX = re.compile(r'(?:\d+\)\s+(?=.))?(.*)$')
+# The number of the first property of an item in a numbered list:
+# " 1) Repo Name: repo1"
+INFO_ITEM_NUMBER_REGEX = re.compile(r'(\d+)\)')
+INFO_ITEM_NUMBERS_REGEX = re.compile(r'\d+\)')
+
+
 def parse_info(output):
     """Parse the info output and returns a dict mapping the values."""
     # info dictionary
@@ -122,70 +210,65 @@ def parse_info(output):
         # skip empty lines
         if line == '':
             continue
-        if line.startswith(' '):  # sub-properties are indented
-            # values are separated by ':' or '=>'
-            if line.find(':') != -1:
-                key, value = line.lstrip().split(":", 1)
-            elif line.find('=>') != -1:
-                key, value = line.lstrip().split(" =>", 1)
-            else:
-                key = value = None
-
-            if key is None and value is None:
-                # Parse single attribute collection properties
-                # Template
-                #  1) template1
-                #  2) template2
-                #
-                # or
-                # Template
-                #  template1
-                #  template2
-                match = re.match(r'\d+\)\s+(.+)$', line.lstrip())
-
-                if match is None:
-                    match = re.match(r'(.*)$', line.lstrip())
-
-                value = match.group(1)
-
-                if isinstance(contents[sub_prop], dict):
-                    contents[sub_prop] = []
-
-                contents[sub_prop].append(value)
-            else:
-                # some properties have many numbered values
-                # Example:
-                # Content:
-                #  1) Repo Name: repo1
-                #     URL:       /custom/4f84fc90-9ffa-...
-                #  2) Repo Name: puppet1
-                #     URL:       /custom/4f84fc90-9ffa-...
-                starts_with_number = re.match(r'(\d+)\)', key)
-                if starts_with_number:
-                    sub_num = int(starts_with_number.group(1))
-                    # no. 1) we need to change dict() to list()
-                    if sub_num == 1:
-                        contents[sub_prop] = []
-                    # remove number from key
-                    key = re.sub(r'\d+\)', '', key)
-                    # append empty dict to array
-                    contents[sub_prop].append({})
-
-                key = key.lstrip().replace(' ', '-').lower()
-
-                # add value to dictionary
-                if sub_num is not None:
-                    contents[sub_prop][-1][key] = value.lstrip()
-                else:
-                    contents[sub_prop][key] = value.lstrip()
-        else:
+        if line[0] != ' ':
             sub_num = None  # new property implies no sub property
-            key, value = line.lstrip().split(":", 1)
+            key, value = line.lstrip().split(':', 1)
             key = key.lstrip().replace(' ', '-').lower()
-            if value.lstrip() == '':  # 'key:' no value, new sub-property
+            value = value.lstrip()
+            if value == '':  # 'key:' no value, new sub-property
                 sub_prop = key
                 contents[sub_prop] = {}
             else:  # 'key: value' line
-                contents[key] = value.lstrip()
+                contents[key] = value
+            continue
+
+        # sub-properties are indented, values are separated by ':' or '=>'
+        line = line.lstrip()
+        if ':' in line:
+            key, value = line.split(':', 1)
+        elif '=>' in line:
+            key, value = line.split(' =>', 1)
+        else:
+            # Parse single attribute collection properties
+            # Template
+            #  1) template1
+            #  2) template2
+            #
+            # or
+            # Template
+            #  template1
+            #  template2
+            if isinstance(contents[sub_prop], dict):
+                contents[sub_prop] = []
+            contents[sub_prop].append(
+                INFO_LIST_VALUE_REGEX.match(line).group(1))
+            continue
+
+        # some properties have many numbered values
+        # Example:
+        # Content:
+        #  1) Repo Name: repo1
+        #     URL:       /custom/4f84fc90-9ffa-...
+        #  2) Repo Name: puppet1
+        #     URL:       /custom/4f84fc90-9ffa-...
+        if key[:1].isdigit():
+            starts_with_number = INFO_ITEM_NUMBER_REGEX.match(key)
+            if starts_with_number:
+                sub_num = int(starts_with_number.group(1))
+                # no. 1) we need to change dict() to list()
+                if sub_num == 1:
+                    contents[sub_prop] = []
+                # remove number from key
+                key = INFO_ITEM_NUMBERS_REGEX.sub('', key)
+                # append empty dict to array
+                contents[sub_prop].append({})
+
+        key = key.lstrip().replace(' ', '-').lower()
+
+        # add value to dictionary
+        if sub_num is not None:
+            contents[sub_prop][-1][key] = value.lstrip()
+        else:
+            contents[sub_prop][key] = value.lstrip()
 
     return contents
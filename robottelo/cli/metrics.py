@@ -0,0 +1,201 @@
+"""Latency metrics of the hammer commands run by the CLI wrappers.
+
+Every :meth:`robottelo.cli.base.Base.execute` call is recorded in the
+:class:`MetricsRegistry` returned by :func:`get_registry`, under its command
+path, like ``u'content-view version promote'``. For each path the registry
+keeps histograms of the wall time and of the ``real`` time printed by
+``time -p`` on the server, when ``[performance] time_hammer`` is enabled,
+along with the number of calls, failures and bytes sent and received.
+
+When ``[robottelo] hammer_metrics_path`` is set the percentiles of each
+command are written to ``<hammer_metrics_path>.json`` and
+``<hammer_metrics_path>.csv`` when the process exits. pytest-xdist workers
+append their name to the path.
+
+"""
+import atexit
+import csv
+import json
+import logging
+import os
+import threading
+
+from robottelo.config import settings
+from robottelo.histogram import Histogram
+
+logger = logging.getLogger(__name__)
+
+# Percentiles exported for each command
+PERCENTILES = (50, 90, 95, 99)
+
+# Columns of the CSV export
+CSV_COLUMNS = (
+    ['command', 'calls', 'failures', 'bytes_sent', 'bytes_received'] +
+    ['wall_total', 'wall_max'] +
+    ['wall_p{0}'.format(percent) for percent in PERCENTILES] +
+    ['real_p{0}'.format(percent) for percent in PERCENTILES]
+)
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def parse_real_time(stderr):
+    """Return the ``real`` time printed by ``time -p`` in ``stderr``.
+
+    :param str stderr: The standard error of the command.
+    :return: The number of seconds of the last ``real`` line, or ``None`` if
+        there is none.
+    :rtype: float
+
+    """
+    real_time = None
+    for line in (stderr or u'').splitlines():
+        if line.startswith('real'):
+            try:
+                real_time = float(line.split()[1])
+            except (IndexError, ValueError):
+                continue
+    return real_time
+
+
+class CommandMetrics(object):
+    """Measures of the calls of a single hammer command."""
+
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.wall_time = Histogram()
+        self.real_time = Histogram()
+
+    def to_dict(self):
+        """Return the counters and percentiles of the command."""
+        return {
+            'calls': self.calls,
+            'failures': self.failures,
+            'bytes_sent': self.bytes_sent,
+            'bytes_received': self.bytes_received,
+            'wall_total': self.wall_time.total,
+            'wall_max': self.wall_time.max,
+            'wall_percentiles': self.wall_time.percentiles(PERCENTILES),
+            'real_percentiles': self.real_time.percentiles(PERCENTILES),
+        }
+
+
+class MetricsRegistry(object):
+    """Thread-safe registry of :class:`CommandMetrics` by command path."""
+
+    def __init__(self):
+        self._commands = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._commands)
+
+    def record(self, command, wall_time, real_time=None, bytes_sent=0,
+               bytes_received=0, failed=False):
+        """Record a call of ``command``.
+
+        :param str command: The command path, like ``u'organization info'``.
+        :param float wall_time: The seconds the call took.
+        :param float real_time: The seconds hammer took on the server, if
+            known.
+        :param int bytes_sent: The size of the command sent.
+        :param int bytes_received: The size of its output.
+        :param bool failed: Whether the command failed.
+
+        """
+        with self._lock:
+            metrics = self._commands.get(command)
+            if metrics is None:
+                metrics = self._commands[command] = CommandMetrics()
+            metrics.calls += 1
+            metrics.failures += int(failed)
+            metrics.bytes_sent += bytes_sent
+            metrics.bytes_received += bytes_received
+            metrics.wall_time.add(wall_time)
+            if real_time is not None:
+                metrics.real_time.add(real_time)
+
+    def summary(self):
+        """Return the counters and percentiles of each command, the commands
+        taking the most time in total first.
+
+        :return: A list of ``(command, dict)`` tuples, see
+            :meth:`CommandMetrics.to_dict`.
+
+        """
+        with self._lock:
+            summary = [
+                (command, metrics.to_dict())
+                for command, metrics in self._commands.items()
+            ]
+        summary.sort(key=lambda item: (-item[1]['wall_total'], item[0]))
+        return summary
+
+    def export_json(self, path):
+        """Write the summary to ``path`` as JSON."""
+        with open(path, 'w') as handler:
+            json.dump(
+                [dict(command=command, **metrics)
+                 for command, metrics in self.summary()],
+                handler,
+                indent=2,
+                sort_keys=True,
+            )
+
+    def export_csv(self, path):
+        """Write the summary to ``path`` as CSV, one row per command."""
+        with open(path, 'w') as handler:
+            writer = csv.writer(handler)
+            writer.writerow(CSV_COLUMNS)
+            for command, metrics in self.summary():
+                writer.writerow(
+                    [command] +
+                    [metrics[column] for column in CSV_COLUMNS[1:7]] +
+                    [metrics['wall_percentiles'][percent]
+                     for percent in PERCENTILES] +
+                    [metrics['real_percentiles'][percent]
+                     for percent in PERCENTILES]
+                )
+
+    def reset(self):
+        """Forget all the recorded calls."""
+        with self._lock:
+            self._commands.clear()
+
+
+def get_registry():
+    """Return the registry shared by the CLI wrappers."""
+    global _registry  # pylint:disable=global-statement
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = MetricsRegistry()
+    return _registry
+
+
+def export(path):
+    """Write the shared registry to ``<path>.json`` and ``<path>.csv``."""
+    registry = get_registry()
+    registry.export_json(u'{0}.json'.format(path))
+    registry.export_csv(u'{0}.csv'.format(path))
+
+
+@atexit.register
+def _export_at_exit():
+    """Export the shared registry if ``hammer_metrics_path`` is set."""
+    if _registry is None or not len(_registry) or not settings.configured:
+        return
+    path = settings.hammer_metrics_path
+    if not path:
+        return
+    worker = os.environ.get('PYTEST_XDIST_WORKER')
+    if worker:
+        path = u'{0}-{1}'.format(path, worker)
+    try:
+        export(path)
+    except (IOError, OSError) as err:
+        logger.warning('Could not export the hammer metrics: %s', err)
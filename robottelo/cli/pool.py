@@ -0,0 +1,311 @@
+"""Pools of entities created ahead of time for the ``make_*`` factories.
+
+Tests often call factories like :func:`robottelo.cli.factory.make_org` only to
+get a fresh entity to work with. When a pool is configured for an entity, a
+background thread keeps up to ``size`` entities created in advance and the
+factory hands one out at once when called with default options, instead of
+waiting for hammer.
+
+Default options are the options identifying where the entity is created and
+nothing else, like ``{u'organization-id': 1}`` for a product, or no options
+at all for an organization. A pool is only filled once the same default
+options were asked for twice, so entities asked for once, like the first
+product of a fresh organization, do not leave unused entities behind.
+
+Entities created in an organization are only pooled when
+``[robottelo] entity_pool_scoped`` is enabled, then by organization. Most
+tests create their own organization and only a few entities in it, so it
+only pays off for tests sharing an organization. Pooled entities exist
+before the test asks for them, so do not use a pool for tests counting the
+entities of an organization.
+
+Pool sizes are read from ``[robottelo] entity_pool_sizes``, for example
+``org=5,location=3``, or set with :func:`configure`. Entities not handed out
+are deleted when the process exits, and a report of the time saved is
+logged.
+
+"""
+import atexit
+import logging
+import six
+import threading
+import time
+
+from collections import deque
+from functools import wraps
+from robottelo.config import settings
+from six.moves import queue
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for an entity being created when closing a pool
+CLOSE_TIMEOUT = 60
+
+_pools = {}
+_pools_lock = threading.Lock()
+_sizes = None  # entity name => pool size
+_scoped = False  # whether entities created in an organization are pooled
+
+
+class EntityPool(object):
+    """Entities of a kind created in a background thread.
+
+    :param str name: The name of the entity, like ``u'org'``.
+    :param create: Called with the options of an entity to create it.
+    :param delete: Called with an entity not handed out to delete it.
+    :param int size: The number of entities kept in advance for each set of
+        options.
+
+    """
+    def __init__(self, name, create, delete, size):
+        self.name = name
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self.created = 0
+        self.wait_avoided = 0.0
+        self._create = create
+        self._delete = delete
+        self._entities = {}  # options key => deque of (entity, seconds)
+        self._asked = {}  # options key => number of entities asked for
+        self._filling = set()  # options keys being filled
+        self._requests = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+
+    @staticmethod
+    def key(options):
+        """Return the key of the pool of entities created with
+        ``options``.
+        """
+        return tuple(sorted(
+            (name, six.text_type(value))
+            for name, value in (options or {}).items()
+        ))
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(entities) for entities in self._entities.values())
+
+    def take(self, options=None):
+        """Return an entity created with ``options``.
+
+        A pooled entity is returned if there is one, otherwise a new one is
+        created. In both cases the pool is filled again in the background,
+        unless the entities created with ``options`` were asked for only
+        once.
+
+        """
+        key = self.key(options)
+        entity = None
+        with self._lock:
+            self._asked[key] = asked = self._asked.get(key, 0) + 1
+            entities = self._entities.get(key)
+            if entities:
+                entity, seconds = entities.popleft()
+                self.hits += 1
+                self.wait_avoided += seconds
+            else:
+                self.misses += 1
+        if asked > 1:
+            self._fill(key, options)
+        if entity is None:
+            entity = self._create(dict(options or {}))
+        return entity
+
+    def _fill(self, key, options):
+        """Ask the background thread to fill the pool of ``key``."""
+        with self._lock:
+            if self._closed or key in self._filling:
+                return
+            self._filling.add(key)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._work,
+                    name=u'entity-pool-{0}'.format(self.name),
+                )
+                self._thread.daemon = True
+                self._thread.start()
+        self._requests.put((key, options))
+
+    def _work(self):
+        """Create entities until every requested pool is full."""
+        while True:
+            request = self._requests.get()
+            if request is None:
+                return
+            key, options = request
+            try:
+                while True:
+                    with self._lock:
+                        if (self._closed or
+                                len(self._entities.get(key, ())) >=
+                                self.size):
+                            break
+                    started = time.time()
+                    try:
+                        entity = self._create(dict(options or {}))
+                    except Exception as err:  # pylint:disable=broad-except
+                        logger.warning(
+                            'Could not create a pooled %s: %s', self.name, err)
+                        break
+                    with self._lock:
+                        self._entities.setdefault(key, deque()).append(
+                            (entity, time.time() - started))
+                        self.created += 1
+            finally:
+                with self._lock:
+                    self._filling.discard(key)
+
+    def close(self):
+        """Stop filling the pool and delete the entities not handed out.
+
+        :return: The number of entities deleted.
+
+        """
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            self._requests.put(None)
+            thread.join(CLOSE_TIMEOUT)
+        with self._lock:
+            entities = [
+                entity
+                for pooled in self._entities.values()
+                for entity, _ in pooled
+            ]
+            self._entities.clear()
+        deleted = 0
+        for entity in entities:
+            try:
+                self._delete(entity)
+                deleted += 1
+            except Exception as err:  # pylint:disable=broad-except
+                logger.warning(
+                    'Could not delete the pooled %s %s: %s',
+                    self.name, entity.get('id'), err)
+        return deleted
+
+
+def configure(sizes, scoped=False):
+    """Set the size of the pool of each entity.
+
+    :param dict sizes: Maps entity names, like ``u'org'`` for
+        :func:`robottelo.cli.factory.make_org`, to the number of entities to
+        create in advance. Entities not listed are not pooled.
+    :param bool scoped: Whether to pool the entities created in an
+        organization, like products, by organization.
+
+    """
+    global _sizes, _scoped  # pylint:disable=global-statement
+    _sizes = dict((name, int(size)) for name, size in sizes.items())
+    _scoped = scoped
+
+
+def get_size(name):
+    """Return the size of the pool of the ``name`` entity, 0 if it is not
+    pooled.
+    """
+    if _sizes is None:
+        if not settings.configured or not settings.entity_pool_sizes:
+            return 0
+        configure(
+            settings.entity_pool_sizes, settings.entity_pool_scoped)
+    return _sizes.get(name, 0)
+
+
+def get_pool(name, create, delete, scoped=False):
+    """Return the pool of the ``name`` entity, creating it if needed.
+
+    :param bool scoped: Whether the entity is created in an organization.
+    :return: An :class:`EntityPool`, or ``None`` if the entity is not
+        pooled.
+
+    """
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            size = get_size(name)
+            if size <= 0 or (scoped and not _scoped):
+                return None
+            pool = _pools[name] = EntityPool(name, create, delete, size)
+        return pool
+
+
+def pooled(cli_object, scope=()):
+    """Decorator handing out pooled entities from a ``make_*`` factory.
+
+    :param cli_object: The CLI class of the entity, used to delete the
+        entities not handed out.
+    :param scope: The names of the options identifying where the entity is
+        created. The factory takes the entity from the pool when called with
+        exactly these options. Entities with a scope are only pooled when
+        ``[robottelo] entity_pool_scoped`` is enabled.
+
+    """
+    scope = frozenset(scope)
+
+    def decorator(func):
+        """Wrap ``func`` to use the pool of its entity."""
+        name = func.__name__.replace('make_', '')
+
+        def delete(entity):
+            """Delete a pooled entity."""
+            cli_object.delete({u'id': entity['id']})
+
+        @wraps(func)
+        def pooled_function(options=None):
+            """Take the entity from the pool if ``options`` are the default
+            ones.
+            """
+            given = frozenset(
+                option for option, value in (options or {}).items()
+                if value is not None
+            )
+            if given != scope:
+                return func(options)
+            pool = get_pool(name, func, delete, scoped=bool(scope))
+            if pool is None:
+                return func(options)
+            return pool.take(dict(
+                (option, options[option]) for option in given))
+
+        return pooled_function
+
+    return decorator
+
+
+def report(pools=None):
+    """Return a table of the entities handed out by each pool.
+
+    :param pools: The :class:`EntityPool` to report on, defaults to all the
+        pools in use.
+
+    """
+    if pools is None:
+        with _pools_lock:
+            pools = list(_pools.values())
+    lines = [u'{0:<24} {1:>6} {2:>8} {3:>8} {4:>13}'.format(
+        u'Entity', u'Hits', u'Misses', u'Created', u'Wait avoided')]
+    for pool in sorted(pools, key=lambda pool: pool.name):
+        lines.append(u'{0:<24} {1:>6} {2:>8} {3:>8} {4:>12.1f}s'.format(
+            pool.name, pool.hits, pool.misses, pool.created,
+            pool.wait_avoided))
+    return u'\n'.join(lines)
+
+
+@atexit.register
+def close_all():
+    """Close the pools, deleting the entities not handed out."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    if not pools:
+        return
+    logger.info('Entity pools:\n%s', report(pools))
+    for pool in pools:
+        deleted = pool.close()
+        if deleted:
+            logger.debug('Deleted %s unused pooled %s', deleted, pool.name)
@@ -31,33 +31,19 @@ class Repository(Base):
     command_requires_org = True
 
     @classmethod
-    def create(cls, options=None):
-        cls.command_requires_org = False
-
-        try:
-            result = super(Repository, cls).create(options)
-        finally:
-            cls.command_requires_org = True
-
-        return result
-
-    @classmethod
-    def info(cls, options=None):
-        cls.command_requires_org = False
-
-        try:
-            result = super(Repository, cls).info(options)
-        finally:
-            cls.command_requires_org = True
-
-        return result
+    def _requires_org(cls, command_sub):
+        """The ``create`` and ``info`` subcommands do not require the
+        ``organization-id`` option.
+        """
+        if command_sub in ('create', 'info'):
+            return False
+        return super(Repository, cls)._requires_org(command_sub)
 
     @classmethod
     def synchronize(cls, options, return_raw_response=None):
         """Synchronizes a repository."""
-        cls.command_sub = 'synchronize'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command('synchronize', options),
             output_format='csv',
             ignore_stderr=True,
             return_raw_response=return_raw_response,
@@ -66,9 +52,8 @@ class Repository(Base):
     @classmethod
     def upload_content(cls, options):
         """Upload content to repository."""
-        cls.command_sub = 'upload-content'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command('upload-content', options),
             output_format='csv',
             ignore_stderr=True,
         )
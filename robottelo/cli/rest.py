@@ -0,0 +1,299 @@
+"""REST backend for the CRUD commands of the CLI wrappers.
+
+The ``create``, ``info``, ``list``, ``update`` and ``delete`` methods of
+:class:`robottelo.cli.base.Base` can call the Foreman and Katello API
+directly instead of running hammer on the server. Requests are sent through a
+``requests.Session`` per thread and user, which keeps its connections open, so
+creating an entity costs one HTTP request instead of starting hammer twice
+over SSH. They are sent as the user hammer would run as, so commands of a
+:meth:`robottelo.cli.base.Base.with_user` wrapper keep their permissions.
+
+The results are shaped like the output of :func:`robottelo.cli.hammer.
+parse_csv` and :func:`robottelo.cli.hammer.parse_info`: underscores in the
+keys become dashes, values are strings and booleans are ``yes`` or ``no``.
+The keys are the API attribute names, which match the hammer field names for
+the common fields (``id``, ``name``, ``label``, ``description`` and the
+``*-id`` fields) but not for all of them.
+
+The backend is meant for setting up entities used by tests which do not
+exercise hammer itself, for example::
+
+    with rest.enabled():
+        org = make_org()
+        product = make_product({u'organization-id': org['id']})
+
+It is enabled for the whole process while the block runs, so the threads
+creating entities for the test, like the workers of
+:class:`robottelo.cli.dag.TaskGraph` and the threads filling the pools of
+:mod:`robottelo.cli.pool`, use it too. Commands whose entity has no known
+endpoint, and commands using options that hammer resolves itself, such as
+entity names (``--organization``), still run hammer.
+
+"""
+import logging
+import re
+import requests
+import six
+import threading
+
+from contextlib import contextmanager
+from robottelo.cli import hammer
+from robottelo.config import settings
+
+logger = logging.getLogger(__name__)
+
+# API path and parameter wrapper of each hammer command. Foreman expects the
+# attributes of an entity under a key named after it; Katello does not.
+ENDPOINTS = {
+    'activation-key': ('katello/api/v2/activation_keys', None),
+    'architecture': ('api/v2/architectures', 'architecture'),
+    'content-view': ('katello/api/v2/content_views', None),
+    'domain': ('api/v2/domains', 'domain'),
+    'environment': ('api/v2/environments', 'environment'),
+    'gpg': ('katello/api/v2/gpg_keys', None),
+    'host-collection': ('katello/api/v2/host_collections', None),
+    'lifecycle-environment': ('katello/api/v2/environments', None),
+    'location': ('api/v2/locations', 'location'),
+    'medium': ('api/v2/media', 'medium'),
+    'model': ('api/v2/models', 'model'),
+    'organization': ('katello/api/v2/organizations', 'organization'),
+    'os': ('api/v2/operatingsystems', 'operatingsystem'),
+    'partition-table': ('api/v2/ptables', 'ptable'),
+    'product': ('katello/api/v2/products', None),
+    'repository': ('katello/api/v2/repositories', None),
+    'role': ('api/v2/roles', 'role'),
+    'subnet': ('api/v2/subnets', 'subnet'),
+    'sync-plan': (
+        'katello/api/v2/organizations/{organization_id}/sync_plans', None),
+    'user': ('api/v2/users', 'user'),
+    'user-group': ('api/v2/usergroups', 'usergroup'),
+}
+
+# Options only understood by hammer, in addition to the entity names, for
+# example ``--organization`` or ``--content-views``.
+HAMMER_OPTIONS = frozenset(('prior', 'puppet-classes'))
+
+# Hammer options renamed in the API
+RENAMED_OPTIONS = {
+    'per-page': 'per_page',
+}
+
+# Path parameters in the endpoints
+PATH_PARAMETER_REGEX = re.compile(r'{(\w+)}')
+
+_state = threading.local()
+_depth = 0  # number of enabled blocks running
+_depth_lock = threading.Lock()
+
+
+class RESTError(Exception):
+    """Indicates that an API request failed.
+
+    :param return_code: The hammer exit status matching the HTTP error.
+    :param message: The error returned by the server.
+
+    """
+    def __init__(self, return_code, message):
+        super(RESTError, self).__init__(message)
+        self.return_code = return_code
+        self.message = message
+
+
+@contextmanager
+def enabled():
+    """Use the REST backend in all threads within a ``with`` block.
+
+    Blocks can be nested.
+
+    """
+    global _depth  # pylint:disable=global-statement
+    with _depth_lock:
+        _depth += 1
+    try:
+        yield
+    finally:
+        with _depth_lock:
+            _depth -= 1
+
+
+def is_enabled():
+    """Whether the REST backend is used."""
+    return _depth > 0
+
+
+def get_session(auth=None):
+    """Return the ``requests.Session`` of the current thread for ``auth``.
+
+    :param auth: A tuple of the user name and password sending the requests,
+        defaults to the server credentials.
+
+    """
+    if auth is None:
+        auth = settings.server.get_credentials()
+    auth = tuple(auth)
+    sessions = getattr(_state, 'sessions', None)
+    if sessions is None:
+        sessions = _state.sessions = {}
+    session = sessions.get(auth)
+    if session is None:
+        session = requests.Session()
+        session.auth = auth
+        session.verify = False
+        session.headers.update({
+            'Accept': 'application/json',
+            'Content-Type': 'application/json',
+        })
+        sessions[auth] = session
+    return session
+
+
+def _is_name_option(key):
+    """Whether ``key`` is an option for entity names resolved by hammer."""
+    return (
+        key in HAMMER_OPTIONS or
+        key in ENDPOINTS or
+        key.endswith('s') and key[:-1] in ENDPOINTS
+    )
+
+
+def handles(command_base, command_sub, options=None):
+    """Whether the REST backend runs a command.
+
+    :return: ``True`` if the backend is enabled, ``command_base`` has an
+        endpoint and all ``options`` can be sent to it.
+
+    """
+    if not is_enabled() or command_base not in ENDPOINTS:
+        return False
+    options = options or {}
+    params = _api_params(options)
+    required = PATH_PARAMETER_REGEX.findall(ENDPOINTS[command_base][0])
+    if command_sub in ('info', 'update', 'delete'):
+        # Hammer can find the entity by name, the API needs its id
+        required.append('id')
+    return (
+        not any(_is_name_option(key) for key in options) and
+        all(name in params for name in required)
+    )
+
+
+def _api_params(options):
+    """Convert hammer ``options`` to API parameters.
+
+    Options are skipped the same way as by
+    :meth:`robottelo.cli.base.Base._construct_command`, and comma separated
+    lists of ids are split.
+
+    """
+    params = {}
+    for key, value in options.items():
+        if value is None or value is False:
+            continue
+        if key.endswith('-ids') and isinstance(value, six.string_types):
+            value = [item for item in value.split(',') if item]
+        params[RENAMED_OPTIONS.get(key, key.replace('-', '_'))] = value
+    return params
+
+
+def _to_hammer(value):
+    """Convert an API ``value`` to the value hammer would show."""
+    if isinstance(value, dict):
+        return dict(
+            (key.replace('_', '-'), _to_hammer(item))
+            for key, item in value.items()
+        )
+    if isinstance(value, list):
+        # Hammer shows the names of associated entities
+        return [
+            item['name']
+            if isinstance(item, dict) and 'name' in item
+            else _to_hammer(item)
+            for item in value
+        ]
+    if value is None:
+        return u''
+    if isinstance(value, bool):
+        return u'yes' if value else u'no'
+    return six.text_type(value)
+
+
+def _to_hammer_row(entity):
+    """Convert an API ``entity`` to a row of a hammer CSV list."""
+    return dict(
+        (key, value)
+        for key, value in _to_hammer(entity).items()
+        if not isinstance(value, (dict, list))
+    )
+
+
+def _request(method, path, params, wrapper=None, query=False, auth=None):
+    """Send a request to the API and return the decoded response.
+
+    :param auth: The user name and password sending the request, see
+        :func:`get_session`.
+    :raises RESTError: If the server returns an error.
+
+    """
+    url = '{0}/{1}'.format(settings.server.get_url(), path)
+    if wrapper is not None:
+        params = {wrapper: params}
+    logger.debug('>>> [%s] %s %s', method, url, params)
+    if query:
+        response = get_session(auth).request(method, url, params=params)
+    else:
+        response = get_session(auth).request(method, url, json=params)
+    logger.debug('<<< %s %s', response.status_code, response.text)
+    if response.status_code >= 400:
+        raise RESTError(
+            65 if response.status_code < 500 else 70, response.text)
+    if not response.content:
+        return {}
+    return response.json()
+
+
+def _hammer_stdout(command_base, message):
+    """Return the ``stdout`` lines of a hammer command printing ``message``
+    about a ``command_base`` entity, like ``Organization updated``.
+    """
+    entity = command_base.replace('-', ' ').capitalize()
+    return [u'{0} {1}'.format(entity, message), u'']
+
+
+def execute(command_base, command_sub, options=None, auth=None):
+    """Run a ``command_base command_sub`` command through the API.
+
+    Use :func:`handles` to check if the command can be run first.
+
+    :param auth: A tuple of the user name and password running the command,
+        like the ones hammer is run with, defaults to the server
+        credentials.
+    :return: The same value the matching :class:`robottelo.cli.base.Base`
+        method returns when running hammer.
+    :raises RESTError: If the server returns an error.
+
+    """
+    path, wrapper = ENDPOINTS[command_base]
+    params = _api_params(options or {})
+    path = path.format(**params)
+    for name in PATH_PARAMETER_REGEX.findall(ENDPOINTS[command_base][0]):
+        del params[name]
+    if command_sub == 'create':
+        return _to_hammer(_request('POST', path, params, wrapper, auth=auth))
+    if command_sub == 'list':
+        results = _request(
+            'GET', path, params, query=True, auth=auth)['results']
+        return [_to_hammer_row(entity) for entity in results]
+    entity_path = u'{0}/{1}'.format(path, params.pop('id'))
+    if command_sub == 'info':
+        return _to_hammer(_request(
+            'GET', entity_path, params, query=True, auth=auth))
+    if command_sub == 'update':
+        _request('PUT', entity_path, params, wrapper, auth=auth)
+        # Updates run hammer with the CSV output, see Base.update
+        return hammer.parse_csv(
+            [u'Message'] + _hammer_stdout(command_base, u'updated'))
+    if command_sub == 'delete':
+        _request('DELETE', entity_path, params, auth=auth)
+        return _hammer_stdout(command_base, u'deleted')
+    raise ValueError(
+        u'Unsupported command: {0} {1}'.format(command_base, command_sub))
@@ -0,0 +1,181 @@
+"""Authenticated hammer sessions reused by the hammer commands.
+
+By default every hammer command gets ``-u user -p password`` and the server
+authenticates each of them from scratch. When sessions are enabled, a
+``hammer auth login`` is done once per server and user, and the following
+commands run without credentials, using the session hammer saved.
+
+Hammer keeps a single session per server in the home directory of the system
+user running it, so each Foreman user gets its own home directory under
+:data:`SESSIONS_DIR`, configured to use sessions. Commands are run with
+``HOME`` pointing to it.
+
+A new login is done when the password used for a user changes, and when a
+command fails because the session expired, in which case the command is run
+again.
+
+Test classes opt in by setting ``use_hammer_sessions = True``, see
+:class:`robottelo.test.CLITestCase`. Other code can use :func:`enable` and
+:func:`disable`.
+
+"""
+import hashlib
+import logging
+import threading
+
+from robottelo.config import settings
+from six.moves import shlex_quote
+
+logger = logging.getLogger(__name__)
+
+# Directory on the server holding the home directory of each user
+SESSIONS_DIR = u'$HOME/.robottelo/hammer-sessions'
+
+# Creates the home directory of a user, configures hammer to use sessions
+# and logs in
+LOGIN_SCRIPT = u"""mkdir -p {home}/.hammer/cli.modules.d && \\
+printf ':foreman:\\n  :use_sessions: true\\n' \\
+    > {home}/.hammer/cli.modules.d/foreman.yml && \\
+HOME={home} LANG={locale} hammer auth login basic -u {user} -p {password}"""
+
+# Messages printed by hammer when a session can not be used anymore
+EXPIRED_SESSION_MESSAGES = (
+    u'Session has expired',
+    u'Invalid username or password',
+    u'Unable to authenticate user',
+)
+
+# Passwords used to log in by (hostname, user)
+_logins = {}
+_logins_lock = threading.Lock()
+# Locks serializing the logins of a (hostname, user)
+_login_locks = {}
+_enabled = False
+
+
+class HammerSessionError(Exception):
+    """Indicates that ``hammer auth login`` failed.
+
+    :param return_code: The return code of the login.
+    :param message: The error printed by hammer.
+
+    """
+    def __init__(self, return_code, message):
+        super(HammerSessionError, self).__init__(message)
+        self.return_code = return_code
+        self.message = message
+
+
+def home(user):
+    """Return the home directory used to run hammer as ``user``."""
+    return u'{0}/{1}'.format(
+        SESSIONS_DIR, hashlib.sha1(user.encode('utf-8')).hexdigest())
+
+
+def environment(user):
+    """Return the variables to set to run hammer with the session of
+    ``user``.
+    """
+    return u'HOME={0}'.format(home(user))
+
+
+def is_expired(response):
+    """Whether a hammer command failed because its session expired.
+
+    :param robottelo.ssh.SSHCommandResult response: The command result.
+
+    """
+    if response.return_code == 0:
+        return False
+    stderr = response.stderr
+    if isinstance(stderr, bytes):
+        stderr = stderr.decode('utf-8', 'replace')
+    return any(message in (stderr or u'')
+               for message in EXPIRED_SESSION_MESSAGES)
+
+
+def _login_lock(key):
+    """Return the lock serializing the logins of ``key``."""
+    with _logins_lock:
+        return _login_locks.setdefault(key, threading.Lock())
+
+
+def login(user, password, run_remote, hostname=None, force=False):
+    """Log in as ``user`` unless already done with the same password.
+
+    :param str user: The Foreman user.
+    :param str password: The password of ``user``.
+    :param run_remote: Called with the login script to run it on the server,
+        returns a :class:`robottelo.ssh.SSHCommandResult`.
+    :param str hostname: The server, defaults to ``server.hostname`` from the
+        configuration.
+    :param bool force: Whether to log in even if already done.
+    :raises robottelo.cli.session.HammerSessionError: If the login fails.
+
+    """
+    key = (hostname or settings.server.hostname, user)
+    with _login_lock(key):
+        if not force and _logins.get(key) == password:
+            return
+        logger.debug('Starting a hammer session for %s on %s', user, key[0])
+        response = run_remote(LOGIN_SCRIPT.format(
+            home=home(user),
+            locale=settings.locale,
+            user=shlex_quote(user),
+            password=shlex_quote(password),
+        ))
+        if response.return_code != 0:
+            _logins.pop(key, None)
+            stderr = response.stderr
+            if isinstance(stderr, bytes):
+                stderr = stderr.decode('utf-8', 'replace')
+            raise HammerSessionError(response.return_code, stderr)
+        _logins[key] = password
+
+
+def run(user, password, execute, run_remote, hostname=None):
+    """Call ``execute`` with a hammer session for ``user``.
+
+    :param execute: Runs the hammer command, returns a
+        :class:`robottelo.ssh.SSHCommandResult`. It is called again after a
+        new login if the session expired.
+    :param run_remote: Used to run the login script, see :func:`login`.
+    :return: The result of ``execute``.
+
+    """
+    login(user, password, run_remote, hostname)
+    response = execute()
+    if is_expired(response):
+        logger.debug('The hammer session of %s expired', user)
+        login(user, password, run_remote, hostname, force=True)
+        response = execute()
+    return response
+
+
+def invalidate(user=None, hostname=None):
+    """Forget the logins of ``user``, or of all users, so the next command
+    logs in again.
+    """
+    with _logins_lock:
+        for key in list(_logins):
+            if ((user is None or key[1] == user) and
+                    (hostname is None or key[0] == hostname)):
+                del _logins[key]
+
+
+def enable():
+    """Run the hammer commands with authenticated sessions."""
+    global _enabled  # pylint:disable=global-statement
+    _enabled = True
+
+
+def disable():
+    """Pass the credentials to every hammer command again."""
+    global _enabled  # pylint:disable=global-statement
+    _enabled = False
+    invalidate()
+
+
+def is_enabled():
+    """Whether the hammer commands run with authenticated sessions."""
+    return _enabled
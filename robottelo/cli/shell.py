@@ -0,0 +1,382 @@
+"""Persistent ``hammer shell`` sessions used to run hammer commands.
+
+Starting ``hammer`` loads Ruby and all hammer plugins, which usually takes
+longer than the API request done by the command. A :class:`HammerShell` keeps
+a ``hammer shell`` process running on a persistent SSH channel and sends it
+one command at a time, so that the startup cost is paid once per session.
+
+The shell runs on a pseudo-terminal, so that hammer flushes its output after
+each line. A terminal would merge ``stderr`` into ``stdout``, so ``stderr``
+is redirected to a named pipe read on a second channel of the same
+connection.
+
+The end of the output of a command is found by sending a sentinel right after
+it: the sentinel is an unknown sub-command, so hammer answers it with an
+error message on ``stderr`` and a new prompt. The command is done once that
+error and the prompts following the command and the sentinel were printed.
+
+``hammer shell`` does not tell the exit status of the commands, so the
+return code fails closed: a command fails with :data:`ERROR_RETURN_CODE` if
+it printed anything on ``stderr``, an error message on ``stdout``, or an
+output which does not match the requested format. The specific codes of
+hammer, like 65 or 128, are not known, so tests checking them must run
+hammer itself.
+
+Test classes opt in by setting ``use_hammer_shell = True``, see
+:class:`robottelo.test.CLITestCase`. Other code can use :func:`enable` and
+:func:`disable`.
+
+"""
+import atexit
+import codecs
+import json
+import logging
+import select
+import socket
+import threading
+import time
+import uuid
+
+from robottelo import ssh
+from robottelo.cli import hammer
+from robottelo.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Prompt printed by ``hammer shell`` when it is waiting for a command
+PROMPT = u'hammer> '
+
+# Seconds to wait for ``hammer shell`` to start
+START_TIMEOUT = 120
+
+# Return code used when a command fails. Hammer uses several codes and they
+# are not available on a shell session.
+ERROR_RETURN_CODE = 1
+
+# Beginning of the lines hammer prints when a command fails
+ERROR_PREFIXES = (u'Error:', u'Could not ')
+
+# Directory of the named pipes receiving the stderr of the shells
+FIFO_DIR = u'/tmp'
+
+# Sessions by (hostname, username), see :func:`get_session`
+_sessions = {}
+_sessions_lock = threading.Lock()
+_enabled = False
+
+
+class HammerShellError(Exception):
+    """Indicates that the ``hammer shell`` process stopped unexpectedly."""
+
+
+class HammerShell(object):
+    """A ``hammer shell`` process running on a dedicated SSH connection.
+
+    Commands are serialized: a session runs one command at a time. The
+    process is started on first use and restarted when it is found dead
+    before a command is sent. If it dies while a command is running,
+    :class:`HammerShellError` is raised and the next command starts a new
+    process, as the command may or may not have been done.
+
+    :param str hostname: The server running hammer.
+    :param str user: The Foreman user to run the commands as.
+    :param str password: The password of ``user``.
+
+    """
+
+    def __init__(self, hostname, user, password):
+        self.hostname = hostname
+        self.user = user
+        self.password = password
+        self._client = None
+        self._channel = None
+        self._error_channel = None
+        self._decoder = None
+        self._error_decoder = None
+        self._buffer = u''
+        self._error_buffer = u''
+        self._lock = threading.Lock()
+
+    @property
+    def alive(self):
+        """Whether the ``hammer shell`` process is running."""
+        return (
+            self._channel is not None and
+            not self._channel.closed and
+            not self._channel.exit_status_ready()
+        )
+
+    def _open_channels(self, fifo):
+        """Connect to the server and return a channel with a terminal and a
+        channel reading the named pipe ``fifo``.
+        """
+        hostname, username, key_filename = ssh._connection_defaults(
+            self.hostname)
+        self._client = ssh._connect(hostname, username, key_filename)
+        transport = self._client.get_transport()
+        channel = transport.open_session()
+        channel.exec_command(u'mkfifo -m 600 {0}'.format(fifo))
+        if channel.recv_exit_status() != 0:
+            raise HammerShellError(
+                u'Could not create the named pipe {0}'.format(fifo))
+        error_channel = transport.open_session()
+        error_channel.exec_command(u'cat {0}; rm -f {0}'.format(fifo))
+        channel = transport.open_session()
+        # A terminal makes hammer flush its output after each line. A wide
+        # one keeps long command lines from being wrapped.
+        channel.get_pty(term='dumb', width=10000)
+        return channel, error_channel
+
+    def start(self):
+        """Start the ``hammer shell`` process and wait for its prompt."""
+        self.close()
+        fifo = u'{0}/robottelo-hammer-shell-{1}'.format(
+            FIFO_DIR, uuid.uuid4().hex)
+        self._channel, self._error_channel = self._open_channels(fifo)
+        self._decoder = codecs.getincrementaldecoder('utf-8')('replace')
+        self._error_decoder = codecs.getincrementaldecoder('utf-8')('replace')
+        self._buffer = self._error_buffer = u''
+        self._channel.exec_command(
+            u'stty -echo; LANG={0} hammer -u {1} -p {2} shell 2>{3}'.format(
+                settings.locale, self.user, self.password, fifo
+            ).encode('utf-8')
+        )
+        self._read_until(
+            lambda text, errors: text.endswith(PROMPT), START_TIMEOUT)
+        self._buffer = self._error_buffer = u''
+        logger.debug(
+            'Started hammer shell on %s for %s', self.hostname, self.user)
+
+    def close(self):
+        """Stop the ``hammer shell`` process."""
+        if self._channel is not None:
+            self._channel.close()
+            self._channel = None
+        if self._error_channel is not None:
+            self._error_channel.close()
+            self._error_channel = None
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    def _read_until(self, predicate, timeout=None):
+        """Read output until ``predicate(output, errors)`` returns ``True``.
+
+        :param predicate: Called with all the ``stdout`` and ``stderr``
+            output read since the buffers were last cleared.
+        :param timeout: Seconds to wait for ``predicate`` to be true. ``None``
+            waits indefinitely.
+        :raises socket.timeout: If ``timeout`` expires.
+        :raises HammerShellError: If the process stops.
+
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while not predicate(self._buffer, self._error_buffer):
+            if self._channel.recv_ready():
+                self._buffer += self._decoder.decode(
+                    self._channel.recv(ssh.CHUNK_SIZE))
+                continue
+            if self._error_channel.recv_ready():
+                self._error_buffer += self._error_decoder.decode(
+                    self._error_channel.recv(ssh.CHUNK_SIZE))
+                continue
+            if self._channel.closed or self._channel.exit_status_ready():
+                raise HammerShellError(
+                    u'hammer shell stopped, output: {0}{1}'.format(
+                        self._buffer, self._error_buffer))
+            wait = None
+            if deadline is not None:
+                wait = deadline - time.time()
+                if wait <= 0:
+                    raise socket.timeout(
+                        'hammer shell did not answer in {0} seconds'
+                        .format(timeout)
+                    )
+            select.select([self._channel, self._error_channel], [], [], wait)
+
+    def run(self, command, timeout=None):
+        """Run a hammer ``command`` and return its output.
+
+        :param str command: The hammer command and its options, without the
+            ``hammer`` executable and the global options.
+        :param timeout: Seconds to wait for the command to finish. ``None``
+            waits indefinitely. On timeout the process is stopped.
+        :return: A ``(output, errors)`` tuple of what the command printed on
+            ``stdout`` and ``stderr``.
+        :raises socket.timeout: If ``timeout`` expires.
+        :raises HammerShellError: If the process stops while running the
+            command.
+
+        """
+        with self._lock:
+            if not self.alive:
+                self.start()
+            sentinel = u'robottelo-end-{0}'.format(uuid.uuid4().hex)
+            self._buffer = self._error_buffer = u''
+            self._channel.sendall(
+                u'{0}\n{1}\n'.format(command, sentinel).encode('utf-8'))
+
+            def done(text, errors):
+                """Check if the sentinel error and the prompts after the
+                command and the sentinel were printed.
+                """
+                return (
+                    sentinel in errors and
+                    errors.endswith(u'\n') and
+                    text.count(PROMPT) >= 2 and
+                    text.endswith(PROMPT)
+                )
+
+            try:
+                self._read_until(done, timeout)
+            except (socket.timeout, HammerShellError):
+                self.close()
+                raise
+            text, errors = self._buffer, self._error_buffer
+            self._buffer = self._error_buffer = u''
+        return parse_output(text, errors, command, sentinel)
+
+
+def parse_output(text, errors, command, sentinel):
+    """Extract the output of ``command`` from a ``hammer shell`` transcript.
+
+    :param str text: Everything printed on ``stdout`` after ``command`` and
+        ``sentinel`` were sent.
+    :param str errors: Everything printed on ``stderr`` meanwhile.
+    :return: A ``(output, errors)`` tuple of what ``command`` printed on
+        ``stdout`` and ``stderr``.
+
+    """
+    text = text.replace(u'\r\n', u'\n').replace(u'\r', u'')
+    # The output ends with the prompts printed after the command and after
+    # the sentinel
+    end = text.rfind(PROMPT, 0, len(text) - len(PROMPT))
+    lines = text[:max(end, 0)].split(u'\n')
+    # Some readline versions echo the input even with ``stty -echo``
+    if lines and lines[0].strip() == command.strip():
+        lines = lines[1:]
+    output = u'\n'.join(lines)
+    errors = errors.replace(u'\r\n', u'\n')
+    # The error about the sentinel and the lines following it are not
+    # printed by the command
+    errors = errors[:errors.rfind(u'\n', 0, errors.find(sentinel)) + 1]
+    return output, errors
+
+
+def _is_valid_output(output, output_format):
+    """Whether ``output`` is a well-formed output in ``output_format``.
+
+    CSV outputs must have as many values in each row as in the header, and
+    JSON outputs must be valid JSON. Other outputs are not checked.
+
+    """
+    if not output.strip():
+        return True
+    if output_format == 'csv':
+        rows = [
+            row for row in hammer._csv_reader(output.strip().split(u'\n'))
+            if len(row) > 0
+        ]
+        return all(len(row) == len(rows[0]) for row in rows)
+    if output_format == 'json':
+        try:
+            json.loads(output)
+        except ValueError:
+            return False
+    return True
+
+
+def get_return_code(output, errors, output_format=None):
+    """Return the return code of a command printing ``output`` and
+    ``errors``.
+
+    ``hammer shell`` does not tell the exit status of the commands, so the
+    command is considered failed unless it printed nothing on ``stderr``,
+    no error message on ``stdout`` and a well-formed ``output``.
+
+    :return: ``0`` or :data:`ERROR_RETURN_CODE`.
+
+    """
+    if errors.strip():
+        return ERROR_RETURN_CODE
+    if any(line.startswith(ERROR_PREFIXES) for line in output.split(u'\n')):
+        return ERROR_RETURN_CODE
+    if not _is_valid_output(output, output_format):
+        return ERROR_RETURN_CODE
+    return 0
+
+
+def get_session(user, password, hostname=None):
+    """Return the session of ``user`` on ``hostname``, creating it if needed.
+
+    :param str hostname: The server running hammer. If it is ``None``
+        ``server.hostname`` from the configuration file is used.
+
+    """
+    if hostname is None:
+        hostname = settings.server.hostname
+    with _sessions_lock:
+        session = _sessions.get((hostname, user))
+        if session is None or session.password != password:
+            if session is not None:
+                session.close()
+            session = HammerShell(hostname, user, password)
+            _sessions[(hostname, user)] = session
+        return session
+
+
+def close_all():
+    """Stop all ``hammer shell`` processes."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+atexit.register(close_all)
+
+
+def enable():
+    """Run hammer commands on ``hammer shell`` sessions."""
+    global _enabled  # pylint:disable=global-statement
+    _enabled = True
+
+
+def disable():
+    """Stop using ``hammer shell`` sessions and stop their processes."""
+    global _enabled  # pylint:disable=global-statement
+    _enabled = False
+    close_all()
+
+
+def is_enabled():
+    """Whether hammer commands are run on ``hammer shell`` sessions."""
+    return _enabled
+
+
+def command(cmd, user, password, output_format=None, timeout=None):
+    """Run a hammer command on the session of ``user``.
+
+    Replacement for running ``hammer`` with :func:`robottelo.ssh.command`.
+    The return code is guessed by :func:`get_return_code`.
+
+    :param str cmd: The hammer command and its options.
+    :param str output_format: The hammer output format, if any.
+    :rtype: robottelo.ssh.SSHCommandResult
+
+    """
+    if output_format:
+        cmd = u'--output={0} {1}'.format(output_format, cmd)
+    logger.debug('>>> [hammer shell] %s', cmd)
+    output, errors = get_session(user, password).run(cmd, timeout)
+    return_code = get_return_code(output, errors, output_format)
+    if return_code != 0 and not errors.strip():
+        logger.warning(
+            u'hammer shell command "%s" failed, its output is:\n%s',
+            cmd, output)
+    return ssh._command_result(
+        output.encode('utf-8'),
+        errors.encode('utf-8'),
+        return_code,
+        output_format,
+    )
@@ -30,23 +30,10 @@ class SyncPlan(Base):
     command_requires_org = True
 
     @classmethod
-    def create(cls, options=None):
-        cls.command_requires_org = False
-
-        try:
-            result = super(SyncPlan, cls).create(options)
-        finally:
-            cls.command_requires_org = True
-
-        return result
-
-    @classmethod
-    def info(cls, options=None):
-        cls.command_requires_org = False
-
-        try:
-            result = super(SyncPlan, cls).info(options)
-        finally:
-            cls.command_requires_org = True
-
-        return result
+    def _requires_org(cls, command_sub):
+        """The ``create`` and ``info`` subcommands do not require the
+        ``organization-id`` option.
+        """
+        if command_sub in ('create', 'info'):
+            return False
+        return super(SyncPlan, cls)._requires_org(command_sub)
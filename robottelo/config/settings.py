@@ -127,8 +127,12 @@ class ServerSettings(FeatureSettings):
         self.hostname = None
         self.port = None
         self.scheme = None
+        self.ssh_backend = None
         self.ssh_key = None
+        self.ssh_keepalive_interval = None
         self.ssh_password = None
+        self.ssh_pool_idle_timeout = None
+        self.ssh_pool_size = None
         self.ssh_username = None
 
     def read(self, reader):
@@ -140,8 +144,14 @@ class ServerSettings(FeatureSettings):
         self.hostname = reader.get('server', 'hostname')
         self.port = reader.get('server', 'port', cast=int)
         self.scheme = reader.get('server', 'scheme', 'https')
+        self.ssh_backend = reader.get('server', 'ssh_backend', 'paramiko')
         self.ssh_key = reader.get('server', 'ssh_key')
+        self.ssh_keepalive_interval = reader.get(
+            'server', 'ssh_keepalive_interval', 30, int)
         self.ssh_password = reader.get('server', 'ssh_password')
+        self.ssh_pool_idle_timeout = reader.get(
+            'server', 'ssh_pool_idle_timeout', 300, int)
+        self.ssh_pool_size = reader.get('server', 'ssh_pool_size', 10, int)
         self.ssh_username = reader.get('server', 'ssh_username', 'root')
 
     def validate(self):
@@ -151,6 +161,12 @@ class ServerSettings(FeatureSettings):
         if (self.ssh_key is None and self.ssh_password is None):
             validation_errors.append(
                 '[server] ssh_key or ssh_password must be provided.')
+        if self.ssh_backend not in ('paramiko', 'asyncio'):
+            validation_errors.append(
+                '[server] ssh_backend should be one of paramiko, asyncio.')
+        elif self.ssh_backend == 'asyncio' and sys.version_info < (3, 5):
+            validation_errors.append(
+                '[server] ssh_backend asyncio requires Python 3.5 or newer.')
         return validation_errors
 
     def get_credentials(self):
@@ -411,9 +427,17 @@ class PerformanceSettings(FeatureSettings):
         self.time_hammer = None
         self.cdn_address = None
         self.virtual_machines = None
+        self.simulated_consumers = None
         self.fresh_install_savepoint = None
         self.enabled_repos_savepoint = None
         self.csv_buckets_count = None
+        self.raw_csv = None
+        self.num_threads = None
+        self.arrival_rate = None
+        self.http_pool_size = None
+        self.separate_connect_time = None
+        self.warmup_iterations = None
+        self.cooldown_iterations = None
         self.sync_count = None
         self.sync_type = None
         self.repos = None
@@ -426,12 +450,28 @@ class PerformanceSettings(FeatureSettings):
             'performance', 'cdn_address')
         self.virtual_machines = reader.get(
             'performance', 'virtual_machines', cast=list)
+        self.simulated_consumers = reader.get(
+            'performance', 'simulated_consumers', False, bool)
         self.fresh_install_savepoint = reader.get(
             'performance', 'fresh_install_savepoint')
         self.enabled_repos_savepoint = reader.get(
             'performance', 'enabled_repos_savepoint')
         self.csv_buckets_count = reader.get(
             'performance', 'csv_buckets_count', 10, int)
+        self.raw_csv = reader.get(
+            'performance', 'raw_csv', True, bool)
+        self.num_threads = reader.get(
+            'performance', 'num_threads', cast=list)
+        self.arrival_rate = reader.get(
+            'performance', 'arrival_rate', None, float)
+        self.http_pool_size = reader.get(
+            'performance', 'http_pool_size', 10, int)
+        self.separate_connect_time = reader.get(
+            'performance', 'separate_connect_time', False, bool)
+        self.warmup_iterations = reader.get(
+            'performance', 'warmup_iterations', 0, int)
+        self.cooldown_iterations = reader.get(
+            'performance', 'cooldown_iterations', 0, int)
         self.sync_count = reader.get(
             'performance', 'sync_count', 3, int)
         self.sync_type = reader.get(
@@ -445,7 +485,7 @@ class PerformanceSettings(FeatureSettings):
         if self.cdn_address is None:
             validation_errors.append(
                 '[performance] cdn_address must be provided.')
-        if self.virtual_machines is None:
+        if self.virtual_machines is None and not self.simulated_consumers:
             validation_errors.append(
                 '[performance] virtual_machines must be provided.')
         if self.fresh_install_savepoint is None:
@@ -529,7 +569,12 @@ class Settings(object):
         self._configured = False
         self._validation_errors = []
         self.browser = None
+        self.entity_pool_scoped = None
+        self.entity_pool_sizes = None
+        self.hammer_metrics_path = None
         self.locale = None
+        self.object_cache_dir = None
+        self.object_cache_ttl = None
         self.project = None
         self.reader = None
         self.rhel6_repo = None
@@ -629,7 +674,17 @@ class Settings(object):
         """Read Robottelo's general settings."""
         self.browser = self.reader.get(
             'robottelo', 'browser', 'selenium')
+        self.entity_pool_scoped = self.reader.get(
+            'robottelo', 'entity_pool_scoped', False, bool)
+        self.entity_pool_sizes = self.reader.get(
+            'robottelo', 'entity_pool_sizes', {}, dict)
+        self.hammer_metrics_path = self.reader.get(
+            'robottelo', 'hammer_metrics_path', None)
         self.locale = self.reader.get('robottelo', 'locale', 'en_US.UTF-8')
+        self.object_cache_dir = self.reader.get(
+            'robottelo', 'object_cache_dir', None)
+        self.object_cache_ttl = self.reader.get(
+            'robottelo', 'object_cache_ttl', None, int)
         self.project = self.reader.get('robottelo', 'project', 'sat')
         self.rhel6_repo = self.reader.get('robottelo', 'rhel6_repo', None)
         self.rhel7_repo = self.reader.get('robottelo', 'rhel7_repo', None)
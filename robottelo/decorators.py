@@ -1,22 +1,32 @@
 # -*- encoding: utf-8 -*-
 """Implements various decorators"""
+import atexit
 import bugzilla
 import logging
+import os
 import pytest
 import requests
+import threading
 import unittest2
 
 from functools import wraps
+from robottelo.cache import ObjectCache
 from robottelo.config import settings
 from robottelo.constants import BZ_OPEN_STATUSES, NOT_IMPLEMENTED
+from robottelo.helpers import get_server_version
 from six.moves.xmlrpc_client import Fault
 from xml.parsers.expat import ExpatError, ErrorString
 
 BUGZILLA_URL = "https://bugzilla.redhat.com/xmlrpc.cgi"
 LOGGER = logging.getLogger(__name__)
-OBJECT_CACHE = {}
+# Objects created by the functions decorated with ``cacheable``
+OBJECT_CACHE = ObjectCache()
 REDMINE_URL = 'http://projects.theforeman.org'
 
+_object_cache_path = None
+_object_cache_configured = False
+_object_cache_lock = threading.Lock()
+
 # Test Tier Decorators
 # CRUD tests
 tier1 = pytest.mark.tier1
@@ -137,8 +147,59 @@ def stubbed(reason=None):
     return wrapper
 
 
+def _configure_object_cache():
+    """Apply the ``object_cache_*`` settings to :data:`OBJECT_CACHE` and load
+    the objects saved by a previous run for the same server.
+    """
+    global _object_cache_configured  # pylint:disable=global-statement
+    global _object_cache_path  # pylint:disable=global-statement
+    if _object_cache_configured:
+        return
+    with _object_cache_lock:
+        if _object_cache_configured or not settings.configured:
+            return
+        _object_cache_configured = True
+        OBJECT_CACHE.ttl = settings.object_cache_ttl
+        if not settings.object_cache_dir:
+            return
+        _object_cache_path = os.path.join(
+            settings.object_cache_dir,
+            u'{0}-{1}.json'.format(
+                settings.server.hostname, get_server_version() or 'upstream'),
+        )
+        if os.path.exists(_object_cache_path):
+            try:
+                loaded = OBJECT_CACHE.load(_object_cache_path)
+            except (IOError, OSError, ValueError) as err:
+                LOGGER.warning('Could not load the object cache: %s', err)
+            else:
+                LOGGER.debug('Loaded %s cached objects from %s',
+                             loaded, _object_cache_path)
+
+
+@atexit.register
+def _save_object_cache():
+    """Save :data:`OBJECT_CACHE` if ``object_cache_dir`` is set."""
+    if _object_cache_path is None:
+        return
+    LOGGER.debug('Object cache statistics: %s', OBJECT_CACHE.stats)
+    try:
+        if not os.path.isdir(settings.object_cache_dir):
+            os.makedirs(settings.object_cache_dir)
+        OBJECT_CACHE.save(_object_cache_path)
+    except (IOError, OSError) as err:
+        LOGGER.warning('Could not save the object cache: %s', err)
+
+
 def cacheable(func):
-    """Decorator that makes an optional object cache available"""
+    """Decorator that makes an optional object cache available
+
+    When called with ``cached=True`` the decorated function returns the
+    object it created before with the same options, if any, instead of
+    creating a new one. Objects are kept in :data:`OBJECT_CACHE`, configured
+    by the ``object_cache_ttl`` and ``object_cache_dir`` settings.
+
+    """
 
     @wraps(func)
     def cacheable_function(options=None, cached=False):
@@ -146,13 +207,12 @@ def cacheable(func):
         This is the function being returned.
         Requires input function's name start with 'make_'
         """
+        if cached is not True:
+            return func(options)
+        _configure_object_cache()
         object_key = func.__name__.replace('make_', '')
-        if cached is True and object_key in OBJECT_CACHE:
-            return OBJECT_CACHE[object_key]
-        new_object = func(options)
-        if cached is True:
-            OBJECT_CACHE[object_key] = new_object
-        return new_object
+        return OBJECT_CACHE.get_or_create(
+            object_key, options, lambda: func(options))
 
     return cacheable_function
 
@@ -154,17 +154,13 @@ def install_katello_ca(hostname=None):
         :raises: AssertionError: If katello-ca wasn't installed.
 
         """
-        ssh.command(
+        # Not checking the return_code of the install, as rpm could be
+        # installed before and installation may fail
+        _, result = ssh.command_batch([
             u'rpm -Uvh {0}'.format(settings.server.get_cert_rpm_url()),
-            hostname
-        )
-        # Not checking the return_code here, as rpm could be installed before
-        # and installation may fail
-        result = ssh.command(
             u'rpm -q katello-ca-consumer-{0}'
             .format(settings.server.hostname),
-            hostname
-        )
+        ], hostname)
         # Checking the return_code here to verify katello-ca rpm is actually
         # present in the system
         if result.return_code != 0:
@@ -180,32 +176,26 @@ def remove_katello_ca(hostname=None):
         :raises: AssertionError: If katello-ca wasn't removed.
 
         """
-        # Not checking the return_code here, as rpm can be not even installed
-        # and deleting may fail
-        ssh.command(
+        # Not checking the return_code of the removal, as rpm can be not even
+        # installed and deleting may fail. Checking the return_code of the
+        # query to verify katello-ca rpm is actually not present in the
+        # system
+        _, result = ssh.command_batch([
             'yum erase -y $(rpm -qa |grep katello-ca-consumer)',
-            hostname
-        )
-        # Checking the return_code here to verify katello-ca rpm is actually
-        # not present in the system
-        result = ssh.command(
-            'rpm -q katello-ca-consumer-{0}'
-            .format(settings.server.hostname),
-            hostname
-        )
+            'rpm -q katello-ca-consumer-{0}'.format(settings.server.hostname),
+        ], hostname)
         if result.return_code == 0:
             raise AssertionError('Failed to remove the katello-ca rpm')
-        # Resetting rhsm.conf to point to cdn
+        # Resetting rhsm.conf to point to cdn, only once the rpm is removed
         rhsm_updates = [
             's/^hostname.*/hostname=subscription.rhn.redhat.com/',
             's|^prefix.*|prefix=/subscription|',
             's|^baseurl.*|baseurl=https://cdn.redhat.com|',
             's/^repo_ca_cert.*/repo_ca_cert=%(ca_cert_dir)sredhat-uep.pem/',
         ]
-        for command in rhsm_updates:
-            result = ssh.command(
-                'sed -i -e "{0}" /etc/rhsm/rhsm.conf'.format(command),
-                hostname
-            )
-            if result.return_code != 0:
-                raise AssertionError('Failed to reset the rhsm.conf')
+        results = ssh.command_batch([
+            'sed -i -e "{0}" /etc/rhsm/rhsm.conf'.format(command)
+            for command in rhsm_updates
+        ], hostname)
+        if any(result.return_code != 0 for result in results):
+            raise AssertionError('Failed to reset the rhsm.conf')
@@ -0,0 +1,124 @@
+"""Constant memory histogram with percentiles of bounded relative error."""
+import math
+
+
+class Histogram(object):
+    """Count of positive values in buckets whose width grows exponentially.
+
+    A value is counted in the bucket ``ceil(log(value, gamma))``, where
+    ``gamma = (1 + relative_error) / (1 - relative_error)``, so percentiles
+    are estimated within ``relative_error`` of the real value whatever the
+    distribution. The memory used grows with the logarithm of the range of
+    the values, not with their number: about 700 buckets cover one
+    microsecond to one day with the default 1% error. Values lower than
+    ``min_value``, including zero, share a single bucket.
+
+    Histograms with the same parameters can be merged, for example to
+    combine the measures of several threads.
+
+    :param float relative_error: The maximum relative error of percentiles.
+    :param float min_value: The lowest value told apart from zero.
+
+    """
+    def __init__(self, relative_error=0.01, min_value=1e-6):
+        self.relative_error = relative_error
+        self.min_value = min_value
+        self.count = 0
+        self.total = 0.0
+        self.total_squares = 0.0
+        self.min = None
+        self.max = None
+        self._gamma = (1 + relative_error) / (1 - relative_error)
+        self._log_gamma = math.log(self._gamma)
+        self._zero_count = 0
+        self._buckets = {}  # bucket index => count
+
+    def __len__(self):
+        return self.count
+
+    def add(self, value, count=1):
+        """Count ``value`` ``count`` times."""
+        if value < self.min_value:
+            self._zero_count += count
+        else:
+            index = int(math.ceil(math.log(value) / self._log_gamma))
+            self._buckets[index] = self._buckets.get(index, 0) + count
+        self.count += count
+        self.total += value * count
+        self.total_squares += value * value * count
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        """Add the values counted by ``other`` to this histogram.
+
+        :raises ValueError: If the histograms do not have the same
+            parameters.
+
+        """
+        if (other.relative_error != self.relative_error or
+                other.min_value != self.min_value):
+            raise ValueError(
+                'Can not merge histograms with different parameters')
+        for index, count in other._buckets.items():
+            self._buckets[index] = self._buckets.get(index, 0) + count
+        self._zero_count += other._zero_count
+        self.count += other.count
+        self.total += other.total
+        self.total_squares += other.total_squares
+        for value in (other.min, other.max):
+            if value is not None:
+                if self.min is None or value < self.min:
+                    self.min = value
+                if self.max is None or value > self.max:
+                    self.max = value
+
+    @property
+    def mean(self):
+        """The mean of the values, ``None`` if there is none."""
+        return self.total / self.count if self.count else None
+
+    @property
+    def std(self):
+        """The standard deviation of the values, ``None`` if there is
+        none.
+        """
+        if not self.count:
+            return None
+        mean = self.mean
+        return math.sqrt(max(self.total_squares / self.count - mean * mean, 0))
+
+    def percentile(self, percent):
+        """Return an estimate of the ``percent`` percentile of the values.
+
+        :param float percent: A number between 0 and 100.
+        :return: The estimate, always between the minimum and maximum
+            values, or ``None`` if no value was counted.
+
+        """
+        if not self.count:
+            return None
+        if percent <= 0:
+            return self.min
+        if percent >= 100:
+            return self.max
+        rank = percent / 100.0 * (self.count - 1)
+        seen = self._zero_count
+        if rank < seen:
+            return self.min
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if rank < seen:
+                # The middle of the bucket, in relative terms
+                value = 2 * self._gamma ** index / (self._gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def percentiles(self, percents):
+        """Return a dictionary mapping each of ``percents`` to its
+        percentile.
+        """
+        return dict(
+            (percent, self.percentile(percent)) for percent in percents)
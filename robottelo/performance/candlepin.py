@@ -6,11 +6,11 @@ register and attach, single subscription deletion.
 
 """
 import logging
-import requests
-import time
 
 from robottelo import ssh
+from robottelo.cli.metrics import parse_real_time
 from robottelo.config import settings
+from robottelo.performance.connection import timed_request
 from six.moves.urllib.parse import urljoin
 
 LOGGER = logging.getLogger(__name__)
@@ -29,12 +29,7 @@ class Candlepin(object):
         :return: The real timing value
 
         """
-        real_time = [
-            real
-            for real in result.split('\n')
-            if real.startswith('real')
-        ]
-        return float(real_time[0].split(' ')[1])
+        return parse_real_time(result)
 
     @classmethod
     def single_register_activation_key(cls, ak_name, default_org, vm_ip):
@@ -105,16 +100,26 @@ class Candlepin(object):
         return cls.get_real_time(result.stderr)
 
     @classmethod
-    def single_delete(cls, uuid, thread_id):
-        """Delete system from subscription"""
-        start = time.time()
-        response = requests.delete(
+    def single_delete(cls, uuid, thread_id, connect_time=False):
+        """Delete system from subscription
+
+        The request is sent through the session of the current thread, see
+        :func:`robottelo.performance.connection.get_session`.
+
+        :param bool connect_time: Whether to return the time spent opening
+            a connection apart from the request time.
+        :return: The seconds the request took or, with ``connect_time``, a
+            tuple of the seconds the request took without opening a
+            connection and of the seconds spent opening it.
+
+        """
+        response, elapsed, connect = timed_request(
+            'DELETE',
             urljoin(
                 settings.server.get_url(),
                 '/katello/api/systems/{0}'.format(uuid)
             ),
             auth=settings.server.get_credentials(),
-            verify=False
         )
 
         if response.status_code != 204:
@@ -126,6 +131,7 @@ class Candlepin(object):
             LOGGER.info(
                 "Delete {0} on thread-{1} successful!".format(uuid, thread_id)
             )
-        end = time.time()
-        LOGGER.info('real  {0}s'.format(end-start))
-        return end - start
+        LOGGER.info('real  {0}s (connect {1}s)'.format(elapsed, connect))
+        if connect_time:
+            return elapsed - connect, connect
+        return elapsed
@@ -0,0 +1,153 @@
+"""HTTP sessions of the performance tests.
+
+The performance utilities sending requests to the server, like
+:meth:`robottelo.performance.candlepin.Candlepin.single_delete`, send them
+through a ``requests.Session`` per thread, returned by :func:`get_session`.
+Its connections are kept open between requests, so a timed request does not
+pay for a new TCP connection and TLS handshake each time, which would be
+counted in its latency and load the client.
+
+:func:`timed_request` measures a request with :func:`perf_counter` and
+tells how much of it was spent opening connections, which is only the case
+for the first request of a thread or after the server closed the
+connection. ``[performance] separate_connect_time`` reports that time apart
+from the request time.
+
+"""
+import logging
+import requests
+import threading
+import time
+
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.connection import (
+    HTTPConnection,
+    HTTPSConnection,
+)
+from requests.packages.urllib3.connectionpool import (
+    HTTPConnectionPool,
+    HTTPSConnectionPool,
+)
+from robottelo.config import settings
+
+LOGGER = logging.getLogger(__name__)
+
+# Default number of connections kept open by each session for a host
+DEFAULT_POOL_SIZE = 10
+
+# Clock of the timings, time.time on Python 2 which has no better one
+perf_counter = getattr(time, 'perf_counter', time.time)
+
+_state = threading.local()
+
+
+def _add_connect_time(seconds):
+    """Count ``seconds`` spent opening a connection in the current thread."""
+    _state.connect_time = getattr(_state, 'connect_time', 0.0) + seconds
+
+
+class TimedHTTPConnection(HTTPConnection):
+    """HTTP connection counting the time spent opening it."""
+
+    def connect(self):
+        start = perf_counter()
+        try:
+            super(TimedHTTPConnection, self).connect()
+        finally:
+            _add_connect_time(perf_counter() - start)
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    """HTTPS connection counting the time spent opening it, including the
+    TLS handshake.
+    """
+
+    def connect(self):
+        start = perf_counter()
+        try:
+            super(TimedHTTPSConnection, self).connect()
+        finally:
+            _add_connect_time(perf_counter() - start)
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    """Pool of :class:`TimedHTTPConnection`."""
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    """Pool of :class:`TimedHTTPSConnection`."""
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """Transport adapter opening :class:`TimedHTTPConnection` and
+    :class:`TimedHTTPSConnection`.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super(TimedHTTPAdapter, self).init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': TimedHTTPConnectionPool,
+            'https': TimedHTTPSConnectionPool,
+        }
+
+
+def get_pool_size():
+    """Return the number of connections kept open by a session for a host,
+    read from ``[performance] http_pool_size``.
+    """
+    if settings.configured and settings.performance.http_pool_size:
+        return settings.performance.http_pool_size
+    return DEFAULT_POOL_SIZE
+
+
+def separate_connect_time():
+    """Whether the time spent opening connections is reported apart from
+    the request time, see ``[performance] separate_connect_time``.
+    """
+    return bool(
+        settings.configured and settings.performance.separate_connect_time)
+
+
+def get_session():
+    """Return the ``requests.Session`` of the current thread."""
+    session = getattr(_state, 'session', None)
+    if session is None:
+        pool_size = get_pool_size()
+        session = requests.Session()
+        session.verify = False
+        session.headers['Connection'] = 'keep-alive'
+        adapter = TimedHTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _state.session = session
+    return session
+
+
+def close_session():
+    """Close the connections of the session of the current thread."""
+    session = getattr(_state, 'session', None)
+    if session is not None:
+        session.close()
+        _state.session = None
+
+
+def timed_request(method, url, session=None, **kwargs):
+    """Send a request and measure it.
+
+    :param session: The ``requests.Session`` to use, defaults to the one of
+        the current thread.
+    :param kwargs: Passed to ``requests.Session.request``.
+    :return: A tuple of the response, the seconds the request took and the
+        seconds of it spent opening connections.
+
+    """
+    if session is None:
+        session = get_session()
+    _state.connect_time = 0.0
+    start = perf_counter()
+    response = session.request(method, url, **kwargs)
+    elapsed = perf_counter() - start
+    return response, elapsed, _state.connect_time
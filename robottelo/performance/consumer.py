@@ -0,0 +1,199 @@
+"""Simulated subscription-manager consumers.
+
+A :class:`SimulatedConsumer` sends the requests ``subscription-manager``
+sends to register, attach a subscription and unregister, straight to the
+Candlepin REST API of the server, with random facts from
+:func:`robottelo.system_facts.generate_system_facts`. It needs no virtual
+machine, so a single load machine can emulate thousands of content hosts::
+
+    consumer = SimulatedConsumer()
+    register_time = consumer.register(org, activation_key=ak_name)
+    attach_time = consumer.attach(pool_id)
+    consumer.unregister()
+
+Each method returns the seconds its request took, and the time spent opening
+connections is added up in :attr:`SimulatedConsumer.connect_time`. The
+identity certificate returned on registration is kept in memory only, in
+:attr:`SimulatedConsumer.identity`. ``requests`` can only send a client
+certificate read from a file, so the requests following the registration
+are authenticated with the server credentials instead.
+
+"""
+import logging
+import threading
+
+from robottelo.config import settings
+from robottelo.performance.connection import (
+    separate_connect_time,
+    timed_request,
+)
+from robottelo.system_facts import generate_system_facts
+from six.moves.urllib.parse import urljoin
+
+LOGGER = logging.getLogger(__name__)
+
+# Path of the Candlepin API on a Satellite server
+RHSM_PATH = '/rhsm/'
+
+_environments = {}  # (base url, org, environment name) => environment id
+_environments_lock = threading.Lock()
+
+
+class ConsumerError(Exception):
+    """Indicates that a simulated consumer request failed."""
+
+
+class SimulatedConsumer(object):
+    """A content host talking to Candlepin like ``subscription-manager``.
+
+    :param str name: The host name of the consumer, random by default.
+    :param str base_url: The URL of the Candlepin API, defaults to
+        :data:`RHSM_PATH` on the server under test.
+    :param auth: The credentials of the requests, defaults to the server
+        credentials.
+    :param session: The ``requests.Session`` sending the requests, defaults
+        to the one of the current thread, see
+        :func:`robottelo.performance.connection.get_session`.
+
+    """
+    def __init__(self, name=None, base_url=None, auth=None, session=None):
+        self.facts = generate_system_facts(name)
+        self.name = self.facts['network.hostname']
+        self.base_url = base_url or urljoin(
+            settings.server.get_url(), RHSM_PATH)
+        if not self.base_url.endswith('/'):
+            self.base_url += '/'
+        self.auth = auth or settings.server.get_credentials()
+        self.session = session
+        self.connect_time = 0.0  # seconds spent opening connections
+        self.uuid = None
+        self.identity = None  # the cert and key returned on registration
+        self.entitlements = []
+
+    def _request(self, method, path, expected, auth=True, **kwargs):
+        """Send a request to the Candlepin API.
+
+        :param str path: The path of the resource, relative to
+            :attr:`base_url`.
+        :param expected: The expected status codes.
+        :return: A tuple of the response and the seconds it took, without
+            the time spent opening a connection when ``[performance]
+            separate_connect_time`` is enabled.
+        :raises robottelo.performance.consumer.ConsumerError: If the status
+            code of the response is not expected.
+
+        """
+        response, elapsed, connect = timed_request(
+            method,
+            urljoin(self.base_url, path),
+            session=self.session,
+            auth=self.auth if auth else None,
+            verify=False,
+            **kwargs
+        )
+        self.connect_time += connect
+        if separate_connect_time():
+            elapsed -= connect
+        if response.status_code not in expected:
+            raise ConsumerError(
+                u'{0} {1} of consumer {2} failed with {3}: {4}'.format(
+                    method, path, self.name, response.status_code,
+                    response.content)
+            )
+        return response, elapsed
+
+    def environment_id(self, org, environment):
+        """Return the id of the ``environment`` of ``org``.
+
+        Ids are looked up once and shared by all the consumers.
+
+        """
+        key = (self.base_url, org, environment)
+        with _environments_lock:
+            if key in _environments:
+                return _environments[key]
+        response, _ = self._request(
+            'GET',
+            'owners/{0}/environments'.format(org),
+            (200,),
+            params={'name': environment},
+        )
+        environments = response.json()
+        if not environments:
+            raise ConsumerError(
+                u'No environment {0} in {1}'.format(environment, org))
+        with _environments_lock:
+            _environments[key] = environments[0]['id']
+        return _environments[key]
+
+    def register(self, org, activation_key=None, environment=None):
+        """Register the consumer in ``org``.
+
+        Like ``subscription-manager register --activationkey``, when
+        ``activation_key`` is given, or ``--username --password
+        --environment`` otherwise.
+
+        :return: The seconds the registration took, not counting the lookup
+            of the environment id.
+
+        """
+        body = {
+            'type': 'system',
+            'name': self.name,
+            'facts': self.facts,
+            'installedProducts': [],
+        }
+        if activation_key is not None:
+            response, elapsed = self._request(
+                'POST',
+                'consumers',
+                (200,),
+                auth=False,
+                params={'owner': org, 'activation_keys': activation_key},
+                json=body,
+            )
+        elif environment is not None:
+            response, elapsed = self._request(
+                'POST',
+                'environments/{0}/consumers'.format(
+                    self.environment_id(org, environment)),
+                (200,),
+                json=body,
+            )
+        else:
+            response, elapsed = self._request(
+                'POST', 'consumers', (200,), params={'owner': org}, json=body)
+        consumer = response.json()
+        self.uuid = consumer['uuid']
+        self.identity = consumer.get('idCert')
+        LOGGER.debug('Registered consumer %s as %s', self.name, self.uuid)
+        return elapsed
+
+    def attach(self, pool_id):
+        """Attach the subscription of ``pool_id`` to the consumer.
+
+        :return: The seconds the request took.
+
+        """
+        response, elapsed = self._request(
+            'POST',
+            'consumers/{0}/entitlements'.format(self.uuid),
+            (200,),
+            params={'pool': pool_id},
+        )
+        self.entitlements.extend(response.json())
+        return elapsed
+
+    def unregister(self):
+        """Delete the consumer from Candlepin.
+
+        :return: The seconds the request took.
+
+        """
+        _, elapsed = self._request(
+            'DELETE', 'consumers/{0}'.format(self.uuid), (200, 204))
+        LOGGER.debug('Unregistered consumer %s', self.uuid)
+        self.uuid = None
+        self.identity = None
+        self.entitlements = []
+        return elapsed
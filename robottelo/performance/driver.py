@@ -0,0 +1,713 @@
+"""Load driver running the operations of the performance tests.
+
+An operation is a function measuring one request to the server, like
+registering a content host, and is registered under a name with
+:func:`register_operation`. :class:`LoadDriver` runs an operation from
+several workers of a :mod:`concurrent.futures` thread or process pool::
+
+    driver = LoadDriver('register-ak', {
+        'ak_name': ak_name, 'org': org, 'clients': clients})
+    for concurrency, result in driver.ramp(doubling(len(clients)), 5000):
+        timings = result.timings('register-ak')
+
+Workers wait for each other before starting, so they all load the server at
+the same time, and can run warmup and cooldown iterations which are not
+measured. The values returned by the operation are kept in a result stream
+per operation, or one per step for operations made of several steps. Each
+worker also counts them in histograms of its own, merged once the workers
+are done, so long runs can drop the values themselves with
+``keep_measures=False`` and still get their statistics.
+
+Each worker of :meth:`LoadDriver.run` sends its next request when the
+previous one is done, so when the server slows down less requests are sent
+and latencies look better than they are. :meth:`LoadDriver.run_open_loop`
+starts the operations at a constant rate instead, and measures the latency
+from the time each operation should have started.
+
+"""
+import logging
+import multiprocessing
+import numpy
+import threading
+import time
+
+from collections import namedtuple
+from concurrent import futures
+from robottelo.histogram import Histogram
+from robottelo.performance.candlepin import Candlepin
+from robottelo.performance.consumer import SimulatedConsumer
+from robottelo.performance.pulp import Pulp
+from robottelo.performance.stat import ThreadStat
+from six.moves import queue
+
+LOGGER = logging.getLogger(__name__)
+
+# Seconds to wait for all the workers to be ready to start
+START_TIMEOUT = 60
+
+# Phases of the iterations of a worker
+WARMUP = 'warmup'
+MEASURE = 'measure'
+COOLDOWN = 'cooldown'
+
+# Percentiles reported by default
+PERCENTILES = (50, 90, 95, 99, 100)
+
+# Operations by name => (function, names of the result streams)
+OPERATIONS = {}
+
+# Operations using a client of their own, ``clients[step.worker]``
+CLIENT_OPERATIONS = set()
+
+# Operations whose iterations change the server for good, like deletions
+ONE_SHOT_OPERATIONS = set()
+
+
+class Step(namedtuple(
+        'Step', 'worker iteration workers iterations phase index')):
+    """An iteration of a worker, passed to the operations.
+
+    ``worker`` is the index of the worker among ``workers`` and
+    ``iteration`` the index of the iteration among the ``iterations`` of the
+    ``phase``. ``index`` is the index of the operation among all the
+    operations of the phase, different for each operation, for operations
+    working on an item of a list, like :func:`delete`.
+
+    """
+    __slots__ = ()
+
+
+class Measure(namedtuple(
+        'Measure', 'worker iteration start duration value error intended')):
+    """A measured iteration.
+
+    ``value`` is the timing returned by the operation and ``duration`` the
+    seconds the operation took as seen by the driver, from ``start``.
+    ``error`` is the representation of the exception raised by the
+    operation, if any, in which case ``value`` is ``None``. ``intended`` is
+    the time the operation was scheduled to start, see
+    :meth:`LoadDriver.run_open_loop`, or ``start`` if it was not scheduled.
+
+    """
+    __slots__ = ()
+
+    @property
+    def latency(self):
+        """The seconds from the time the operation should have started to
+        its end.
+
+        When the server slows down, scheduled operations start late and the
+        ``duration`` alone hides the time they waited: this is the latency a
+        client sending requests at the scheduled rate would see.
+
+        """
+        return self.start - self.intended + self.duration
+
+
+class WorkerStat(object):
+    """Constant memory statistics of the measures of a worker for a result
+    stream.
+
+    :param int bucket_size: See :class:`robottelo.performance.stat.
+        ThreadStat`.
+
+    """
+    def __init__(self, bucket_size=None):
+        self.count = 0
+        self.timings = ThreadStat(bucket_size)
+        self.durations = Histogram()
+        self.latencies = Histogram()
+
+    def add(self, measure):
+        """Count a :class:`Measure`."""
+        self.count += 1
+        self.timings.add(measure.iteration, measure.value)
+        self.durations.add(measure.duration)
+        self.latencies.add(max(measure.latency, 0))
+
+
+class LoadDriverError(Exception):
+    """Indicates that the load driver could not run an operation."""
+
+
+def register_operation(name, streams=None, client=False, one_shot=False):
+    """Decorator registering an operation under ``name``.
+
+    The operation is called with a :class:`Step` and the parameters given to
+    the driver as keyword arguments, and returns the timing to record.
+
+    :param str name: The name of the operation.
+    :param streams: The names of the steps of the operation, if it has
+        several. The operation then returns a tuple with the timing of each
+        step. Defaults to a single stream named ``name``.
+    :param bool client: Whether each worker uses a client of its own, which
+        can not run several operations at a time, so the operation can not
+        run in an open loop, see :meth:`LoadDriver.run_open_loop`.
+    :param bool one_shot: Whether each operation can only run once, like a
+        deletion, so the operation can not run warmup or cooldown
+        iterations.
+
+    """
+    def decorator(function):
+        """Register ``function``."""
+        OPERATIONS[name] = (function, tuple(streams or (name,)))
+        if client:
+            CLIENT_OPERATIONS.add(name)
+        if one_shot:
+            ONE_SHOT_OPERATIONS.add(name)
+        return function
+    return decorator
+
+
+def get_operation(operation):
+    """Return the function and result streams of ``operation``.
+
+    :param operation: The name of a registered operation, or a function
+        returning a single timing.
+    :raises robottelo.performance.driver.LoadDriverError: If the operation
+        is not registered.
+
+    """
+    if callable(operation):
+        return operation, (getattr(operation, '__name__', 'operation'),)
+    try:
+        return OPERATIONS[operation]
+    except KeyError:
+        raise LoadDriverError(u'Unknown operation {0}'.format(operation))
+
+
+def supports_open_loop(operation):
+    """Whether ``operation`` can run in an open loop, that is whether its
+    workers can run several operations at a time.
+    """
+    return operation not in CLIENT_OPERATIONS
+
+
+def doubling(maximum):
+    """Return the concurrency levels 1, 2, 4, ... up to ``maximum``, which
+    is always included.
+    """
+    levels = []
+    level = 1
+    while level < maximum:
+        levels.append(level)
+        level *= 2
+    levels.append(maximum)
+    return levels
+
+
+def _measure(function, streams, step, params, intended=None):
+    """Run an iteration of ``function``.
+
+    :return: A :class:`Measure` per result stream.
+
+    """
+    started = time.time()
+    try:
+        values = function(step, **params)
+        error = None
+    except Exception as err:  # pylint:disable=broad-except
+        LOGGER.error(
+            'Worker %s failed %s iteration %s: %r',
+            step.worker, step.phase, step.iteration, err)
+        values = None
+        error = repr(err)
+    duration = time.time() - started
+    if len(streams) == 1 or values is None:
+        values = (values,) * len(streams)
+    return [
+        Measure(
+            step.worker, step.iteration, started, duration, value, error,
+            started if intended is None else intended,
+        )
+        for value in values
+    ]
+
+
+def _run_worker(operation, params, step, warmup, cooldown, ready, start,
+                keep_measures=True, bucket_size=None):
+    """Run the iterations of a worker.
+
+    Module level function, so it can run in a process pool. Each worker
+    counts its measures in its own :class:`WorkerStat`, which are merged
+    once the workers are done.
+
+    :return: A tuple of the list of :class:`Measure` and of the
+        :class:`WorkerStat` of each result stream, for the iterations of the
+        measure phase. Only the measures of failed iterations are listed
+        unless ``keep_measures`` is true.
+
+    """
+    function, streams = get_operation(operation)
+    ready.put(step.worker)
+    start.wait()
+    measures = [[] for _ in streams]
+    stats = [WorkerStat(bucket_size) for _ in streams]
+    for phase, iterations in (
+            (WARMUP, warmup), (MEASURE, step.iterations),
+            (COOLDOWN, cooldown)):
+        for iteration in range(iterations):
+            current = step._replace(
+                iteration=iteration,
+                phase=phase,
+                index=step.worker * iterations + iteration,
+            )
+            iteration_measures = _measure(function, streams, current, params)
+            if phase != MEASURE:
+                continue
+            for stream, stat, measure in zip(
+                    measures, stats, iteration_measures):
+                stat.add(measure)
+                if keep_measures or measure.error is not None:
+                    stream.append(measure)
+    return measures, stats
+
+
+def _run_scheduled(operation, params, step, intended):
+    """Run an iteration scheduled to start at ``intended``.
+
+    Module level function, so it can run in a process pool.
+
+    :return: A :class:`Measure` per result stream.
+
+    """
+    function, streams = get_operation(operation)
+    return _measure(function, streams, step, params, intended)
+
+
+def schedule(rate, count, start=0.0):
+    """Return the times ``count`` operations should start to run at
+    ``rate`` operations per second.
+    """
+    return [start + index / float(rate) for index in range(count)]
+
+
+class LoadResult(object):
+    """The measures of a run of the load driver.
+
+    :param int concurrency: The number of workers.
+    :param dict streams: Maps each result stream name to the list of the
+        :class:`Measure` of each worker.
+    :param dict stats: Maps each result stream name to the list of the
+        :class:`WorkerStat` of each worker. Computed from ``streams`` if not
+        given.
+    :param bool keep_measures: Whether ``streams`` lists all the measures or
+        only those of the failed iterations.
+
+    """
+    def __init__(self, concurrency, streams, stats=None, keep_measures=True):
+        self.concurrency = concurrency
+        self.streams = streams
+        self.keep_measures = keep_measures
+        if stats is None:
+            stats = {}
+            for stream, workers_measures in streams.items():
+                stats[stream] = []
+                for worker_measures in workers_measures:
+                    stat = WorkerStat()
+                    for measure in worker_measures:
+                        stat.add(measure)
+                    stats[stream].append(stat)
+        self.stats = stats
+
+    def measures(self, stream):
+        """Return the measures of all the workers for ``stream``, only those
+        of the failed iterations unless the measures were kept.
+        """
+        return [
+            measure
+            for worker_measures in self.streams[stream]
+            for measure in worker_measures
+        ]
+
+    def count(self, stream):
+        """Return the number of measured iterations of ``stream``."""
+        return sum(stat.count for stat in self.stats[stream])
+
+    def timings(self, stream):
+        """Return the timings of ``stream`` by worker.
+
+        :return: A dictionary mapping ``thread-<worker>`` to the list of the
+            values returned by the operation, the format expected by
+            :mod:`robottelo.performance.stat` and
+            :mod:`robottelo.performance.graph`.
+        :raises robottelo.performance.driver.LoadDriverError: If the
+            measures were not kept.
+
+        """
+        if not self.keep_measures:
+            raise LoadDriverError(
+                u'The timings of {0} were not kept'.format(stream))
+        return dict(
+            ('thread-{0}'.format(worker), [
+                measure.value for measure in worker_measures])
+            for worker, worker_measures in enumerate(self.streams[stream])
+        )
+
+    def thread_stats(self, stream):
+        """Return the :class:`robottelo.performance.stat.ThreadStat` of the
+        timings of each worker for ``stream``.
+        """
+        return [stat.timings for stat in self.stats[stream]]
+
+    def percentiles(self, stream, percents=PERCENTILES, corrected=False):
+        """Return percentiles of the durations of ``stream``.
+
+        The percentiles are exact if the measures were kept, and estimated
+        from the merged histograms of the workers otherwise.
+
+        :param percents: The percentiles to compute.
+        :param bool corrected: Whether to use the latency including the time
+            operations waited to start, see :attr:`Measure.latency`, instead
+            of their duration.
+        :return: A dictionary mapping each percent to its percentile, empty
+            if there is no measure.
+
+        """
+        if not self.keep_measures:
+            histogram = Histogram()
+            for stat in self.stats[stream]:
+                histogram.merge(
+                    stat.latencies if corrected else stat.durations)
+            if not histogram.count:
+                return {}
+            return histogram.percentiles(percents)
+        values = [
+            measure.latency if corrected else measure.duration
+            for measure in self.measures(stream)
+        ]
+        if not values:
+            return {}
+        return dict(
+            (percent, float(numpy.percentile(values, percent)))
+            for percent in percents
+        )
+
+    def errors(self, stream):
+        """Return the measures of ``stream`` whose operation failed."""
+        return [
+            measure for measure in self.measures(stream)
+            if measure.error is not None
+        ]
+
+
+class LoadDriver(object):
+    """Run an operation concurrently and collect its timings.
+
+    :param operation: The name of a registered operation, see
+        :func:`register_operation`, or a function. A process pool needs a
+        name or a module level function, which can be sent to the workers.
+    :param dict params: Keyword arguments passed to the operation.
+    :param str executor: ``'thread'`` or ``'process'``. Processes avoid the
+        global interpreter lock for operations using much CPU on the client,
+        threads are enough for operations waiting on the server.
+    :param int warmup: The number of iterations each worker runs before the
+        measured ones.
+    :param int cooldown: The number of iterations each worker runs after the
+        measured ones, so the last measured iterations still run under the
+        full load.
+    :param bool keep_measures: Whether to keep the measure of every
+        iteration. Otherwise only their statistics are kept, whose memory
+        does not grow with the number of iterations, and the measures of
+        the failed iterations.
+    :param int bucket_size: The number of iterations of each bucket of the
+        statistics of a worker, see :meth:`LoadResult.thread_stats`.
+
+    """
+    def __init__(self, operation, params=None, executor='thread', warmup=0,
+                 cooldown=0, keep_measures=True, bucket_size=None):
+        if executor not in ('thread', 'process'):
+            raise LoadDriverError(u'Unknown executor {0}'.format(executor))
+        self.operation = operation
+        self.params = params or {}
+        self.executor = executor
+        self.warmup = warmup
+        self.cooldown = cooldown
+        self.keep_measures = keep_measures
+        self.bucket_size = bucket_size
+        self.streams = get_operation(operation)[1]
+        if (warmup or cooldown) and operation in ONE_SHOT_OPERATIONS:
+            raise LoadDriverError(
+                u'{0} can not run warmup or cooldown iterations'
+                .format(operation))
+
+    def _pool(self, concurrency):
+        """Return the executor, the ready queue and start event shared with
+        the workers, and the manager sharing them with other processes, if
+        any.
+        """
+        if self.executor == 'process':
+            manager = multiprocessing.Manager()
+            return (
+                futures.ProcessPoolExecutor(max_workers=concurrency),
+                manager.Queue(),
+                manager.Event(),
+                manager,
+            )
+        return (
+            futures.ThreadPoolExecutor(max_workers=concurrency),
+            queue.Queue(),
+            threading.Event(),
+            None,
+        )
+
+    def run(self, concurrency, iterations):
+        """Run ``iterations`` measured iterations on each of ``concurrency``
+        workers.
+
+        :return: A :class:`LoadResult`.
+        :raises robottelo.performance.driver.LoadDriverError: If the workers
+            are not ready to start within :data:`START_TIMEOUT` seconds.
+
+        """
+        LOGGER.debug(
+            'Running %s: %s workers, %s iterations each',
+            self.operation, concurrency, iterations)
+        executor, ready, start, manager = self._pool(concurrency)
+        try:
+            results = self._run(
+                executor, ready, start, concurrency, iterations)
+        finally:
+            if manager is not None:
+                manager.shutdown()
+        return LoadResult(
+            concurrency,
+            dict(
+                (stream, [measures[index] for measures, _ in results])
+                for index, stream in enumerate(self.streams)
+            ),
+            dict(
+                (stream, [stats[index] for _, stats in results])
+                for index, stream in enumerate(self.streams)
+            ),
+            self.keep_measures,
+        )
+
+    def _run(self, executor, ready, start, concurrency, iterations):
+        """Start the workers at the same time and return their measures."""
+        with executor:
+            submitted = [
+                executor.submit(
+                    _run_worker,
+                    self.operation,
+                    self.params,
+                    Step(worker, 0, concurrency, iterations, MEASURE, 0),
+                    self.warmup,
+                    self.cooldown,
+                    ready,
+                    start,
+                    self.keep_measures,
+                    self.bucket_size,
+                )
+                for worker in range(concurrency)
+            ]
+            try:
+                self._wait_ready(ready, submitted)
+            finally:
+                # Start the workers even on error, so the pool can shut down
+                start.set()
+            return [future.result() for future in submitted]
+
+    @staticmethod
+    def _wait_ready(ready, submitted):
+        """Wait for all the ``submitted`` workers to be ready to start.
+
+        A worker done before starting failed, its error is raised.
+
+        """
+        deadline = time.time() + START_TIMEOUT
+        waiting = len(submitted)
+        while waiting:
+            try:
+                ready.get(timeout=0.1)
+                waiting -= 1
+                continue
+            except queue.Empty:
+                pass
+            for future in submitted:
+                if future.done():
+                    future.result()
+            if time.time() > deadline:
+                raise LoadDriverError(
+                    u'The workers were not ready to start in {0}s'
+                    .format(START_TIMEOUT))
+
+    def ramp(self, levels, total_iterations=None, iterations=None):
+        """Run the operation at each concurrency level of ``levels``.
+
+        :param levels: The concurrency levels, see :func:`doubling`.
+        :param int total_iterations: The number of measured iterations of
+            each level, split between its workers.
+        :param int iterations: The number of measured iterations of each
+            worker, when ``total_iterations`` is not given.
+        :return: A generator of ``(concurrency, LoadResult)`` tuples.
+
+        """
+        for concurrency in levels:
+            if total_iterations is not None:
+                iterations = total_iterations // concurrency
+            yield concurrency, self.run(concurrency, iterations)
+
+    def run_open_loop(self, rate, count, max_workers):
+        """Start ``count`` measured operations at ``rate`` operations per
+        second, whatever the time the previous ones take.
+
+        Operations are started from a schedule computed beforehand and run
+        by up to ``max_workers`` workers. When the server slows down and all
+        the workers are busy, operations start late: the time each one should
+        have started is kept in :attr:`Measure.intended`, so the latency
+        includes the time it waited, see :attr:`Measure.latency`.
+
+        The ``warmup`` and ``cooldown`` operations are scheduled before and
+        after the measured ones at the same rate.
+
+        Operation ``index`` gets a :class:`Step` whose ``worker`` is ``index
+        % max_workers`` and ``iteration`` is ``index // max_workers``. The
+        same worker can run several operations at a time, so operations
+        registered with a client of their own are refused.
+
+        :return: A :class:`LoadResult` whose measures are grouped by
+            ``worker``.
+        :raises robottelo.performance.driver.LoadDriverError: If the
+            operation needs a client of its own, see
+            :func:`supports_open_loop`.
+
+        """
+        if not supports_open_loop(self.operation):
+            raise LoadDriverError(
+                u'{0} needs a client per worker and can not run in an open '
+                u'loop'.format(self.operation))
+        LOGGER.debug(
+            'Running %s at %s operations per second: %s operations, '
+            'up to %s at a time', self.operation, rate, count, max_workers)
+        if self.executor == 'process':
+            executor = futures.ProcessPoolExecutor(max_workers=max_workers)
+        else:
+            executor = futures.ThreadPoolExecutor(max_workers=max_workers)
+        phases = (
+            [(WARMUP, index) for index in range(self.warmup)] +
+            [(MEASURE, index) for index in range(count)] +
+            [(COOLDOWN, index) for index in range(self.cooldown)]
+        )
+        iterations = -(-count // max_workers)
+        submitted = []
+        with executor:
+            times = schedule(rate, len(phases), time.time())
+            for (phase, index), intended in zip(phases, times):
+                delay = intended - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+                submitted.append((phase, executor.submit(
+                    _run_scheduled,
+                    self.operation,
+                    self.params,
+                    Step(
+                        index % max_workers,
+                        index // max_workers,
+                        max_workers,
+                        iterations,
+                        phase,
+                        index,
+                    ),
+                    intended,
+                )))
+            streams = dict(
+                (stream, [[] for _ in range(max_workers)])
+                for stream in self.streams
+            )
+            stats = dict(
+                (stream, [
+                    WorkerStat(self.bucket_size) for _ in range(max_workers)])
+                for stream in self.streams
+            )
+            for phase, future in submitted:
+                measures = future.result()
+                if phase != MEASURE:
+                    continue
+                for stream, measure in zip(self.streams, measures):
+                    stats[stream][measure.worker].add(measure)
+                    if self.keep_measures or measure.error is not None:
+                        streams[stream][measure.worker].append(measure)
+        return LoadResult(max_workers, streams, stats, self.keep_measures)
+
+
+@register_operation('register-ak', client=True)
+def register_by_activation_key(step, ak_name, org, clients):
+    """Register ``clients[worker]`` with an activation key."""
+    return Candlepin.single_register_activation_key(
+        ak_name, org, clients[step.worker])
+
+
+@register_operation(
+    'register-attach', streams=('register', 'attach'), client=True)
+def register_and_attach(step, subscription_id, org, environment, clients):
+    """Register ``clients[worker]`` with credentials and attach a
+    subscription.
+    """
+    return Candlepin.single_register_attach(
+        subscription_id, org, environment, clients[step.worker])
+
+
+@register_operation('simulated-register-ak', streams=('register-ak',))
+def simulated_register_by_activation_key(
+        step, ak_name, org, base_url=None, auth=None):
+    """Register a new simulated consumer with an activation key."""
+    return SimulatedConsumer(base_url=base_url, auth=auth).register(
+        org, activation_key=ak_name)
+
+
+@register_operation(
+    'simulated-register-attach', streams=('register', 'attach'))
+def simulated_register_and_attach(
+        step, subscription_id, org, environment, base_url=None, auth=None):
+    """Register a new simulated consumer with credentials and attach a
+    subscription.
+    """
+    consumer = SimulatedConsumer(base_url=base_url, auth=auth)
+    return (
+        consumer.register(org, environment=environment),
+        consumer.attach(subscription_id),
+    )
+
+
+@register_operation(
+    'simulated-lifecycle', streams=('register', 'attach', 'unregister'))
+def simulated_lifecycle(
+        step, subscription_id, org, environment, base_url=None, auth=None):
+    """Register a new simulated consumer, attach a subscription and
+    unregister it, leaving the server as it was.
+    """
+    consumer = SimulatedConsumer(base_url=base_url, auth=auth)
+    return (
+        consumer.register(org, environment=environment),
+        consumer.attach(subscription_id),
+        consumer.unregister(),
+    )
+
+
+@register_operation('delete', one_shot=True)
+def delete(step, uuids):
+    """Delete the content host of the iteration, ``uuids[index]``."""
+    return Candlepin.single_delete(uuids[step.index], step.worker)
+
+
+@register_operation(
+    'delete-connect', streams=('delete', 'connect'), one_shot=True)
+def delete_connect(step, uuids):
+    """Delete the content host of the iteration like :func:`delete`,
+    measuring the time spent opening a connection in its own stream.
+    """
+    return Candlepin.single_delete(
+        uuids[step.index], step.worker, connect_time=True)
+
+
+@register_operation('sync', client=True, one_shot=True)
+def sync(step, repositories):
+    """Synchronize the repository of the worker.
+
+    :param repositories: A list of ``(id, name)`` tuples, one per worker.
+
+    """
+    repository_id, repository_name = repositories[step.worker]
+    return Pulp.repository_single_sync(
+        repository_id, repository_name, step.worker)
@@ -9,6 +9,7 @@ import logging
 
 from robottelo import ssh
 from robottelo.cli.base import CLIReturnCodeError
+from robottelo.cli.metrics import parse_real_time
 from robottelo.cli.repository import Repository
 
 LOGGER = logging.getLogger(__name__)
@@ -56,11 +57,8 @@ class Pulp(object):
     def get_elapsed_time(stderr):
         """retrieve time from stderr"""
         # should return only one time point as a single sync
-        real_time = ''
-        for line in stderr.split('\n'):
-            if line.startswith('real'):
-                real_time = line
-        return 0 if real_time == '' else float(real_time.split(' ')[1])
+        real_time = parse_real_time(stderr)
+        return 0 if real_time is None else real_time
 
     @staticmethod
     def get_enabled_repos(org_id):
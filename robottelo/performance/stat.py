@@ -1,7 +1,21 @@
-"""Test utilities for writing csv files"""
+"""Test utilities for writing csv files
+
+The statistics of the Candlepin tests are computed from
+:class:`ThreadStat`, which keep a :class:`robottelo.histogram.Histogram` of
+the timings of a client thread instead of the timings themselves, so their
+memory does not grow with the number of iterations. The statistics of
+several threads are computed by merging their histograms with
+:func:`merge_thread_stats`.
+
+"""
 import csv
 import numpy
 
+from robottelo.histogram import Histogram
+
+# Percentiles written along with min, median, mean, max and std
+STAT_PERCENTILES = (90, 95, 99)
+
 
 def generate_stat_for_concurrent_thread(
         thread_name,
@@ -83,3 +97,116 @@ def generate_stat_for_pulp_sync(index, time_list, stat_file_name):
             sync_std,
         ])
     return (sync_min, sync_median, sync_max, sync_std)
+
+
+class ThreadStat(object):
+    """Constant memory statistics of the timings of a client thread.
+
+    Timings are counted in a histogram of the whole run and in a histogram
+    per bucket of ``bucket_size`` consecutive iterations.
+
+    :param int bucket_size: The number of iterations of each bucket, no
+        bucket is kept if ``None``.
+
+    """
+    def __init__(self, bucket_size=None):
+        self.bucket_size = bucket_size
+        self.iterations = 0
+        self.histogram = Histogram()
+        self.buckets = []
+
+    def add(self, iteration, value):
+        """Count the timing ``value`` of ``iteration``.
+
+        ``None`` values, for failed iterations, count as iterations but not
+        as timings.
+
+        """
+        self.iterations = max(self.iterations, iteration + 1)
+        if value is None:
+            return
+        self.histogram.add(value)
+        if self.bucket_size:
+            index = iteration // self.bucket_size
+            while len(self.buckets) <= index:
+                self.buckets.append(Histogram())
+            self.buckets[index].add(value)
+
+    def merge(self, other):
+        """Add the timings of ``other`` to these statistics, bucket by
+        bucket.
+        """
+        if other.bucket_size != self.bucket_size:
+            raise ValueError(
+                'Can not merge statistics with different bucket sizes')
+        self.iterations = max(self.iterations, other.iterations)
+        self.histogram.merge(other.histogram)
+        while len(self.buckets) < len(other.buckets):
+            self.buckets.append(Histogram())
+        for bucket, other_bucket in zip(self.buckets, other.buckets):
+            bucket.merge(other_bucket)
+
+    def complete_buckets(self):
+        """Return the histograms of the buckets whose iterations all ran.
+
+        Like :func:`generate_stat_for_concurrent_thread`, the last bucket is
+        left out when there are less than ``bucket_size`` iterations in it.
+
+        """
+        if not self.bucket_size:
+            return []
+        count = self.iterations // self.bucket_size
+        return [
+            self.buckets[index] if index < len(self.buckets) else Histogram()
+            for index in range(count)
+        ]
+
+
+def merge_thread_stats(thread_stats):
+    """Return the :class:`ThreadStat` of the timings of all the
+    ``thread_stats``, which are left unchanged.
+    """
+    thread_stats = list(thread_stats)
+    merged = ThreadStat(thread_stats[0].bucket_size if thread_stats else None)
+    for thread_stat in thread_stats:
+        merged.merge(thread_stat)
+    return merged
+
+
+def generate_stat_from_histograms(name, histograms, stat_file_name):
+    """statistics computing utility for Candlepin tests, from histograms
+
+    Writes the same rows as :func:`generate_stat_for_concurrent_thread`.
+
+    :param str name: The name of the statistics, like ``client-0``.
+    :param histograms: A list of ``(bucket, histogram)`` tuples, where
+        ``bucket`` names the iterations counted by the
+        :class:`robottelo.histogram.Histogram`, like ``1-50``.
+    :param str stat_file_name: The csv file to write to.
+    :return: A dictionary mapping the index of each bucket to a tuple of its
+        min, median, max and std.
+
+    """
+    return_stat = {}
+    with open(stat_file_name, 'a') as handler:
+        writer = csv.writer(handler)
+        writer.writerow([])
+        writer.writerow(['{0}'.format(name)])
+        writer.writerow(
+            ['bucket', 'min', 'median', 'mean', 'max', 'std'] +
+            ['{0}%'.format(percent) for percent in STAT_PERCENTILES]
+        )
+        for i, (bucket, histogram) in enumerate(histograms):
+            if not histogram.count:
+                continue
+            gmin = histogram.min
+            gmedian = histogram.percentile(50)
+            gmax = histogram.max
+            gstd = histogram.std
+            writer.writerow(
+                [bucket, gmin, gmedian, histogram.mean, gmax, gstd] +
+                [histogram.percentile(percent)
+                 for percent in STAT_PERCENTILES]
+            )
+            return_stat.update({i: (gmin, gmedian, gmax, gstd)})
+    return return_stat
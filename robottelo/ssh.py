@@ -1,16 +1,63 @@
 """Utility module to handle the shared ssh connection."""
+import atexit
+import codecs
 import json
 import logging
+import os
+import select
+import socket
+import threading
+import time
+import uuid
+from collections import deque
 from contextlib import contextmanager
 
 import paramiko
 import re
+from six.moves import shlex_quote
 
 from robottelo.cli import hammer
 from robottelo.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Defaults used by the connection pool when the matching ``[server]`` settings
+# are not available.
+DEFAULT_POOL_SIZE = 10
+DEFAULT_POOL_IDLE_TIMEOUT = 300
+DEFAULT_KEEPALIVE_INTERVAL = 30
+
+# OpenSSH accepts at most 10 sessions per connection by default, see the
+# ``MaxSessions`` option of sshd_config.
+DEFAULT_MAX_PARALLEL = 10
+
+# Number of bytes read at once from a channel
+CHUNK_SIZE = 32768
+
+# Remove escape code for colors displayed in the output
+COLOR_CODE_REGEX = re.compile(r'\x1b\[\d\d?m')
+
+# Runs the commands of ``command_batch``. Each one is run by ``sh -c`` with its
+# output saved to files, then a header with its exit status and the size of
+# its stdout and stderr is printed, followed by both.
+BATCH_SCRIPT = u"""dir=$(mktemp -d) || exit 1
+trap 'rm -rf "$dir"' EXIT
+run() {{
+    sh -c "$1" > "$dir/out" 2> "$dir/err" < /dev/null
+    status=$?
+    printf '{boundary} %s %s %s\\n' "$status" \\
+        $(wc -c < "$dir/out") $(wc -c < "$dir/err")
+    cat "$dir/out" "$dir/err"
+    return $status
+}}
+{commands}
+exit 0"""
+
+# The connection pool shared by ``command``, ``upload_file`` and
+# ``download_file``. Use :func:`get_connection_pool` to access it.
+_connection_pool = None
+_connection_pool_lock = threading.Lock()
+
 
 class SSHCommandResult(object):
     """Structure that returns in all ssh commands results."""
@@ -21,6 +68,8 @@ class SSHCommandResult(object):
         self.stderr = stderr
         self.return_code = return_code
         self.output_format = output_format
+        # Size of the raw output, set by ``_command_result``
+        self.received_bytes = 0
         #  Does not make sense to return suspicious output if ($? <> 0)
         if output_format and self.return_code == 0:
             if output_format == 'csv':
@@ -40,6 +89,41 @@ def _call_paramiko_sshclient():
     return paramiko.SSHClient()
 
 
+def _connection_defaults(hostname=None, username=None, key_filename=None):
+    """Fill in the connection arguments which were not provided with the
+    values from the ``server`` section of the configuration file.
+
+    :return: A ``(hostname, username, key_filename)`` tuple.
+    :rtype: tuple
+
+    """
+    if hostname is None:
+        hostname = settings.server.hostname
+    if username is None:
+        username = settings.server.ssh_username
+    if key_filename is None:
+        key_filename = settings.server.ssh_key
+    return hostname, username, key_filename
+
+
+def _connect(hostname, username, key_filename, timeout=10):
+    """Create a new ``paramiko.SSHClient`` and connect it.
+
+    :return: A connected SSH client.
+    :rtype: paramiko.SSHClient
+
+    """
+    client = _call_paramiko_sshclient()
+    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    client.connect(
+        hostname=hostname,
+        username=username,
+        key_filename=key_filename,
+        timeout=timeout
+    )
+    return client
+
+
 @contextmanager
 def _get_connection(
         hostname=None, username=None, key_filename=None, timeout=10):
@@ -69,21 +153,9 @@ def _get_connection(
     :rtype: paramiko.SSHClient
 
     """
-    if hostname is None:
-        hostname = settings.server.hostname
-    if username is None:
-        username = settings.server.ssh_username
-    if key_filename is None:
-        key_filename = settings.server.ssh_key
-
-    client = _call_paramiko_sshclient()
-    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-    client.connect(
-        hostname=hostname,
-        username=username,
-        key_filename=key_filename,
-        timeout=timeout
-    )
+    hostname, username, key_filename = _connection_defaults(
+        hostname, username, key_filename)
+    client = _connect(hostname, username, key_filename, timeout)
 
     client_id = hex(id(client))
     try:
@@ -95,6 +167,319 @@ def _get_connection(
         logger.info('Destroyed Paramiko client {0}'.format(client_id))
 
 
+class SSHConnectionPool(object):
+    """A thread-safe pool of authenticated ``paramiko.SSHClient`` objects.
+
+    Connections are kept open and reused, so callers pay the key exchange and
+    authentication costs only once per connection. Connections are keyed by
+    ``(hostname, username, key_filename)`` and the pool makes sure that:
+
+    * at most ``max_size`` connections are open for each key. Callers asking
+      for a connection when all of them are in use wait until one is
+      released, or until their timeout expires;
+    * connections idle for more than ``idle_timeout`` seconds are closed, by
+      a background thread running while there are idle connections;
+    * connections whose transport is no longer active are discarded instead of
+      being handed out;
+    * every transport sends a keepalive packet every ``keepalive_interval``
+      seconds, so firewalls and sshd do not drop idle connections.
+
+    A pool is bound to the process which created it, forked processes (e.g.
+    ``pytest-xdist --boxed`` workers) start with an empty pool instead of
+    sharing the parent's sockets.
+
+    :param int max_size: Maximum number of connections per key.
+    :param int idle_timeout: Seconds before an idle connection is closed.
+    :param int keepalive_interval: Seconds between keepalive packets. Use 0
+        to disable keepalives.
+
+    """
+
+    def __init__(
+            self, max_size=DEFAULT_POOL_SIZE,
+            idle_timeout=DEFAULT_POOL_IDLE_TIMEOUT,
+            keepalive_interval=DEFAULT_KEEPALIVE_INTERVAL):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.keepalive_interval = keepalive_interval
+        self._condition = threading.Condition()
+        self._idle = {}  # key -> list of (client, last used time) tuples
+        self._size = {}  # key -> number of open connections
+        self._reaper = None  # thread closing the expired idle connections
+        self._pid = os.getpid()
+
+    @staticmethod
+    def _is_active(client):
+        """Tell whether ``client`` still has an active transport."""
+        transport = client.get_transport()
+        return transport is not None and transport.is_active()
+
+    @staticmethod
+    def _close(client):
+        """Close ``client`` ignoring any error."""
+        client_id = hex(id(client))
+        try:
+            client.close()
+        except Exception as err:  # pylint:disable=broad-except
+            logger.debug(
+                'Error closing Paramiko client {0}: {1}'
+                .format(client_id, err)
+            )
+        logger.info('Destroyed pooled Paramiko client {0}'.format(client_id))
+
+    def _check_pid(self):
+        """Forget connections inherited from a parent process.
+
+        Must be called while holding the pool lock.
+
+        """
+        if self._pid != os.getpid():
+            self._idle = {}
+            self._size = {}
+            self._reaper = None
+            self._pid = os.getpid()
+
+    def _pop_expired(self):
+        """Remove the idle connections which reached ``idle_timeout``.
+
+        Must be called while holding the pool lock.
+
+        :return: A list of clients that should be closed.
+
+        """
+        expired = []
+        deadline = time.time() - self.idle_timeout
+        for key, idle in self._idle.items():
+            fresh = [item for item in idle if item[1] >= deadline]
+            if len(fresh) != len(idle):
+                expired.extend(
+                    client for client, last_used in idle
+                    if last_used < deadline
+                )
+                self._size[key] -= len(idle) - len(fresh)
+                self._idle[key] = fresh
+        if expired:
+            self._condition.notify_all()
+        return expired
+
+    def close_expired(self):
+        """Close the idle connections which reached ``idle_timeout``."""
+        with self._condition:
+            self._check_pid()
+            expired = self._pop_expired()
+        for client in expired:
+            self._close(client)
+
+    def _start_reaper(self):
+        """Start the thread closing the expired idle connections, unless it
+        is running.
+
+        Must be called while holding the pool lock.
+
+        """
+        if self._reaper is None:
+            self._reaper = threading.Thread(target=self._reap)
+            self._reaper.daemon = True
+            self._reaper.start()
+
+    def _reap(self):
+        """Close the idle connections as they expire, until there are no
+        idle connections left.
+        """
+        while True:
+            with self._condition:
+                last_used = [
+                    item[1] for idle in self._idle.values() for item in idle]
+                if not last_used:
+                    self._reaper = None
+                    return
+                wait = min(last_used) + self.idle_timeout - time.time()
+            time.sleep(max(wait, 0) + 0.01)
+            self.close_expired()
+
+    def acquire(self, hostname, username, key_filename, timeout=10):
+        """Get a connection from the pool, connecting if needed.
+
+        :param timeout: Seconds to wait for a connection to be released when
+            ``max_size`` connections are in use, and to connect.
+        :return: A connected SSH client. Must be given back by calling
+            :meth:`release`.
+        :rtype: paramiko.SSHClient
+        :raises socket.timeout: If no connection was released in time.
+
+        """
+        key = (hostname, username, key_filename)
+        client = None
+        timed_out = False
+        deadline = None if timeout is None else time.time() + timeout
+        with self._condition:
+            self._check_pid()
+            to_close = self._pop_expired()
+            while client is None:
+                idle = self._idle.get(key)
+                if idle:
+                    candidate, _ = idle.pop()
+                    if self._is_active(candidate):
+                        client = candidate
+                    else:
+                        to_close.append(candidate)
+                        self._size[key] -= 1
+                    continue
+                if self._size.get(key, 0) < self.max_size:
+                    self._size[key] = self._size.get(key, 0) + 1
+                    break
+                wait = None
+                if deadline is not None:
+                    wait = deadline - time.time()
+                    if wait <= 0:
+                        timed_out = True
+                        break
+                self._condition.wait(wait)
+        for stale in to_close:
+            self._close(stale)
+        if timed_out:
+            raise socket.timeout(
+                'No connection to {0} as {1} was released in {2} seconds, '
+                'all {3} are in use'
+                .format(hostname, username, timeout, self.max_size)
+            )
+        if client is not None:
+            return client
+
+        try:
+            client = _connect(hostname, username, key_filename, timeout)
+            if self.keepalive_interval:
+                client.get_transport().set_keepalive(self.keepalive_interval)
+        except Exception:
+            with self._condition:
+                self._size[key] -= 1
+                self._condition.notify()
+            raise
+        logger.info(
+            'Instantiated pooled Paramiko client {0}'.format(hex(id(client))))
+        return client
+
+    def release(
+            self, client, hostname, username, key_filename, discard=False):
+        """Give ``client`` back to the pool.
+
+        :param client: A client returned by :meth:`acquire`.
+        :param bool discard: Close the connection instead of keeping it for
+            reuse. Should be used when the connection may be in a bad state.
+
+        """
+        key = (hostname, username, key_filename)
+        with self._condition:
+            if self._pid != os.getpid():
+                # The client was acquired by the parent process.
+                return
+            if discard or not self._is_active(client):
+                self._size[key] -= 1
+            else:
+                self._idle.setdefault(key, []).append((client, time.time()))
+                client = None
+                self._start_reaper()
+            self._condition.notify()
+        if client is not None:
+            self._close(client)
+
+    @contextmanager
+    def connection(
+            self, hostname=None, username=None, key_filename=None,
+            timeout=10):
+        """Yield a pooled connection, giving it back to the pool when done::
+
+            with pool.connection() as connection:
+                ...
+
+        The arguments default to the ``server`` configuration just like
+        :func:`_get_connection`. If an exception is raised while using the
+        connection it is closed instead of being reused.
+
+        """
+        hostname, username, key_filename = _connection_defaults(
+            hostname, username, key_filename)
+        client = self.acquire(hostname, username, key_filename, timeout)
+        try:
+            yield client
+        except BaseException:
+            self.release(
+                client, hostname, username, key_filename, discard=True)
+            raise
+        self.release(client, hostname, username, key_filename)
+
+    def close_all(self):
+        """Close all idle connections.
+
+        Connections currently in use are closed when they are released.
+
+        """
+        with self._condition:
+            self._check_pid()
+            to_close = []
+            for key, idle in self._idle.items():
+                to_close.extend(client for client, _ in idle)
+                self._size[key] -= len(idle)
+            self._idle = {}
+            self._condition.notify_all()
+        for client in to_close:
+            self._close(client)
+
+
+def get_connection_pool():
+    """Return the connection pool shared by this module's functions.
+
+    The pool is created on first use, configured by the ``ssh_pool_size``,
+    ``ssh_pool_idle_timeout`` and ``ssh_keepalive_interval`` options of the
+    ``server`` section of the configuration file.
+
+    :rtype: SSHConnectionPool
+
+    """
+    global _connection_pool  # pylint:disable=global-statement
+    with _connection_pool_lock:
+        if _connection_pool is None:
+            max_size = settings.server.ssh_pool_size
+            idle_timeout = settings.server.ssh_pool_idle_timeout
+            keepalive_interval = settings.server.ssh_keepalive_interval
+            _connection_pool = SSHConnectionPool(
+                max_size=(
+                    DEFAULT_POOL_SIZE if max_size is None else max_size),
+                idle_timeout=(
+                    DEFAULT_POOL_IDLE_TIMEOUT
+                    if idle_timeout is None else idle_timeout
+                ),
+                keepalive_interval=(
+                    DEFAULT_KEEPALIVE_INTERVAL
+                    if keepalive_interval is None else keepalive_interval
+                ),
+            )
+        return _connection_pool
+
+
+def close_connection_pool():
+    """Close all idle connections of the shared connection pool."""
+    if _connection_pool is not None:
+        _connection_pool.close_all()
+
+
+atexit.register(close_connection_pool)
+
+
+def _get_pooled_connection(hostname=None, timeout=10):
+    """Return a context manager yielding a connection to ``hostname``.
+
+    The connection is taken from the shared connection pool. If the pool is
+    disabled by setting ``[server] ssh_pool_size`` to 0 then a new connection
+    is created and closed, like :func:`_get_connection` does.
+
+    """
+    pool = get_connection_pool()
+    if pool.max_size <= 0:
+        return _get_connection(hostname=hostname, timeout=timeout)
+    return pool.connection(hostname=hostname, timeout=timeout)
+
+
 def upload_file(local_file, remote_file, hostname=None):
     """Upload a local file to a remote machine
 
@@ -104,7 +489,7 @@ def upload_file(local_file, remote_file, hostname=None):
     :param hostname: target machine hostname. If not provided will be used the
         ``server.hostname`` from the configuration.
     """
-    with _get_connection(hostname=hostname) as connection:
+    with _get_pooled_connection(hostname=hostname) as connection:
         try:
             sftp = connection.open_sftp()
             # Check if local_file is a file-like object and use the proper
@@ -124,7 +509,7 @@ def download_file(remote_file, local_file=None, hostname=None):
     """
     if local_file is None:
         local_file = remote_file
-    with _get_connection(hostname=hostname) as connection:
+    with _get_pooled_connection(hostname=hostname) as connection:
         try:
             sftp = connection.open_sftp()
             sftp.get(remote_file, local_file)
@@ -136,35 +521,174 @@ def command(cmd, hostname=None, output_format=None, timeout=None):
     """
     Executes SSH command(s) on remote hostname.
     Defaults to main.server.hostname.
+
+    ``stdout`` and ``stderr`` are read while the command runs, so commands
+    producing a lot of output do not stall waiting for them to be consumed.
+
+    :param int timeout: Seconds to wait for any output before giving up and
+        raising ``socket.timeout``. By default wait as long as needed.
     """
+    hostname = hostname or settings.server.hostname
 
-    # Set a default timeout of 120 seconds
-    if timeout is None:
-        timeout = 120
+    logger.debug('>>> [%s] %s', hostname, cmd)
 
-    # Variable to hold results returned from the command
-    stdout = stderr = errorcode = None
+    with _get_pooled_connection(hostname=hostname) as connection:
+        [(stdout, stderr, errorcode)] = _run_on_transport(
+            connection.get_transport(), [cmd], 1, timeout)
 
-    # Remove escape code for colors displayed in the output
-    regex = re.compile(r'\x1b\[\d\d?m')
+    return _command_result(stdout, stderr, errorcode, output_format)
 
-    hostname = hostname or settings.server.hostname
 
-    logger.debug('>>> [%s] %s', hostname, cmd)
+class SSHCommandStream(object):
+    """Iterate over the output lines of a remote command as they arrive.
+
+    Lines of ``stdout`` are decoded and have their color codes removed, no
+    other filtering is done. Only ``chunk_size`` bytes are read from the
+    channel at a time, and only when more lines are needed, so the memory
+    used does not depend on the size of the output: a slow consumer makes
+    the remote command wait instead. ``stderr`` is read alongside and is
+    available, as well as ``return_code``, once all the lines were consumed::
+
+        with ssh.command_stream('hammer task progress --id 1') as stream:
+            for line in stream:
+                if 'error' in line:
+                    break
+        print(stream.return_code)
+
+    Breaking out of the loop or calling :meth:`close` terminates the remote
+    command and leaves ``return_code`` set to ``None``.
+
+    :param str cmd: The command to run.
+    :param str hostname: The host to run the command on. Defaults to
+        ``server.hostname`` from the configuration.
+    :param int timeout: Seconds to wait for any output before giving up and
+        raising ``socket.timeout``. By default wait as long as needed.
+    :param int chunk_size: Maximum number of bytes read at once.
+
+    """
+
+    def __init__(
+            self, cmd, hostname=None, timeout=None, chunk_size=CHUNK_SIZE):
+        self.cmd = cmd
+        self.hostname = hostname or settings.server.hostname
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.return_code = None
+        self.stderr = u''
+        self._lines = None
+
+    def __iter__(self):
+        if self._lines is None:
+            self._lines = self._read_lines()
+        return self._lines
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Stop reading the output, terminating the command if needed."""
+        if self._lines is not None:
+            self._lines.close()
+
+    def for_each_line(self, callback):
+        """Call ``callback`` with each line of output.
+
+        :param callback: A callable receiving a line. Returning ``False``
+            stops reading the output and terminates the command.
+        :return: An :class:`SSHCommandResult` with ``stdout`` set to
+            ``None`` since the lines are not kept.
+        :rtype: SSHCommandResult
+
+        """
+        with self:
+            for line in self:
+                if callback(line) is False:
+                    break
+        return SSHCommandResult(None, self.stderr, self.return_code)
+
+    def _read_lines(self):
+        """Generate the output lines, see the class documentation."""
+        logger.debug('>>> [%s] %s', self.hostname, self.cmd)
+        with _get_pooled_connection(hostname=self.hostname) as connection:
+            channel = connection.get_transport().open_session()
+            try:
+                channel.exec_command(self.cmd)
+                for line in self._channel_lines(channel):
+                    yield line
+            except GeneratorExit:
+                # The consumer stopped early, closing the channel terminates
+                # the command and the connection can still be reused.
+                logger.debug('<<< output stream closed early')
+            finally:
+                channel.close()
+
+    def _channel_lines(self, channel):
+        """Generate the decoded lines of ``stdout`` read from ``channel``."""
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        stderr = []
+        pending = u''
+        while True:
+            if channel.recv_ready():
+                pending += decoder.decode(channel.recv(self.chunk_size))
+                lines = pending.split(u'\n')
+                pending = lines.pop()
+                for line in lines:
+                    yield COLOR_CODE_REGEX.sub(u'', line.rstrip(u'\r'))
+                continue
+            # Keep stderr flowing, otherwise the command could block
+            while channel.recv_stderr_ready():
+                stderr.append(channel.recv_stderr(CHUNK_SIZE))
+            if channel.eof_received and not channel.recv_ready():
+                break
+            readable, _, _ = select.select([channel], [], [], self.timeout)
+            if not readable:
+                raise socket.timeout(
+                    'No output received in {0} seconds'.format(self.timeout))
+        pending += decoder.decode(b'', True)
+        if pending:
+            yield COLOR_CODE_REGEX.sub(u'', pending.rstrip(u'\r'))
+        self.return_code = channel.recv_exit_status()
+        while channel.recv_stderr_ready():
+            stderr.append(channel.recv_stderr(CHUNK_SIZE))
+        self.stderr = COLOR_CODE_REGEX.sub(
+            u'', b''.join(stderr).decode('utf-8'))
+        if self.stderr:
+            logger.debug('<<< stderr\n%s', self.stderr)
+
+
+def command_stream(cmd, hostname=None, timeout=None, chunk_size=CHUNK_SIZE):
+    """Executes a SSH command streaming its output.
+
+    See :class:`SSHCommandStream` for the arguments.
+
+    :return: An iterable over the output lines.
+    :rtype: SSHCommandStream
+
+    """
+    return SSHCommandStream(cmd, hostname, timeout, chunk_size)
 
-    with _get_connection(hostname=hostname) as connection:
-        _, stdout, stderr = connection.exec_command(cmd, timeout)
-        errorcode = stdout.channel.recv_exit_status()
-        stdout = stdout.read()
-        stderr = stderr.read()
 
+def _command_result(stdout, stderr, return_code, output_format=None):
+    """Decode and clean up the raw output of a command.
+
+    :param bytes stdout: The raw contents of ``stdout``.
+    :param bytes stderr: The raw contents of ``stderr``.
+    :param int return_code: The command exit status.
+    :param str output_format: The hammer output format, if any.
+    :rtype: SSHCommandResult
+
+    """
+    received_bytes = len(stdout or b'') + len(stderr or b'')
     if stdout:
         # Convert to unicode string
         stdout = stdout.decode('utf-8')
         logger.debug('<<< stdout\n%s', stdout)
     if stderr:
         # Convert to unicode string and remove all color codes characters
-        stderr = regex.sub('', stderr.decode('utf-8'))
+        stderr = COLOR_CODE_REGEX.sub('', stderr.decode('utf-8'))
         logger.debug('<<< stderr\n%s', stderr)
 
     if stdout and output_format != 'json':
@@ -174,8 +698,210 @@ def command(cmd, hostname=None, output_format=None, timeout=None):
         stdout = stdout.replace('""', '')
         stdout = u''.join(stdout).split('\n')
         stdout = [
-            regex.sub('', line) for line in stdout if not line.startswith('[')
+            COLOR_CODE_REGEX.sub('', line)
+            for line in stdout if not line.startswith('[')
         ]
 
-    return SSHCommandResult(
-        stdout, stderr, errorcode, output_format)
+    result = SSHCommandResult(stdout, stderr, return_code, output_format)
+    result.received_bytes = received_bytes
+    return result
+
+
+def _drain_channel(channel, stdout, stderr):
+    """Move all data buffered on ``channel`` into ``stdout`` and ``stderr``.
+
+    :param channel: A ``paramiko.Channel`` object.
+    :param list stdout: Chunks of ``stdout`` read so far.
+    :param list stderr: Chunks of ``stderr`` read so far.
+    :return: ``True`` if the remote command closed its output.
+    :rtype: bool
+
+    """
+    while channel.recv_ready():
+        stdout.append(channel.recv(CHUNK_SIZE))
+    while channel.recv_stderr_ready():
+        stderr.append(channel.recv_stderr(CHUNK_SIZE))
+    return channel.eof_received
+
+
+def _run_on_transport(transport, cmds, max_parallel, timeout):
+    """Run ``cmds`` on concurrent channels of a single transport.
+
+    At most ``max_parallel`` channels are open at the same time. The output
+    of all the channels is read from a single thread, selecting on the
+    channels which have data available.
+
+    :param transport: An authenticated ``paramiko.Transport`` object.
+    :param cmds: A list of commands.
+    :param int max_parallel: Maximum number of channels open at a time.
+    :param int timeout: Seconds to wait for any output before giving up,
+        ``None`` to wait as long as needed.
+    :return: A list of ``(stdout, stderr, return_code)`` tuples with the raw
+        output of each command, in the same order as ``cmds``.
+    :raises socket.timeout: If no channel produces output for ``timeout``
+        seconds.
+
+    """
+    results = [None] * len(cmds)
+    pending = deque(enumerate(cmds))
+    running = {}  # channel -> (index, stdout chunks, stderr chunks)
+    try:
+        while pending or running:
+            while pending and len(running) < max_parallel:
+                index, cmd = pending.popleft()
+                channel = transport.open_session()
+                channel.exec_command(cmd)
+                running[channel] = (index, [], [])
+            readable, _, _ = select.select(list(running), [], [], timeout)
+            if not readable:
+                raise socket.timeout(
+                    'No output received in {0} seconds'.format(timeout))
+            for channel in readable:
+                index, stdout, stderr = running[channel]
+                if _drain_channel(channel, stdout, stderr):
+                    return_code = channel.recv_exit_status()
+                    _drain_channel(channel, stdout, stderr)
+                    channel.close()
+                    del running[channel]
+                    results[index] = (
+                        b''.join(stdout), b''.join(stderr), return_code)
+    finally:
+        for channel in running:
+            channel.close()
+    return results
+
+
+def command_many(
+        cmds, hostname=None, output_format=None, timeout=None,
+        max_parallel=DEFAULT_MAX_PARALLEL):
+    """Executes several independent SSH commands concurrently.
+
+    All the commands run on the same authenticated connection, each one on
+    its own channel, so running them takes about as long as the slowest one
+    instead of the sum of all of them. Only use it for commands which do not
+    depend on each other, they can run in any order.
+
+    :param cmds: A list of commands to run.
+    :param str hostname: The host to run the commands on. Defaults to
+        ``server.hostname`` from the configuration.
+    :param str output_format: The hammer output format, used to parse the
+        output of every command.
+    :param int timeout: Seconds to wait for any output before giving up and
+        raising ``socket.timeout``. By default wait as long as needed.
+    :param int max_parallel: Maximum number of commands running at a time.
+        Keep it at most the ``MaxSessions`` value of the server's sshd, which
+        defaults to 10.
+    :return: A list of :class:`SSHCommandResult`, in the same order as
+        ``cmds``.
+    :rtype: list
+
+    """
+    hostname = hostname or settings.server.hostname
+
+    for cmd in cmds:
+        logger.debug('>>> [%s] %s', hostname, cmd)
+
+    with _get_pooled_connection(hostname=hostname) as connection:
+        outputs = _run_on_transport(
+            connection.get_transport(), cmds, max_parallel, timeout)
+
+    return [
+        _command_result(stdout, stderr, return_code, output_format)
+        for stdout, stderr, return_code in outputs
+    ]
+
+
+class SSHBatchError(Exception):
+    """Indicates that the script running a batch of commands failed."""
+
+
+def _batch_script(cmds, boundary, stop_on_error=False):
+    """Return the shell script running ``cmds`` for :func:`command_batch`."""
+    suffix = u' || exit 0' if stop_on_error else u''
+    return BATCH_SCRIPT.format(
+        boundary=boundary,
+        commands=u'\n'.join(
+            u'run {0}{1}'.format(shlex_quote(cmd), suffix) for cmd in cmds),
+    )
+
+
+def _split_batch_output(output, boundary):
+    """Split the output of a :func:`command_batch` script.
+
+    :param bytes output: The ``stdout`` of the script.
+    :param str boundary: The boundary starting the header of each command.
+    :return: A list of ``(stdout, stderr, return_code)`` tuples with the raw
+        output of each command which was run.
+    :raises robottelo.ssh.SSHBatchError: If the output is not framed as
+        expected.
+
+    """
+    boundary = boundary.encode('ascii') + b' '
+    outputs = []
+    position = 0
+    while position < len(output):
+        end = output.find(b'\n', position)
+        if end == -1 or not output.startswith(boundary, position):
+            raise SSHBatchError(
+                'Unexpected batch output: {0!r}'.format(output[position:]))
+        return_code, stdout_size, stderr_size = (
+            int(field) for field in output[position:end].split()[1:])
+        stdout_start = end + 1
+        stderr_start = stdout_start + stdout_size
+        position = stderr_start + stderr_size
+        outputs.append((
+            output[stdout_start:stderr_start],
+            output[stderr_start:position],
+            return_code,
+        ))
+    return outputs
+
+
+def command_batch(cmds, hostname=None, output_format=None, timeout=None,
+                  stop_on_error=False):
+    """Executes several SSH commands in a single round trip.
+
+    The commands are run one after the other by a generated shell script,
+    sent with a single exec request, which frames the output and exit status
+    of each of them so they can be split back. Each command runs in its own
+    ``sh -c``, so changes like ``cd`` do not carry over to the next one.
+
+    :param cmds: A list of commands to run, in order.
+    :param str hostname: The host to run the commands on. Defaults to
+        ``server.hostname`` from the configuration.
+    :param str output_format: The hammer output format, used to parse the
+        output of every command.
+    :param int timeout: Seconds to wait for any output before giving up and
+        raising ``socket.timeout``. By default wait as long as needed.
+    :param bool stop_on_error: If true the commands following the first one
+        which fails are not run.
+    :return: A list of :class:`SSHCommandResult`, in the same order as
+        ``cmds``. It is shorter than ``cmds`` if a command failed and
+        ``stop_on_error`` is true.
+    :rtype: list
+    :raises robottelo.ssh.SSHBatchError: If the script itself failed.
+
+    """
+    hostname = hostname or settings.server.hostname
+    boundary = u'robottelo-batch-{0}'.format(uuid.uuid4().hex)
+
+    for cmd in cmds:
+        logger.debug('>>> [%s] %s', hostname, cmd)
+
+    with _get_pooled_connection(hostname=hostname) as connection:
+        [(stdout, stderr, return_code)] = _run_on_transport(
+            connection.get_transport(),
+            [_batch_script(cmds, boundary, stop_on_error)],
+            1,
+            timeout,
+        )
+    if return_code != 0:
+        raise SSHBatchError(
+            'Batch script failed with return code {0}: {1}'.format(
+                return_code, stderr.decode('utf-8', 'replace')))
+
+    return [
+        _command_result(cmd_stdout, cmd_stderr, cmd_return_code, output_format)
+        for cmd_stdout, cmd_stderr, cmd_return_code
+        in _split_batch_output(stdout, boundary)
+    ]
@@ -0,0 +1,224 @@
+"""asyncio based backend for :mod:`robottelo.ssh`.
+
+The coroutines in this module return the same results as their
+:mod:`robottelo.ssh` counterparts but do not hold an OS thread while a
+command is running: the output of the remote command is read when the event
+loop reports its channel as readable. This allows a single event loop to
+drive hundreds of concurrent commands, for example one per simulated client
+of a performance test::
+
+    results = loop.run_until_complete(asyncio.gather(*[
+        async_command('subscription-manager identity', hostname=vm)
+        for vm in vms
+    ]))
+
+Establishing connections (key exchange and authentication), opening channels
+and transferring files use blocking paramiko calls which are run on the
+loop's default executor. Connections are shared with :mod:`robottelo.ssh`
+through its connection pool.
+
+Synchronous code can use :func:`command`, which runs :func:`async_command` on
+a background event loop and blocks until it is done. Hammer commands are run
+through it when ``ssh_backend=asyncio`` is set on the ``server`` section of
+the configuration file.
+
+This module requires Python 3.5 or newer.
+
+"""
+import asyncio
+import logging
+import os
+import socket
+import threading
+
+from robottelo import ssh
+
+logger = logging.getLogger(__name__)
+
+# The event loop used by the synchronous adapters and the thread running it.
+# Use :func:`_get_background_loop` to access it.
+_background_loop = None
+_background_loop_lock = threading.Lock()
+_background_loop_pid = None
+
+# Semaphores limiting, per event loop and connection key, how many pooled
+# connections the coroutines may hold at a time.
+_connection_semaphores = {}
+
+
+def _open_and_exec(transport, cmd):
+    """Open a channel on ``transport`` and start ``cmd`` on it.
+
+    Both steps wait for a reply from the server, so this is run on an
+    executor.
+
+    """
+    channel = transport.open_session()
+    channel.exec_command(cmd)
+    return channel
+
+
+async def _run_on_channel(transport, cmd, timeout):
+    """Run ``cmd`` on a new channel of ``transport``.
+
+    :return: A ``(stdout, stderr, return_code)`` tuple with the raw output.
+    :raises socket.timeout: If no output is received for ``timeout`` seconds.
+
+    """
+    loop = asyncio.get_event_loop()
+    channel = await loop.run_in_executor(
+        None, _open_and_exec, transport, cmd)
+    stdout = []
+    stderr = []
+    ready = asyncio.Event()
+    # The channel file descriptor becomes readable when there is data on
+    # either stdout or stderr and stays readable once the channel is closed.
+    fileno = channel.fileno()
+    loop.add_reader(fileno, ready.set)
+    try:
+        while True:
+            ready.clear()
+            if ssh._drain_channel(channel, stdout, stderr):
+                break
+            try:
+                await asyncio.wait_for(ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                raise socket.timeout(
+                    'No output received in {0} seconds'.format(timeout))
+        # The exit status is sent right after the end of the output
+        return_code = await loop.run_in_executor(
+            None, channel.recv_exit_status)
+        ssh._drain_channel(channel, stdout, stderr)
+    finally:
+        loop.remove_reader(fileno)
+        channel.close()
+    return b''.join(stdout), b''.join(stderr), return_code
+
+
+def _get_connection_semaphore(key, max_size):
+    """Return the semaphore guarding the pooled connections for ``key``.
+
+    Coroutines waiting for a connection must wait on the event loop and not
+    on the pool: blocking the executor threads on a full pool could starve
+    the coroutines which hold the connections and need the executor to
+    finish.
+
+    """
+    loop = asyncio.get_event_loop()
+    semaphore = _connection_semaphores.get((loop, key))
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(max_size)
+        _connection_semaphores[(loop, key)] = semaphore
+    return semaphore
+
+
+async def async_command(cmd, hostname=None, output_format=None, timeout=None):
+    """Execute a SSH command on a remote host.
+
+    Coroutine version of :func:`robottelo.ssh.command`, accepting the same
+    arguments.
+
+    :rtype: robottelo.ssh.SSHCommandResult
+
+    """
+    hostname, username, key_filename = ssh._connection_defaults(hostname)
+
+    logger.debug('>>> [%s] %s', hostname, cmd)
+
+    loop = asyncio.get_event_loop()
+    pool = ssh.get_connection_pool()
+    semaphore = _get_connection_semaphore(
+        (hostname, username, key_filename), max(pool.max_size, 1))
+    async with semaphore:
+        client = await loop.run_in_executor(
+            None, pool.acquire, hostname, username, key_filename)
+        discard = True
+        try:
+            stdout, stderr, return_code = await _run_on_channel(
+                client.get_transport(), cmd, timeout)
+            discard = False
+        finally:
+            pool.release(
+                client, hostname, username, key_filename, discard=discard)
+
+    return ssh._command_result(stdout, stderr, return_code, output_format)
+
+
+async def async_upload_file(local_file, remote_file, hostname=None):
+    """Upload a local file to a remote machine.
+
+    Coroutine version of :func:`robottelo.ssh.upload_file`, accepting the
+    same arguments.
+
+    """
+    loop = asyncio.get_event_loop()
+    await loop.run_in_executor(
+        None, ssh.upload_file, local_file, remote_file, hostname)
+
+
+async def async_download_file(remote_file, local_file=None, hostname=None):
+    """Download a remote file to the local machine.
+
+    Coroutine version of :func:`robottelo.ssh.download_file`, accepting the
+    same arguments.
+
+    """
+    loop = asyncio.get_event_loop()
+    await loop.run_in_executor(
+        None, ssh.download_file, remote_file, local_file, hostname)
+
+
+def _get_background_loop():
+    """Return the event loop used by the synchronous adapters.
+
+    The loop runs forever on a daemon thread, started on first use. Forked
+    processes start their own loop.
+
+    """
+    global _background_loop  # pylint:disable=global-statement
+    global _background_loop_pid  # pylint:disable=global-statement
+    with _background_loop_lock:
+        if _background_loop is None or _background_loop_pid != os.getpid():
+            _background_loop = asyncio.new_event_loop()
+            _background_loop_pid = os.getpid()
+            thread = threading.Thread(
+                target=_background_loop.run_forever,
+                name='robottelo-ssh-async',
+            )
+            thread.daemon = True
+            thread.start()
+        return _background_loop
+
+
+def run_sync(coroutine):
+    """Run ``coroutine`` on the background event loop and wait for it.
+
+    Safe to call from any thread, except from the background loop itself.
+
+    :return: The value returned by ``coroutine``.
+
+    """
+    future = asyncio.run_coroutine_threadsafe(
+        coroutine, _get_background_loop())
+    return future.result()
+
+
+def command(cmd, hostname=None, output_format=None, timeout=None):
+    """Synchronous adapter for :func:`async_command`.
+
+    Drop-in replacement for :func:`robottelo.ssh.command`.
+
+    :rtype: robottelo.ssh.SSHCommandResult
+
+    """
+    return run_sync(async_command(cmd, hostname, output_format, timeout))
+
+
+def upload_file(local_file, remote_file, hostname=None):
+    """Synchronous adapter for :func:`async_upload_file`."""
+    return run_sync(async_upload_file(local_file, remote_file, hostname))
+
+
+def download_file(remote_file, local_file=None, hostname=None):
+    """Synchronous adapter for :func:`async_download_file`."""
+    return run_sync(async_download_file(remote_file, local_file, hostname))
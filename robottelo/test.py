@@ -18,6 +18,10 @@ except ImportError:
 
 from datetime import datetime
 from robottelo import ssh
+from robottelo.cli import cache as cli_cache
+from robottelo.cli import command_tree
+from robottelo.cli import session as hammer_session
+from robottelo.cli import shell as hammer_shell
 from robottelo.cli.base import CLIReturnCodeError
 from robottelo.cli.org import Org as OrgCli
 from robottelo.cli.subscription import Subscription
@@ -26,17 +30,19 @@ from robottelo.performance.constants import(
     DEFAULT_ORG,
     NUM_THREADS,
 )
+from robottelo.performance.driver import (
+    LoadDriver,
+    PERCENTILES,
+    supports_open_loop,
+)
 from robottelo.performance.graph import(
     generate_bar_chart_stat,
     generate_line_chart_raw_candlepin,
     generate_line_chart_stat_bucketized_candlepin,
 )
-from robottelo.performance.stat import generate_stat_for_concurrent_thread
-from robottelo.performance.thread import (
-    DeleteThread,
-    SyncThread,
-    SubscribeAKThread,
-    SubscribeAttachThread
+from robottelo.performance.stat import (
+    generate_stat_from_histograms,
+    merge_thread_stats,
 )
 from robottelo.ui.browser import browser, DockerBrowser
 from robottelo.ui.activationkey import ActivationKey
@@ -108,8 +114,27 @@ class APITestCase(TestCase):
 
 
 class CLITestCase(TestCase):
-    """Test case for CLI tests."""
+    """Test case for CLI tests.
+
+    Set ``use_hammer_shell = True`` on a subclass to run its hammer commands
+    on persistent ``hammer shell`` sessions, see :mod:`robottelo.cli.shell`.
+
+    Set ``use_hammer_sessions = True`` to run its hammer commands with
+    authenticated sessions instead of credentials, see
+    :mod:`robottelo.cli.session`.
+
+    Set ``use_cli_cache = True`` to cache the results of its ``info`` and
+    ``list`` commands, see :mod:`robottelo.cli.cache`.
+
+    Set ``validate_hammer_options = True`` to reject unknown subcommands and
+    options before running hammer, see :mod:`robottelo.cli.command_tree`.
+
+    """
     _multiprocess_can_split_ = True
+    use_hammer_shell = False
+    use_hammer_sessions = False
+    use_cli_cache = False
+    validate_hammer_options = False
 
     @classmethod
     def setUpClass(cls):  # noqa
@@ -121,6 +146,28 @@ class CLITestCase(TestCase):
         cls.key_filename = settings.server.ssh_key
         cls.root = settings.server.ssh_username
         cls.locale = settings.locale
+        if cls.use_hammer_shell:
+            hammer_shell.enable()
+        if cls.use_hammer_sessions:
+            hammer_session.enable()
+        if cls.use_cli_cache:
+            cli_cache.enable()
+        if cls.validate_hammer_options:
+            command_tree.enable()
+
+    @classmethod
+    def tearDownClass(cls):  # noqa
+        """Stop the ``hammer shell`` sessions and cache used by the class."""
+        if cls.use_hammer_shell:
+            hammer_shell.disable()
+        if cls.use_hammer_sessions:
+            hammer_session.disable()
+        if cls.use_cli_cache:
+            cls.logger.info(
+                u'CLI cache statistics:\n%s', cli_cache.disable().report())
+        if cls.validate_hammer_options:
+            command_tree.disable()
+        super(CLITestCase, cls).tearDownClass()
 
     def setUp(self):  # noqa
         """Log test class and method name before each test."""
@@ -281,9 +328,16 @@ class ConcurrentTestCase(TestCase):
         super(ConcurrentTestCase, cls).setUpClass()
 
         # general running parameters
-        cls.num_threads = NUM_THREADS
+        cls.num_threads = settings.performance.num_threads or NUM_THREADS
+        cls.warmup_iterations = settings.performance.warmup_iterations
+        cls.cooldown_iterations = settings.performance.cooldown_iterations
+        cls.arrival_rate = settings.performance.arrival_rate
+        cls.separate_connect_time = (
+            settings.performance.separate_connect_time)
         cls.num_buckets = settings.performance.csv_buckets_count
+        cls.raw_csv = settings.performance.raw_csv
         cls.vm_list = settings.performance.virtual_machines
+        cls.simulated_consumers = settings.performance.simulated_consumers
         cls.org_id = cls._get_organization_id()  # get organization-id
         cls.sub_id = ''
         cls.num_iterations = 0     # depend on # of threads or clients
@@ -297,7 +351,9 @@ class ConcurrentTestCase(TestCase):
     @classmethod
     def _convert_to_numbers(cls):
         """read in string type series, convert to numbers"""
-        cls.num_threads = [int(x) for x in cls.num_threads.split(',')]
+        if not isinstance(cls.num_threads, list):
+            cls.num_threads = cls.num_threads.split(',')
+        cls.num_threads = [int(x) for x in cls.num_threads]
         cls.num_buckets = int(cls.num_buckets)
 
     @classmethod
@@ -345,11 +401,11 @@ class ConcurrentTestCase(TestCase):
     def _get_organization_id(cls):
         """Get organization id"""
         try:
-            result = OrgCli.list(per_page=False)
+            organization = next(OrgCli.iter_list(page_size=1))
         except CLIReturnCodeError:
             cls.logger.error('Fail to get organization id.')
             raise RuntimeError('Invalid organization id. Stop!')
-        return result[0]['id']
+        return organization['id']
 
     def setUp(self):
         self.logger.debug(
@@ -369,15 +425,15 @@ class ConcurrentTestCase(TestCase):
     def _get_subscription_id(self):
         """Get subscription id"""
         try:
-            result = Subscription.list(
+            subscription = next(Subscription.iter_list(
                 {'organization-id': self.org_id},
-                per_page=False
-            )
+                page_size=1
+            ))
         except CLIReturnCodeError:
             self.logger.error('Fail to get subscription id!')
             raise RuntimeError('Invalid subscription id. Stop!')
-        subscription_id = result[0]['id']
-        subscription_name = result[0]['name']
+        subscription_id = subscription['id']
+        subscription_name = subscription['name']
         self.logger.info(
             'Subscribed to {0} with subscription id {1}'
             .format(subscription_name, subscription_id)
@@ -398,11 +454,11 @@ class ConcurrentTestCase(TestCase):
            1000 iterations concurrently;
 
         """
-        self.num_iterations = total_iterations / current_num_threads
+        self.num_iterations = total_iterations // current_num_threads
 
     def _set_bucket_size(self):
         """Set size for each bucket"""
-        bucket = self.num_iterations / self.num_buckets
+        bucket = self.num_iterations // self.num_buckets
 
         # check if num_iterations for each client is smaller than 10
         if bucket > 0:
@@ -410,10 +466,70 @@ class ConcurrentTestCase(TestCase):
         else:
             self.bucket_size = 1
 
-    def _join_all_threads(self, thread_list):
-        """Wait for all threads to complete"""
-        for thread in thread_list:
-            thread.join()
+    def _get_client_operation(self, operation, params, current_num_threads):
+        """Return the operation run by the clients and its parameters.
+
+        With ``[performance] simulated_consumers`` enabled, the clients are
+        :class:`robottelo.performance.consumer.SimulatedConsumer` and the
+        ``simulated-`` variant of ``operation`` is used. Otherwise each client
+        runs ``subscription-manager`` on its own virtual machine, which must
+        be listed in ``[performance] virtual_machines``.
+
+        :param str operation: The name of the operation, like
+            ``'register-ak'``.
+        :param dict params: The parameters of the operation, without the
+            clients.
+        :param int current_num_threads: The number of clients.
+        :return: A tuple of the operation name and its parameters.
+
+        """
+        if self.simulated_consumers:
+            return 'simulated-{0}'.format(operation), params
+        # check if number of threads are mapped with number of vms
+        current_vm_list = self.vm_list[:current_num_threads]
+        self.assertEqual(len(current_vm_list), current_num_threads)
+        return operation, dict(params, clients=current_vm_list)
+
+    def _run_load(self, operation, params, current_num_threads, iterations,
+                  warmup=True):
+        """Run ``operation`` from ``current_num_threads`` workers.
+
+        The workers start at the same time and each one runs ``iterations``
+        operations, one after the other. When ``[performance] arrival_rate``
+        is set, the operations are started at that rate instead, whatever
+        the time the previous ones take, see
+        :meth:`robottelo.performance.driver.LoadDriver.run_open_loop`. This
+        is not done for operations running on virtual machines, which can
+        only run one operation at a time.
+
+        Every timing is kept only when ``[performance] raw_csv`` is enabled,
+        otherwise each worker only keeps the histograms of its timings.
+
+        :param bool warmup: Whether to run the warmup and cooldown
+            iterations. Disable it for operations which can not be repeated,
+            like deletions.
+        :return: A :class:`robottelo.performance.driver.LoadResult`.
+
+        """
+        driver = LoadDriver(
+            operation,
+            params,
+            warmup=self.warmup_iterations if warmup else 0,
+            cooldown=self.cooldown_iterations if warmup else 0,
+            keep_measures=self.raw_csv,
+            bucket_size=self.bucket_size,
+        )
+        if self.arrival_rate and not supports_open_loop(operation):
+            self.logger.warning(
+                'Ignoring arrival_rate: %s runs one operation at a time on '
+                'each client', operation)
+        elif self.arrival_rate:
+            return driver.run_open_loop(
+                self.arrival_rate,
+                current_num_threads * iterations,
+                current_num_threads,
+            )
+        return driver.run(current_num_threads, iterations)
 
     def _get_output_filename(self, file_name):
         """Get type of test: ak/att/del/reg as output file name
@@ -480,10 +596,55 @@ class ConcurrentTestCase(TestCase):
             .format(test_category, current_num_threads)
         )
 
+    def _write_latency_csv_file(
+            self,
+            raw_file_name,
+            result,
+            stream,
+            test_case_name):
+        """Write the latency percentiles of a test case next to its raw data
+
+        The percentiles of the duration of the operations, as seen by the
+        client, are written to ``<raw file name>-latency.csv`` along with
+        the percentiles corrected with the time the operations waited to
+        start when run at a constant ``arrival_rate``. Without it both are
+        the same.
+
+        :param str raw_file_name: The name of the raw csv file of the test
+            case
+        :param result: The :class:`robottelo.performance.driver.LoadResult`
+            of the test case
+        :param str stream: The result stream to write, like ``'attach'``
+        :param str test_case_name: The type of test case, like
+            ``raw-att-10-clients``
+
+        """
+        percents = sorted(PERCENTILES)
+        with open('{0}-latency.csv'.format(
+                self._get_output_filename(raw_file_name)), 'a') as handler:
+            writer = csv.writer(handler)
+            writer.writerow([test_case_name])
+            writer.writerow(
+                ['latency', 'arrival-rate', 'operations', 'errors'] +
+                ['{0}%'.format(percent) for percent in percents]
+            )
+            for name, corrected in (('duration', False), ('corrected', True)):
+                percentiles = result.percentiles(stream, percents, corrected)
+                writer.writerow(
+                    [
+                        name,
+                        self.arrival_rate or '',
+                        result.count(stream),
+                        len(result.errors(stream)),
+                    ] +
+                    [percentiles.get(percent, '') for percent in percents]
+                )
+            writer.writerow([])
+
     def _write_stat_csv_chart(
             self,
             stat_file_name,
-            time_result_dict,
+            thread_stats,
             current_num_threads,
             test_case_name):
         """Compute stat of ak/att/del/reg and generate charts
@@ -501,7 +662,9 @@ class ConcurrentTestCase(TestCase):
         :param str stat_file_name: The name of output csv file. The value
             is read from ``robottelo.constants`` but set by each test case
             using function ``_set_testcase_parameters`` defined in this module
-        :param dict time_result_dict: The storage of all 5k timing values
+        :param list thread_stats: The
+            :class:`robottelo.performance.stat.ThreadStat` of each client,
+            see :meth:`robottelo.performance.driver.LoadResult.thread_stats`
         :param int current_num_threads: The number of threads/clients
         :param str test_case_name: The type of test case, set by function
             ``_get_output_filename`` defined in this module
@@ -515,7 +678,7 @@ class ConcurrentTestCase(TestCase):
             writer.writerow(['stat-per-client-bucketized'])
             self._write_stat_per_client_bucketized(
                 stat_file_name,
-                time_result_dict,
+                thread_stats,
                 current_num_threads,
             )
             writer.writerow([])
@@ -524,7 +687,7 @@ class ConcurrentTestCase(TestCase):
             writer.writerow(['stat-per-test-bucketized'])
             self._write_stat_per_test_bucketized(
                 stat_file_name,
-                time_result_dict,
+                thread_stats,
             )
             writer.writerow([])
 
@@ -532,7 +695,7 @@ class ConcurrentTestCase(TestCase):
             writer.writerow(['stat-per-client'])
             self._write_stat_per_client(
                 stat_file_name,
-                time_result_dict,
+                thread_stats,
                 current_num_threads,
             )
             writer.writerow([])
@@ -541,14 +704,14 @@ class ConcurrentTestCase(TestCase):
             writer.writerow(['stat-per-test'])
             self._write_stat_per_test(
                 stat_file_name,
-                time_result_dict,
+                thread_stats,
             )
             writer.writerow([])
 
     def _write_stat_per_client_bucketized(
             self,
             stat_file_name,
-            time_result_dict,
+            thread_stats,
             current_num_threads):
         """Write bucketized stat of per-client results to csv file
 
@@ -563,14 +726,17 @@ class ConcurrentTestCase(TestCase):
         test_category = self._get_output_filename(stat_file_name)
 
         for i in range(current_num_threads):
-            time_list = time_result_dict.get('thread-{0}'.format(i))
+            buckets = thread_stats[i].complete_buckets()
             thread_name = 'client-{0}'.format(i)
-            stat_dict = generate_stat_for_concurrent_thread(
+            stat_dict = generate_stat_from_histograms(
                 thread_name,
-                time_list,
+                [
+                    ('{0}-{1}'.format(
+                        self.bucket_size * j + 1, self.bucket_size * (j + 1)),
+                     bucket)
+                    for j, bucket in enumerate(buckets)
+                ],
                 stat_file_name,
-                self.bucket_size,
-                self.num_buckets
             )
 
             # create line chart with each client being grouped by buckets
@@ -588,7 +754,7 @@ class ConcurrentTestCase(TestCase):
     def _write_stat_per_test_bucketized(
             self,
             stat_file_name,
-            time_result_dict):
+            thread_stats):
         """Write bucketized stat of per-test to csv file
 
         note: each bucket of all clients would merge into a chunk;
@@ -600,35 +766,31 @@ class ConcurrentTestCase(TestCase):
             ...
             thread-9: [(50 data) | (50 data)|...]
             Output:
-            sublist [500 data grouped from all clients' first buckets],
+            stat of [500 data grouped from all clients' first buckets],
                     [500 data grouped from all clients' next buckets],
                     ...
                     [500 data grouped from all clients' last buckets];
             line chart of statistics on these chunks.
 
+        The histograms of the buckets of all clients are merged, instead of
+        the timings themselves.
+
         """
         # parameters for generating bucketized line chart
         stat_dict = {}
-        return_stat = {}
-        current_num_threads = len(time_result_dict)
+        current_num_threads = len(thread_stats)
         test_category = self._get_output_filename(stat_file_name)
+        chunks = merge_thread_stats(thread_stats).complete_buckets()
 
         for i in range(self.num_buckets):
-            chunks_bucket_i = []
-            for j in range(len(time_result_dict)):
-                time_list = time_result_dict.get('thread-{0}'.format(j))
-                # slice out bucket-size from each client's result and merge
-                chunks_bucket_i += time_list[
-                    i * self.bucket_size: (i + 1) * self.bucket_size
-                ]
+            chunk_i = chunks[i] if i < len(chunks) else None
 
             # for each chunk i, compute and output its stat
-            return_stat = generate_stat_for_concurrent_thread(
+            return_stat = generate_stat_from_histograms(
                 'bucket-{0}'.format(i),
-                chunks_bucket_i,
+                [('1-{0}'.format(chunk_i.count), chunk_i)]
+                if chunk_i is not None else [],
                 stat_file_name,
-                len(chunks_bucket_i),
-                1
             )
 
             # for each chunk i, add stat into final return_dict
@@ -649,30 +811,27 @@ class ConcurrentTestCase(TestCase):
     def _write_stat_per_client(
             self,
             stat_file_name,
-            time_result_dict,
+            thread_stats,
             current_num_threads):
         """Write stat of per-client results to csv file
 
-        note: take the full list of a client i; calculate stat on the list
+        note: take the full histogram of a client i; calculate stat on it
 
         """
         # parameters for generating bucketized line chart
         stat_dict = {}
-        return_stat = {}
-        current_num_threads = len(time_result_dict)
+        current_num_threads = len(thread_stats)
         test_category = self._get_output_filename(stat_file_name)
 
         for i in range(current_num_threads):
-            time_list = time_result_dict.get('thread-{0}'.format(i))
+            histogram = thread_stats[i].histogram
             thread_name = 'client-{0}'.format(i)
 
             # for each client i, compute and output its stat
-            return_stat = generate_stat_for_concurrent_thread(
+            return_stat = generate_stat_from_histograms(
                 thread_name,
-                time_list,
+                [('1-{0}'.format(histogram.count), histogram)],
                 stat_file_name,
-                len(time_list),
-                1
             )
 
             # for each chunk i, add stat into final return_dict
@@ -689,26 +848,20 @@ class ConcurrentTestCase(TestCase):
             'client'
         )
 
-    def _write_stat_per_test(self, stat_file_name, time_result_dict):
+    def _write_stat_per_test(self, stat_file_name, thread_stats):
         """Write stat of per-test results to csv file
 
-        note: take the full dictionary of test and calculate overall stat
+        note: merge the histograms of all clients and calculate overall stat
 
         """
-        full_list = []  # list containing 1st to 5kth data point
-        current_num_threads = len(time_result_dict)
+        current_num_threads = len(thread_stats)
         test_category = self._get_output_filename(stat_file_name)
+        histogram = merge_thread_stats(thread_stats).histogram
 
-        for i in range(len(time_result_dict)):
-            time_list = time_result_dict.get('thread-{0}'.format(i))
-            full_list += time_list
-
-        stat_dict = generate_stat_for_concurrent_thread(
-            'test-{0}'.format(len(time_result_dict)),
-            full_list,
+        stat_dict = generate_stat_from_histograms(
+            'test-{0}'.format(current_num_threads),
+            [('1-{0}'.format(histogram.count), histogram)],
             stat_file_name,
-            len(full_list),
-            1
         )
 
         generate_bar_chart_stat(
@@ -728,50 +881,43 @@ class ConcurrentTestCase(TestCase):
         :param int total_iterations: # of iterations a test case would run
 
         """
-        # check if number of threads are mapped with number of vms
-        current_vm_list = self.vm_list[:current_num_threads]
-        self.assertEqual(len(current_vm_list), current_num_threads)
+        operation, params = self._get_client_operation(
+            'register-ak',
+            {'ak_name': self.ak_name, 'org': self.default_org},
+            current_num_threads,
+        )
 
         # Parameter for statistics files
         self._set_num_iterations(total_iterations, current_num_threads)
         self._set_bucket_size()
 
-        # Create a list to store all threads
-        thread_list = []
-        # Create a dictionary to store all timing results from each client
-        time_result_dict_ak = {}
-
-        # Create new threads and start each thread mapped with a vm
-        for i in range(current_num_threads):
-            thread_name = 'thread-{0}'.format(i)
-            time_result_dict_ak[thread_name] = []
-            thread = SubscribeAKThread(
-                i,
-                thread_name,
-                time_result_dict_ak,
-                self.num_iterations,
-                self.ak_name,
-                self.default_org,
-                current_vm_list[i]
-            )
-            thread.start()
-            thread_list.append(thread)
-
-        # wait all threads in thread list
-        self._join_all_threads(thread_list)
+        # Register all clients at the same time, each one with its own vm
+        result = self._run_load(
+            operation,
+            params,
+            current_num_threads,
+            self.num_iterations,
+        )
 
         # write raw result of activation-key
-        self._write_raw_csv_file(
+        if self.raw_csv:
+            self._write_raw_csv_file(
+                self.raw_file_name,
+                result.timings('register-ak'),
+                current_num_threads,
+                'raw-ak-{0}-clients'.format(current_num_threads)
+            )
+        self._write_latency_csv_file(
             self.raw_file_name,
-            time_result_dict_ak,
-            current_num_threads,
+            result,
+            'register-ak',
             'raw-ak-{0}-clients'.format(current_num_threads)
         )
 
         # write stat result of ak and generate charts
         self._write_stat_csv_chart(
             self.stat_file_name,
-            time_result_dict_ak,
+            result.thread_stats('register-ak'),
             current_num_threads,
             'stat-ak-{0}-clients'.format(current_num_threads)
         )
@@ -783,65 +929,63 @@ class ConcurrentTestCase(TestCase):
         :param int total_iterations: # of deletions a test case would run
 
         """
-        # check if number of threads are mapped with number of vms
-        current_vm_list = self.vm_list[:current_num_threads]
-        self.assertEqual(len(current_vm_list), current_num_threads)
+        operation, params = self._get_client_operation(
+            'register-attach',
+            {
+                'subscription_id': self.sub_id,
+                'org': self.default_org,
+                'environment': self.environment,
+            },
+            current_num_threads,
+        )
 
         # Parameter for statistics files
         self._set_num_iterations(total_iterations, current_num_threads)
         self._set_bucket_size()
 
-        # Create a list to store all threads
-        thread_list = []
-        # Create a dictionary to store register timings from each client
-        time_result_dict_register = {}
-        # Create a dictionary to store attach timings from each client
-        time_result_dict_attach = {}
-
-        # Create new threads and start each thread mapped with a vm
-        for i in range(current_num_threads):
-            thread_name = 'thread-{0}'.format(i)
-            time_result_dict_register[thread_name] = []
-            time_result_dict_attach[thread_name] = []
-
-            thread = SubscribeAttachThread(
-                i,
-                thread_name,
-                {},
-                time_result_dict_register,
-                time_result_dict_attach,
-                self.num_iterations,
-                self.sub_id,
-                self.default_org,
-                self.environment,
-                current_vm_list[i]
-            )
-            thread.start()
-            thread_list.append(thread)
-
-        # wait all threads in thread list
-        self._join_all_threads(thread_list)
+        # Register and attach all clients at the same time, each one with
+        # its own vm
+        result = self._run_load(
+            operation,
+            params,
+            current_num_threads,
+            self.num_iterations,
+        )
 
         # write raw result of register
-        self._write_raw_csv_file(
+        if self.raw_csv:
+            self._write_raw_csv_file(
+                self.reg_raw_file_name,
+                result.timings('register'),
+                current_num_threads,
+                'raw-reg-{0}-clients'.format(current_num_threads)
+            )
+        self._write_latency_csv_file(
             self.reg_raw_file_name,
-            time_result_dict_register,
-            current_num_threads,
+            result,
+            'register',
             'raw-reg-{0}-clients'.format(current_num_threads)
         )
 
         # write raw result of attach
-        self._write_raw_csv_file(
+        if self.raw_csv:
+            self._write_raw_csv_file(
+                self.raw_file_name,
+                result.timings('attach'),
+                current_num_threads,
+                'raw-att-{0}-clients'.format(current_num_threads)
+            )
+        self._write_latency_csv_file(
             self.raw_file_name,
-            time_result_dict_attach,
-            current_num_threads,
+            result,
+            'attach',
             'raw-att-{0}-clients'.format(current_num_threads)
         )
 
         # write stat result of register and generate charts
         self._write_stat_csv_chart(
             self.reg_stat_file_name,
-            time_result_dict_register,
+            result.thread_stats('register'),
             current_num_threads,
             'stat-reg-{0}-clients'.format(current_num_threads)
         )
@@ -849,7 +993,7 @@ class ConcurrentTestCase(TestCase):
         # write stat result of attach and generate charts
         self._write_stat_csv_chart(
             self.stat_file_name,
-            time_result_dict_attach,
+            result.thread_stats('attach'),
             current_num_threads,
             'stat-att-{0}-clients'.format(current_num_threads)
         )
@@ -863,7 +1007,7 @@ class ConcurrentTestCase(TestCase):
         # Get list of all uuids of registered systems
 
         self.logger.info('Retrieve list of uuids of all registered systems:')
-        uuid_list = self._get_registered_uuids()
+        uuid_list = [uuid for uuid in self._get_registered_uuids() if uuid]
 
         # Parameter for statistics files
         total_iterations = len(uuid_list)
@@ -871,40 +1015,42 @@ class ConcurrentTestCase(TestCase):
         self._set_num_iterations(total_iterations, current_num_threads)
         self._set_bucket_size()
 
-        # Create a list to store all threads
-        thread_list = []
-        # Create a dictionary to store all timing results from each thread
-        time_result_dict_del = {}
-
-        # Create new threads and start the thread which has sublist of uuids
-        for i in range(current_num_threads):
-            time_result_dict_del['thread-{0}'.format(i)] = []
-            thread = DeleteThread(
-                i,
-                'thread-{0}'.format(i),
-                uuid_list[
-                    self.num_iterations * i: self.num_iterations * (i + 1)
-                ],
-                time_result_dict_del
-            )
-            thread.start()
-            thread_list.append(thread)
-
-        # wait all threads in thread list
-        self._join_all_threads(thread_list)
+        # Each thread deletes its own sublist of uuids, measuring the time
+        # spent opening connections apart if asked to
+        result = self._run_load(
+            'delete-connect' if self.separate_connect_time else 'delete',
+            {'uuids': uuid_list},
+            current_num_threads,
+            self.num_iterations,
+            warmup=False,
+        )
 
         # write raw result of del
-        self._write_raw_csv_file(
+        if self.raw_csv:
+            self._write_raw_csv_file(
+                self.raw_file_name,
+                result.timings('delete'),
+                current_num_threads,
+                'raw-del-{0}-clients'.format(current_num_threads)
+            )
+        self._write_latency_csv_file(
             self.raw_file_name,
-            time_result_dict_del,
-            current_num_threads,
+            result,
+            'delete',
             'raw-del-{0}-clients'.format(current_num_threads)
         )
+        if self.separate_connect_time:
+            self._write_latency_csv_file(
+                self.raw_file_name,
+                result,
+                'connect',
+                'raw-del-connect-{0}-clients'.format(current_num_threads)
+            )
 
         # write stat result of del
         self._write_stat_csv_chart(
             self.stat_file_name,
-            time_result_dict_del,
+            result.thread_stats('delete'),
             current_num_threads,
             'stat-del-{0}-clients'.format(current_num_threads)
         )
@@ -932,48 +1078,38 @@ class ConcurrentTestCase(TestCase):
             .format(repo_names_list)
         )
 
-        # Create a list to store all threads
-        thread_list = []
+        # each thread syncs a single repository
+        repositories = []
+        for repo_name in repo_names_list:
+            repo_id = self.map_repo_name_id.get(repo_name, None)
+            if repo_id is None:
+                self.logger.warning('Invalid repository name!')
+                continue
+            repositories.append((repo_id, repo_name))
+
         # Create a dictionary to store all timing results from each thread
         time_result_dict = {}
-        for thread_id in range(current_num_threads):
+        for thread_id in range(len(repositories)):
             time_result_dict['thread-{0}'.format(thread_id)] = []
 
         # sync all specified repositories and repeate X times
         for iteration in range(self.sync_iterations):
-            # for each thread, sync a single repository
-            for tid in range(current_num_threads):
-                repo_name = repo_names_list[tid]
-                repo_id = self.map_repo_name_id.get(repo_name, None)
-
-                if repo_id is None:
-                    self.logger.warning('Invalid repository name!')
-                    continue
-
-                self.logger.debug(
-                    '{0} repository {1} attempt {2} '
-                    'on {3}-repo test case starts:'
-                    .format(
-                        'Initially sync' if is_initial_sync else 'Resync',
-                        repo_name,
-                        iteration,
-                        current_num_threads
-                    )
-                )
-
-                thread = SyncThread(
-                    tid,
-                    "thread-{0}".format(tid),
-                    time_result_dict,
-                    repo_id,
-                    repo_name,
+            self.logger.debug(
+                '{0} repositories {1} attempt {2} '
+                'on {3}-repo test case starts:'
+                .format(
+                    'Initially sync' if is_initial_sync else 'Resync',
+                    ', '.join(name for _, name in repositories),
                     iteration,
+                    current_num_threads
                 )
-                thread.start()
-                thread_list.append(thread)
-
-            # wait all threads in thread list
-            self._join_all_threads(thread_list)
+            )
+            timings = LoadDriver(
+                'sync',
+                {'repositories': repositories},
+            ).run(len(repositories), 1).timings('sync')
+            for thread_name, time_list in timings.items():
+                time_result_dict[thread_name].extend(time_list)
 
             # Once all threads have completed syncs,
             # reset database before next iteration, if initial sync test
@@ -157,17 +157,13 @@ class VirtualMachine(object):
         if self._subscribed:
             self.unregister()
 
-        ssh.command(
-            u'virsh destroy {0}'.format(self.hostname),
-            hostname=self.provisioning_server
-        )
-        ssh.command(
-            u'virsh undefine {0}'.format(self.hostname),
-            hostname=self.provisioning_server
-        )
         image_name = u'{0}.img'.format(self.hostname)
-        ssh.command(
-            u'rm {0}'.format(os.path.join(self.image_dir, image_name)),
+        ssh.command_batch(
+            [
+                u'virsh destroy {0}'.format(self.hostname),
+                u'virsh undefine {0}'.format(self.hostname),
+                u'rm {0}'.format(os.path.join(self.image_dir, image_name)),
+            ],
             hostname=self.provisioning_server
         )
 
@@ -299,6 +295,29 @@ class VirtualMachine(object):
 
         return ssh.command(cmd, hostname=self.ip_addr)
 
+    def run_batch(self, cmds, stop_on_error=False):
+        """Runs several ssh commands on the virtual machine in a single round
+        trip, see :func:`robottelo.ssh.command_batch`.
+
+        :param list cmds: Commands to run on the virtual machine, in order
+        :param bool stop_on_error: Whether to stop at the first failing
+            command
+        :return: A list of :class:`robottelo.ssh.SSHCommandResult` instances
+            with the commands results
+        :rtype: list
+        :raises robottelo.vm.VirtualMachineError: If the virtual machine is not
+            created.
+
+        """
+        if not self._created:
+            raise VirtualMachineError(
+                'The virtual machine should be created before running any ssh '
+                'command'
+            )
+
+        return ssh.command_batch(
+            cmds, hostname=self.ip_addr, stop_on_error=stop_on_error)
+
     def get(self, remote_path, local_path=None):
         """Get a remote file from the virtual machine."""
         if not self._created:
@@ -348,18 +367,20 @@ class VirtualMachine(object):
             'server          = {1}\n'
             .format(sat6_hostname, sat6_hostname)
         )
-        result = self.run(u'yum install puppet -y')
+        # The puppet run on client would populate a cert on sat6 under the
+        # capsule --> certifcates or via cli "puppet cert list", so that we
+        # sign it.
+        result = self.run_batch(
+            [
+                u'yum install puppet -y',
+                'echo "{0}" >> /etc/puppet/puppet.conf'.format(puppet_conf),
+                u'puppet agent -t',
+            ],
+            stop_on_error=True
+        )[0]
         if result.return_code != 0:
             raise VirtualMachineError(
                 'Failed to install the puppet rpm')
-        self.run(
-            'echo "{0}" >> /etc/puppet/puppet.conf'
-            .format(puppet_conf)
-        )
-        # This particular puppet run on client would populate a cert on sat6
-        # under the capsule --> certifcates or via cli "puppet cert list", so
-        # that we sign it.
-        self.run(u'puppet agent -t')
         ssh.command(u'puppet cert sign --all')
         # This particular puppet run would create the host entity under
         # 'All Hosts' and let's redirect stderr to /dev/null as errors at this
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+"""Compare the latency of hammer commands with and without sessions.
+
+Runs ``hammer organization list --per-page 1`` on the server configured in
+``robottelo.properties``, first passing the credentials to every command,
+then reusing an authenticated session (see ``robottelo.cli.session``), and
+prints the median, mean and 95th percentile latency of each.
+
+The server can be loaded while measuring by running the same commands from
+``LOAD`` background threads.
+
+Usage::
+
+    python scripts/benchmark_hammer_session.py [COMMANDS] [LOAD]
+
+"""
+from __future__ import print_function
+
+import sys
+import threading
+import time
+
+from robottelo.cli import session
+from robottelo.cli.org import Org
+from robottelo.config import settings
+
+
+def run_command():
+    """Run the measured command and return its duration."""
+    start = time.time()
+    Org.list({u'per-page': 1})
+    return time.time() - start
+
+
+def load(stop):
+    """Run commands until ``stop`` is set."""
+    while not stop.is_set():
+        run_command()
+
+
+def measure(name, commands):
+    """Run ``commands`` commands and print their latency."""
+    durations = sorted(run_command() for _ in range(commands))
+    print('{0:<24} median {1:>6.3f} s  mean {2:>6.3f} s  p95 {3:>6.3f} s'
+          .format(
+              name,
+              durations[len(durations) // 2],
+              sum(durations) / len(durations),
+              durations[int(len(durations) * 0.95)],
+          ))
+
+
+def main():
+    """Run the benchmark."""
+    commands = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    load_threads = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    if not settings.configured:
+        settings.configure()
+
+    stop = threading.Event()
+    threads = [
+        threading.Thread(target=load, args=(stop,))
+        for _ in range(load_threads)
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        measure('with credentials', commands)
+        session.enable()
+        # Log in before measuring
+        run_command()
+        measure('with a session', commands)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+        session.disable()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""Compare listing records with ``Base.list`` and ``Base.iter_list``.
+
+Lists the records of a hammer command on the server configured in
+``robottelo.properties``, fetching the first record only, as ``Base.exists``
+does, then all of them:
+
+* with ``Base.list``, which asks for up to 10000 records in one call;
+* with ``Base.iter_list``, one page at a time, with and without prefetch.
+
+For each run prints the time it took and the CPU time used on the server,
+read from ``/proc/stat``, as a measure of the load. Use an organization with
+10000 or more records to see a difference.
+
+Usage::
+
+    python scripts/benchmark_iter_list.py ORGANIZATION_ID [COMMAND] [PAGE_SIZE]
+
+``COMMAND`` is the name of a class of ``robottelo.cli``, ``ContentHost`` by
+default.
+
+"""
+from __future__ import print_function
+
+import importlib
+import inspect
+import os
+import sys
+import time
+
+from itertools import islice
+from robottelo import ssh
+from robottelo.cli.base import Base, DEFAULT_PAGE_SIZE
+from robottelo.config import settings
+
+
+def find_command(name):
+    """Return the ``robottelo.cli`` class called ``name``."""
+    package = os.path.join(os.path.dirname(__file__), '..', 'robottelo', 'cli')
+    for filename in sorted(os.listdir(package)):
+        if not filename.endswith('.py'):
+            continue
+        module = importlib.import_module(
+            'robottelo.cli.{0}'.format(filename[:-3]))
+        command = getattr(module, name, None)
+        if inspect.isclass(command) and issubclass(command, Base):
+            return command
+    sys.exit('No CLI class called {0}'.format(name))
+
+
+def server_cpu_time():
+    """Return the CPU seconds used on the server since it started."""
+    fields = ssh.command('head -n 1 /proc/stat').stdout[0].split()
+    user, nice, system = (int(field) for field in fields[1:4])
+    return (user + nice + system) / float(os.sysconf('SC_CLK_TCK'))
+
+
+def measure(name, function):
+    """Run ``function`` and print its duration and the server CPU time."""
+    cpu_start = server_cpu_time()
+    start = time.time()
+    count = function()
+    elapsed = time.time() - start
+    cpu = server_cpu_time() - cpu_start
+    print('{0:<40} {1:>8} records {2:>8.2f} s {3:>8.2f} s server CPU'.format(
+        name, count, elapsed, cpu))
+
+
+def main():
+    """Run the benchmark."""
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    options = {u'organization-id': sys.argv[1]}
+    command = find_command(sys.argv[2] if len(sys.argv) > 2 else 'ContentHost')
+    page_size = (
+        int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_PAGE_SIZE)
+    if not settings.configured:
+        settings.configure()
+
+    measure('first record, list', lambda: len(command.list(options)[:1]))
+    measure('first record, iter_list', lambda: sum(
+        1 for _ in islice(command.iter_list(options, page_size=1), 1)))
+    measure('all records, list', lambda: len(command.list(options)))
+    measure('all records, iter_list', lambda: sum(
+        1 for _ in command.iter_list(options, page_size=page_size)))
+    measure('all records, iter_list with prefetch', lambda: sum(
+        1 for _ in command.iter_list(
+            options, page_size=page_size, prefetch=True)))
+
+
+if __name__ == '__main__':
+    main()
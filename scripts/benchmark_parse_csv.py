@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Compare the memory and time used to parse a large hammer CSV output.
+
+Parses a synthetic ``content-host list`` output with the original
+implementation of ``hammer.parse_csv``, which joined the whole output into a
+single string, with the current ``hammer.parse_csv`` and with
+``hammer.parse_csv_iter``, keeping all the rows or reading them from a stream
+one at a time. Prints the peak memory allocated during each run, as reported
+by ``tracemalloc``, and the number of rows parsed per second.
+
+Usage::
+
+    python3 scripts/benchmark_parse_csv.py [ROWS]
+
+"""
+from __future__ import print_function
+
+import csv
+import io
+import sys
+import time
+import tracemalloc
+
+from robottelo.cli import hammer
+
+
+def generate_lines(rows):
+    """Yield the lines of a ``content-host list`` CSV output."""
+    yield u'ID,Name,Installable Errata,Content View,Lifecycle Environment'
+    for index in range(rows):
+        yield (
+            u'{0:08x}-5d1b-4c4e-9f07-6f4d8c0b9e3a,host{0}.example.com,'
+            u'{1},Default Organization View,Library'.format(index, index % 97)
+        )
+
+
+def legacy_parse_csv(output):
+    """The original ``hammer.parse_csv``, for reference."""
+    reader = csv.reader(io.StringIO('\n'.join(output)))
+    keys = [header.replace(' ', '-').lower() for header in next(reader)]
+    return [dict(zip(keys, values)) for values in reader if len(values) > 0]
+
+
+def keep_rows(output):
+    """Parse lazily and keep all the rows."""
+    return list(hammer.parse_csv_iter(output))
+
+
+def stream_rows(output):
+    """Parse lazily and drop each row once it was read."""
+    count = 0
+    for _ in hammer.parse_csv_iter(output):
+        count += 1
+    return count
+
+
+def measure(name, function, rows, stream):
+    """Run ``function`` on the output and print its peak memory and speed.
+
+    :param stream: If true the lines are generated as they are read, as when
+        parsing a ``robottelo.ssh.SSHCommandStream``. Otherwise they are in a
+        list built before the measure starts, as in an ``SSHCommandResult``.
+
+    """
+    if stream:
+        output = generate_lines(rows)
+    else:
+        output = list(generate_lines(rows))
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function(output)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    print('{0:<36} {1:>10.1f} MiB {2:>12,.0f} rows/s'.format(
+        name, peak / 2.0 ** 20, rows / elapsed))
+
+
+def main():
+    """Run the benchmark."""
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print('Parsing {0:,} rows'.format(rows))
+    measure('legacy parse_csv', legacy_parse_csv, rows, False)
+    measure('parse_csv', hammer.parse_csv, rows, False)
+    measure('parse_csv_iter, rows kept', keep_rows, rows, False)
+    measure('parse_csv_iter, streamed', stream_rows, rows, True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+"""Micro-benchmarks for ``hammer.parse_info``.
+
+Parses large synthetic ``info`` outputs with ``hammer.parse_info`` and with
+its original implementation, checks that both give the same result and
+prints the number of lines parsed per second by each.
+
+Usage::
+
+    python scripts/benchmark_parse_info.py [REPEAT]
+
+"""
+from __future__ import print_function
+
+import re
+import sys
+import timeit
+
+from robottelo.cli import hammer
+
+
+def content_view_output(versions=500):
+    """``content-view info`` output of a content view with many versions."""
+    lines = [
+        'ID:                     1',
+        'Name:                   big view',
+        'Label:                  big_view',
+        'Composite:',
+        'Description:',
+        'Content Host Count:     0',
+        'Organization:           Default Organization',
+        'Yum Repositories:',
+    ]
+    for index in range(1, versions + 1):
+        lines.extend([
+            ' {0}) ID:   {0}'.format(index),
+            '    Name: repo {0}'.format(index),
+            '    Label: repo_{0}'.format(index),
+        ])
+    lines.append('Versions:')
+    for index in range(1, versions + 1):
+        lines.extend([
+            ' {0}) ID:        {0}'.format(index),
+            '    Version:   {0}.0'.format(index),
+            '    Published: 2016/01/01 10:00:00',
+        ])
+    lines.append('Lifecycle Environments:')
+    lines.extend(
+        ' {0}) Library {0}'.format(index)
+        for index in range(1, versions + 1)
+    )
+    return lines
+
+
+def host_output(facts=2000):
+    """``host info`` output of a host with many facts and parameters."""
+    lines = [
+        'Id:                 1',
+        'Name:               host.example.com',
+        'Organization:       Default Organization',
+        'Location:           Default Location',
+        'Parameters:',
+    ]
+    lines.extend(
+        '    param_{0} => value {0}'.format(index) for index in range(facts)
+    )
+    lines.append('Facts:')
+    lines.extend(
+        '    fact {0}: value {0}'.format(index) for index in range(facts)
+    )
+    lines.append('Puppet Classes:')
+    lines.extend('    class_{0}'.format(index) for index in range(facts))
+    return lines
+
+
+def legacy_parse_info(output):
+    """The original ``hammer.parse_info``, for reference."""
+    contents = {}
+    sub_prop = None
+    sub_num = None
+    for line in output:
+        if line == '':
+            continue
+        if line.startswith(' '):
+            if line.find(':') != -1:
+                key, value = line.lstrip().split(":", 1)
+            elif line.find('=>') != -1:
+                key, value = line.lstrip().split(" =>", 1)
+            else:
+                key = value = None
+            if key is None and value is None:
+                match = re.match(r'\d+\)\s+(.+)$', line.lstrip())
+                if match is None:
+                    match = re.match(r'(.*)$', line.lstrip())
+                value = match.group(1)
+                if isinstance(contents[sub_prop], dict):
+                    contents[sub_prop] = []
+                contents[sub_prop].append(value)
+            else:
+                starts_with_number = re.match(r'(\d+)\)', key)
+                if starts_with_number:
+                    sub_num = int(starts_with_number.group(1))
+                    if sub_num == 1:
+                        contents[sub_prop] = []
+                    key = re.sub(r'\d+\)', '', key)
+                    contents[sub_prop].append({})
+                key = key.lstrip().replace(' ', '-').lower()
+                if sub_num is not None:
+                    contents[sub_prop][-1][key] = value.lstrip()
+                else:
+                    contents[sub_prop][key] = value.lstrip()
+        else:
+            sub_num = None
+            key, value = line.lstrip().split(":", 1)
+            key = key.lstrip().replace(' ', '-').lower()
+            if value.lstrip() == '':
+                sub_prop = key
+                contents[sub_prop] = {}
+            else:
+                contents[key] = value.lstrip()
+    return contents
+
+
+def main():
+    """Run the benchmarks."""
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    outputs = (
+        ('content view, 500 versions', content_view_output()),
+        ('host, 2000 facts', host_output()),
+    )
+    for name, output in outputs:
+        if hammer.parse_info(output) != legacy_parse_info(output):
+            sys.exit('parse_info output differs for {0}'.format(name))
+        for function in (legacy_parse_info, hammer.parse_info):
+            elapsed = min(timeit.repeat(
+                lambda: function(output), number=repeat, repeat=3))
+            print('{0:<28} {1:<18} {2:>12,.0f} lines/s'.format(
+                name,
+                function.__name__,
+                len(output) * repeat / elapsed,
+            ))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,31 +1,47 @@
 """Generate hammer command tree in json format by inspecting every command's
 help.
 
+The help of the commands of each level of the tree is fetched concurrently.
+If the output file already exists, the commands without subcommands are taken
+from it instead of being fetched again when the help of their parent did not
+change; use ``--full`` to fetch everything.
+
+Usage::
+
+    python scripts/hammer_command_tree.py [--full] [--max-parallel N] [FILE]
+
 """
+import argparse
 import json
+import os
 
 from robottelo import ssh
-from robottelo.cli import hammer
-
-
-def generate_command_tree(command):
-    """Recursively walk trhough the hammer commands and subcommands and fetch
-    their help. Return a dictionary with the contents.
-
-    """
-    output = ssh.command('{0} --help'.format(command)).stdout
-    contents = hammer.parse_help(output)
-    if len(contents['subcommands']) > 0:
-        for subcommand in contents['subcommands']:
-            subcommand.update(generate_command_tree(
-                '{0} {1}'.format(command, subcommand['name'])
-            ))
-    return contents
-
-# Generate the json file in the working directory
-with open('hammer_commands.json', 'w') as f:
-    f.write(json.dumps(
-        generate_command_tree('hammer'),
-        indent=2,
-        sort_keys=True
-    ))
+from robottelo.cli.command_tree import fetch_command_tree
+
+
+def main():
+    """Fetch the command tree and write it."""
+    parser = argparse.ArgumentParser(
+        description='Generate the hammer command tree in json format.')
+    parser.add_argument(
+        'output', nargs='?', default='hammer_commands.json',
+        help='file to write, and to read the previous tree from')
+    parser.add_argument(
+        '--full', action='store_true',
+        help='fetch the help of every command, ignoring the previous tree')
+    parser.add_argument(
+        '--max-parallel', type=int, default=ssh.DEFAULT_MAX_PARALLEL,
+        help='maximum number of hammer commands running at a time')
+    args = parser.parse_args()
+
+    previous = None
+    if not args.full and os.path.isfile(args.output):
+        with open(args.output) as handler:
+            previous = json.load(handler)
+    tree = fetch_command_tree(previous, max_parallel=args.max_parallel)
+    with open(args.output, 'w') as handler:
+        handler.write(json.dumps(tree, indent=2, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
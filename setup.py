@@ -17,6 +17,7 @@ setup(
     include_package_data=True,
     install_requires=[
         'fauxfactory',
+        'futures; python_version < "3"',
         'inflector',
         'nailgun',
         'numpy',
@@ -1,8 +1,7 @@
 """Tests related to hammer command and its options and subcommands."""
 import json
 
-from robottelo import ssh
-from robottelo.cli import hammer
+from robottelo.cli.command_tree import fetch_command_tree
 from robottelo.decorators import bz_bug_is_open, tier1
 from robottelo.helpers import read_data_file
 from robottelo.test import CLITestCase
@@ -36,14 +35,15 @@ class HammerCommandsTestCase(CLITestCase):
         super(HammerCommandsTestCase, self).__init__(*args, **kwargs)
         self.differences = {}
 
-    def _traverse_command_tree(self, command):
+    def _traverse_command_tree(self, command, output=None):
         """Recursively walk through the hammer commands tree and assert that
         the expected options are present.
 
+        The whole tree is fetched first, then compared with the expected one.
+
         """
-        output = hammer.parse_help(
-            ssh.command('{0} --help'.format(command)).stdout
-        )
+        if output is None:
+            output = fetch_command_tree()
         command_options = set([option['name'] for option in output['options']])
         command_subcommands = set(
             [subcommand['name'] for subcommand in output['subcommands']]
@@ -94,7 +94,8 @@ class HammerCommandsTestCase(CLITestCase):
         if len(output['subcommands']) > 0:
             for subcommand in output['subcommands']:
                 self._traverse_command_tree(
-                    '{0} {1}'.format(command, subcommand['name'])
+                    '{0} {1}'.format(command, subcommand['name']),
+                    subcommand
                 )
 
     @tier1
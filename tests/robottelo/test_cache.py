@@ -0,0 +1,255 @@
+"""Tests for modules ``robottelo.cache`` and ``robottelo.cli.cache``."""
+import os
+import six
+import tempfile
+import threading
+
+from robottelo.cache import LRUCache, ObjectCache, options_key
+from robottelo.cli import cache
+from unittest2 import TestCase
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+class LRUCacheTestCase(TestCase):
+    """Tests for class ``LRUCache``."""
+
+    def test_get_set(self):
+        """Cached values are returned and counted as hits"""
+        lru = LRUCache()
+        self.assertIsNone(lru.get('a'))
+        lru.set('a', 1)
+        self.assertEqual(lru.get('a'), 1)
+        self.assertEqual((lru.hits, lru.misses), (1, 1))
+
+    def test_evict_least_recently_used(self):
+        """The least recently used item is evicted when full"""
+        lru = LRUCache(max_size=2)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+        self.assertEqual(len(lru), 2)
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual(lru.get('a'), 1)
+        self.assertEqual(lru.evictions, 1)
+
+    @mock.patch('robottelo.cache.time.time')
+    def test_expire(self, time):
+        """Items older than the ttl are not returned"""
+        time.return_value = 100
+        lru = LRUCache(ttl=10)
+        lru.set('a', 1)
+        time.return_value = 105
+        self.assertEqual(lru.get('a'), 1)
+        time.return_value = 111
+        self.assertIsNone(lru.get('a'))
+        self.assertEqual(lru.expirations, 1)
+        self.assertEqual(len(lru), 0)
+
+    def test_invalidate(self):
+        """Items matching the predicate, or all of them, are removed"""
+        lru = LRUCache()
+        for key in ('a', 'b', 'c'):
+            lru.set(key, key)
+        self.assertEqual(lru.invalidate(lambda key: key != 'a'), 2)
+        self.assertEqual(lru.get('a'), 'a')
+        self.assertEqual(lru.invalidate(), 1)
+        self.assertEqual(len(lru), 0)
+
+
+class CLICacheTestCase(TestCase):
+    """Tests for class ``robottelo.cli.cache.CLICache``."""
+
+    def setUp(self):  # noqa
+        self.cache = cache.CLICache()
+        self.fetch = mock.Mock(return_value=[{u'id': u'1'}])
+
+    def key(self, command_base, command_sub='list', options=None):
+        """Return the key of a command run by the admin user."""
+        return self.cache.key(command_base, command_sub, options, u'admin')
+
+    def test_key(self):
+        """Options are normalized like the command line"""
+        self.assertEqual(
+            self.key('org', 'info', {u'id': 1, u'name': None}),
+            self.key('org', 'info', {u'id': u'1', u'enabled': False}),
+        )
+        self.assertNotEqual(
+            self.key('org', 'info', {u'id': 1}),
+            self.cache.key('org', 'info', {u'id': 1}, u'other'),
+        )
+
+    def test_get_or_fetch(self):
+        """The result is fetched once and copies are returned"""
+        key = self.key('org')
+        first = self.cache.get_or_fetch(key, self.fetch)
+        first[0][u'id'] = u'2'
+        self.assertEqual(
+            self.cache.get_or_fetch(key, self.fetch), [{u'id': u'1'}])
+        self.assertEqual(self.fetch.call_count, 1)
+        self.assertEqual(
+            self.cache.stats,
+            {'org': {'hits': 1, 'misses': 1, 'invalidations': 0}},
+        )
+
+    def test_invalidate_related(self):
+        """A change removes the results of the command and related ones"""
+        for command_base in ('product', 'repository', 'architecture'):
+            self.cache.get_or_fetch(self.key(command_base), self.fetch)
+        self.cache.invalidate('product', 'update')
+        for command_base in ('product', 'repository', 'architecture'):
+            self.cache.get_or_fetch(self.key(command_base), self.fetch)
+        self.assertEqual(self.fetch.call_count, 5)
+        self.assertEqual(self.cache.stats['product']['invalidations'], 2)
+
+    def test_invalidate_read(self):
+        """Read only subcommands do not remove anything"""
+        self.cache.get_or_fetch(self.key('content-view'), self.fetch)
+        self.cache.invalidate('content-view', 'version info')
+        self.cache.invalidate('content-view', 'list')
+        self.cache.get_or_fetch(self.key('content-view'), self.fetch)
+        self.assertEqual(self.fetch.call_count, 1)
+
+    def test_invalidate_global(self):
+        """A change of an organization removes all the results"""
+        self.cache.get_or_fetch(self.key('architecture'), self.fetch)
+        self.cache.invalidate('organization', 'add-user')
+        self.cache.get_or_fetch(self.key('architecture'), self.fetch)
+        self.assertEqual(self.fetch.call_count, 2)
+
+    def test_invalidate_while_fetching(self):
+        """Results fetched while their command is invalidated are not
+        cached
+        """
+        for changed, cached, refetched in (
+                ('product', 'repository', True),
+                ('product', 'architecture', False),
+                ('organization', 'architecture', True)):
+            self.cache = cache.CLICache()
+            self.fetch.reset_mock()
+
+            def fetch():
+                """Change the server state while fetching."""
+                self.cache.invalidate(changed, 'update')
+                return [{u'id': u'1'}]
+
+            self.assertEqual(
+                self.cache.get_or_fetch(self.key(cached), fetch),
+                [{u'id': u'1'}])
+            self.cache.get_or_fetch(self.key(cached), self.fetch)
+            self.assertEqual(self.fetch.called, refetched)
+
+    def test_report(self):
+        """The report has a line per command"""
+        self.cache.get_or_fetch(self.key('org'), self.fetch)
+        lines = self.cache.report().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[1].split(), [u'org', u'0', u'1', u'0'])
+
+    def test_enable_disable(self):
+        """The module functions use the enabled cache"""
+        self.assertIsNone(cache.get_cache())
+        cache.enable(max_size=10, ttl=None)
+        self.addCleanup(cache.disable)
+        cli_cache = cache.get_cache()
+        self.assertIsInstance(cli_cache, cache.CLICache)
+        with mock.patch.object(cli_cache, 'invalidate') as invalidate:
+            cache.invalidate('org', 'delete')
+        invalidate.assert_called_once_with('org', 'delete')
+        self.assertIs(cache.disable(), cli_cache)
+        self.assertIsNone(cache.get_cache())
+
+
+class ObjectCacheTestCase(TestCase):
+    """Tests for class ``robottelo.cache.ObjectCache``."""
+
+    def test_options_key(self):
+        """The key does not depend on the order nor on ``None`` options"""
+        self.assertEqual(
+            options_key({'a': 1, 'b': u'x', 'c': None}),
+            options_key({'b': u'x', 'a': 1}),
+        )
+        self.assertNotEqual(options_key({'a': 1}), options_key({'a': 2}))
+        self.assertEqual(options_key(None), options_key({}))
+
+    def test_get_or_create(self):
+        """Objects are created once per name and options"""
+        objects = ObjectCache()
+        create = mock.Mock(side_effect=[1, 2, 3])
+        self.assertEqual(objects.get_or_create('org', None, create), 1)
+        self.assertEqual(objects.get_or_create('org', {}, create), 1)
+        self.assertEqual(objects.get_or_create('org', {'a': 1}, create), 2)
+        self.assertEqual(objects.get_or_create('product', {}, create), 3)
+        self.assertEqual(create.call_count, 3)
+
+    def test_locks_removed(self):
+        """The lock of a key is removed once its object is created"""
+        objects = ObjectCache()
+        objects.get_or_create('org', {'name': u'a'}, lambda: 1)
+        with self.assertRaises(ValueError):
+            objects.get_or_create(
+                'org', {'name': u'b'}, mock.Mock(side_effect=ValueError))
+        self.assertEqual(objects._locks, {})
+
+    def test_concurrent_create(self):
+        """Concurrent calls wait for the first one to create the object"""
+        objects = ObjectCache()
+        started = threading.Event()
+        release = threading.Event()
+        created = []
+
+        def create():
+            """Wait until told to create the object."""
+            started.set()
+            release.wait(5)
+            created.append(len(created) + 1)
+            return created[-1]
+
+        results = []
+
+        def get():
+            """Get the object from another thread."""
+            results.append(objects.get_or_create('org', None, create))
+
+        threads = [threading.Thread(target=get) for _ in range(3)]
+        threads[0].start()
+        started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(results, [1, 1, 1])
+        self.assertEqual(objects._locks, {})
+
+    def test_evict(self):
+        """The least recently used object is evicted when full"""
+        objects = ObjectCache(max_size=1)
+        objects.set('org', None, 1)
+        objects.set('product', None, 2)
+        self.assertIsNone(objects.get('org'))
+        self.assertEqual(objects.stats['evictions'], 1)
+
+    @mock.patch('robottelo.cache.time.time')
+    def test_save_load(self, time):
+        """Saved objects are loaded with their age, expired ones are not"""
+        time.return_value = 100
+        objects = ObjectCache(ttl=10)
+        objects.set('org', None, {'id': 1})
+        time.return_value = 105
+        objects.set('product', None, {'id': 2})
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        objects.save(path)
+        time.return_value = 112
+        loaded = ObjectCache(ttl=10)
+        self.assertEqual(loaded.load(path), 1)
+        self.assertIsNone(loaded.get('org'))
+        self.assertEqual(loaded.get('product'), {'id': 2})
+        time.return_value = 116
+        self.assertIsNone(loaded.get('product'))
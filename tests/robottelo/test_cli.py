@@ -1,7 +1,17 @@
+import re
 import six
+import sys
+import threading
+import time
 import unittest2
 
-from robottelo.cli.base import Base
+from multiprocessing.pool import ThreadPool
+from robottelo import ssh
+from robottelo.cli import cache
+from robottelo.cli.base import Base, CLIError, CLIReturnCodeError
+from robottelo.cli.org import Org
+from robottelo.cli.repository import Repository
+from robottelo.cli.syncplan import SyncPlan
 
 if six.PY2:
     import mock
@@ -11,6 +21,7 @@ else:
 
 class CLIClass(Base):
     """Class used for the username and password lookup tests"""
+    command_base = 'cli'
     foreman_admin_username = 'adminusername'
     foreman_admin_password = 'adminpassword'
 
@@ -21,8 +32,7 @@ class BaseCliTestCase(unittest2.TestCase):
     def test_construct_command(self):
         """_construct_command builds a command using flags and arguments"""
         Base.command_base = 'basecommand'
-        Base.command_sub = 'subcommand'
-        command_parts = Base._construct_command({
+        command_parts = Base._construct_command('subcommand', {
             u'flag-one': True,
             u'flag-two': False,
             u'argument': u'value',
@@ -67,3 +77,391 @@ class BaseCliTestCase(unittest2.TestCase):
         self.assertEqual(new_class.foreman_admin_username, 'auser')
         self.assertEqual(new_class.foreman_admin_password, 'apass')
         self.assertIn(Base, new_class.__bases__)
+
+    @mock.patch('robottelo.cli.base.settings')
+    @mock.patch('robottelo.cli.base.ssh.command')
+    def test_execute_paramiko_backend(self, command, settings):
+        """Commands run through ``ssh.command`` by default"""
+        settings.server.ssh_backend = 'paramiko'
+        settings.performance.time_hammer = False
+        command.return_value.return_code = 0
+        command.return_value.stderr = u''
+        Base.execute('organization list')
+        self.assertEqual(command.call_count, 1)
+
+    @unittest2.skipIf(
+        sys.version_info < (3, 5), 'asyncio backend requires Python 3.5+')
+    @mock.patch('robottelo.cli.base.settings')
+    @mock.patch('robottelo.cli.base.ssh.command')
+    def test_execute_asyncio_backend(self, command, settings):
+        """Commands run through ``ssh_async.command`` when configured"""
+        settings.server.ssh_backend = 'asyncio'
+        settings.performance.time_hammer = False
+        with mock.patch('robottelo.ssh_async.command') as async_command:
+            async_command.return_value.return_code = 0
+            async_command.return_value.stderr = u''
+            Base.execute('organization list')
+        self.assertEqual(async_command.call_count, 1)
+        self.assertEqual(command.call_count, 0)
+
+    @mock.patch('robottelo.cli.base.shell')
+    @mock.patch('robottelo.cli.base.ssh.command')
+    def test_execute_hammer_shell(self, command, shell):
+        """Commands run on a ``hammer shell`` session when enabled"""
+        shell.is_enabled.return_value = True
+        shell.command.return_value.return_code = 0
+        shell.command.return_value.stderr = u''
+        Base.execute('organization list', 'auser', 'apass', 'csv')
+        shell.command.assert_called_once_with(
+            'organization list', 'auser', 'apass', 'csv', None)
+        self.assertEqual(command.call_count, 0)
+
+
+class CreateTestCase(unittest2.TestCase):
+    """Tests for ``Base.create``"""
+
+    def setUp(self):  # noqa
+        """Patch the settings and ``ssh.command``"""
+        patcher = mock.patch('robottelo.cli.base.settings')
+        settings = patcher.start()
+        settings.server.ssh_backend = 'paramiko'
+        settings.performance.time_hammer = False
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch('robottelo.cli.base.ssh.command')
+        self.command = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.command.return_value.return_code = 0
+        self.command.return_value.stderr = u''
+
+    def set_output(self, *lines):
+        """Make ``ssh.command`` print ``lines``, replacing ``BOUNDARY`` with
+        the boundary found in the script.
+        """
+        def command(cmd, output_format=None, timeout=None):
+            """Return the output with the right boundary."""
+            boundary = re.search(
+                r'echo (robottelo-info-\w+)', cmd.decode('utf-8')).group(1)
+            self.command.return_value.stdout = [
+                boundary if line == 'BOUNDARY' else line for line in lines]
+            return self.command.return_value
+        self.command.side_effect = command
+
+    def test_create_and_fetch(self):
+        """The record is created and read in a single round trip"""
+        self.set_output(
+            u'Message,Id,Name', u'Created,1,org', u'BOUNDARY',
+            u'Id: 1', u'Name: org', u'')
+        result = CLIClass.create({u'name': u'org'})
+        self.assertEqual(result, {u'id': u'1', u'name': u'org'})
+        self.assertEqual(self.command.call_count, 1)
+        script = self.command.call_args[0][0].decode('utf-8')
+        self.assertIn(u'--output=csv cli create --name="org"', script)
+        self.assertIn(u'cli info --id="$id"', script)
+
+    def test_create_without_id(self):
+        """The CSV output is returned if no id was found"""
+        self.set_output(u'Message', u'Created', u'')
+        result = CLIClass.create({u'name': u'org'})
+        self.assertEqual(result, [{u'message': u'Created'}])
+
+    def test_create_id_not_found(self):
+        """The record is fetched by a second call if the script could not
+        find its id
+        """
+        outputs = [
+            [u'Message,Id,Name', u'"Created, ok",1,org', u''],
+            [u'Id: 1', u'Name: org', u''],
+        ]
+
+        def command(cmd, output_format=None, timeout=None):
+            """Return the next output."""
+            self.command.return_value.stdout = outputs.pop(0)
+            return self.command.return_value
+        self.command.side_effect = command
+        result = CLIClass.create({u'name': u'org'})
+        self.assertEqual(result, {u'id': u'1', u'name': u'org'})
+        self.assertEqual(self.command.call_count, 2)
+        self.assertIn(b'cli info --id="1"', self.command.call_args[0][0])
+
+    def test_create_info_overridden(self):
+        """Classes overriding info fetch the record with it"""
+        class InfoCLIClass(CLIClass):
+            """Class processing the output of info"""
+            @classmethod
+            def info(cls, options=None):
+                """Return the id only."""
+                return {u'info-id': options[u'id']}
+
+        self.command.return_value.stdout = [{u'id': u'1'}]
+        result = InfoCLIClass.create({u'name': u'org'})
+        self.assertEqual(result, {u'info-id': u'1'})
+        self.assertEqual(self.command.call_count, 1)
+        self.assertNotIn(b'info', self.command.call_args[0][0])
+
+    def test_create_requires_org(self):
+        """The organization id is checked before creating the record"""
+        with mock.patch.object(CLIClass, 'command_requires_org', True):
+            with self.assertRaises(CLIError):
+                CLIClass.create({u'name': u'org'})
+        self.assertEqual(self.command.call_count, 0)
+
+    def test_create_no_fetch(self):
+        """Only the create command runs when not fetching the record"""
+        self.command.return_value.stdout = [{u'id': u'1'}]
+        result = CLIClass.create({u'name': u'org'}, fetch=False)
+        self.assertEqual(result, [{u'id': u'1'}])
+        self.assertEqual(self.command.call_count, 1)
+        self.assertNotIn(
+            b'info', self.command.call_args[0][0])
+
+
+class ThreadSafetyTestCase(unittest2.TestCase):
+    """Run many CLI commands at once from a thread pool"""
+
+    def setUp(self):  # noqa
+        """Patch the settings and ``ssh.command``"""
+        patcher = mock.patch('robottelo.cli.base.settings')
+        settings = patcher.start()
+        settings.server.ssh_backend = 'paramiko'
+        settings.performance.time_hammer = False
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch('robottelo.cli.base.ssh.command', self.command)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.local = threading.local()
+
+    def command(self, cmd, output_format=None, timeout=None):
+        """Record ``cmd`` for the current thread and answer it"""
+        cmd = cmd.decode('utf-8')
+        self.local.commands.append(cmd)
+        # Let other threads run between the calls
+        time.sleep(0)
+        match = re.search(r'echo (robottelo-info-\w+)', cmd)
+        if match is not None:
+            stdout = u'Id,Name\n1,x\n{0}\nId: 1\nName: x\n'.format(
+                match.group(1))
+        elif output_format == 'csv':
+            stdout = u'Id,Name\n1,x\n'
+        else:
+            stdout = u'Id: 1\nName: x\n'
+        return_code = 1 if u'fail' in cmd else 0
+        return ssh._command_result(
+            stdout.encode('utf-8'), b'', return_code, output_format)
+
+    def run_call(self, index):
+        """Run one of the CLI calls and check the command it sent"""
+        calls = (
+            (Org.list, {u'search': u'name={0}'.format(index)},
+             u' organization list '),
+            (Org.info, {u'id': index}, u' organization info '),
+            (Org.delete, {u'id': index}, u' organization delete '),
+            (Org.add_subnet, {u'id': index}, u' organization add-subnet '),
+            (Org.create, {u'name': index}, u' organization create '),
+            (Repository.info, {u'id': index}, u' repository info '),
+            (SyncPlan.list, {u'organization-id': index}, u' sync-plan list '),
+            (Org.update, {u'id': index, u'new-name': u'fail'},
+             u' organization update '),
+        )
+        method, options, subcommand = calls[index % len(calls)]
+        self.local.commands = []
+        try:
+            method(options)
+        except CLIReturnCodeError as err:
+            self.assertIn(subcommand.strip(), err.msg)
+            self.assertIn(u'--id="{0}"'.format(index), err.msg)
+        self.assertEqual(len(self.local.commands), 1)
+        command = self.local.commands[0]
+        self.assertIn(subcommand, command)
+        for key in options:
+            self.assertIn(u'--{0}="{1}"'.format(key, options[key]), command)
+        if method is Org.create:
+            self.assertIn(u' organization info --id="$id"', command)
+
+    def test_concurrent_calls(self):
+        """Each call sends its own command, whatever the other threads do"""
+        pool = ThreadPool(16)
+        try:
+            pool.map(self.run_call, range(4000))
+        finally:
+            pool.close()
+            pool.join()
+
+
+class CacheTestCase(unittest2.TestCase):
+    """Tests for the CLI cache used by ``Base.info`` and ``Base.list``"""
+
+    def setUp(self):  # noqa
+        """Patch the settings and ``ssh.command`` and enable the cache"""
+        patcher = mock.patch('robottelo.cli.base.settings')
+        settings = patcher.start()
+        settings.server.ssh_backend = 'paramiko'
+        settings.performance.time_hammer = False
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch('robottelo.cli.base.ssh.command', self.command)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.commands = []
+        cache.enable()
+        self.addCleanup(cache.disable)
+
+    def command(self, cmd, output_format=None, timeout=None):
+        """Record ``cmd`` and answer it"""
+        cmd = cmd.decode('utf-8')
+        self.commands.append(cmd)
+        match = re.search(r'echo (robottelo-info-\w+)', cmd)
+        if match is not None:
+            stdout = u'Id,Name\n1,x\n{0}\nId: 1\nName: x\n'.format(
+                match.group(1))
+        elif output_format == 'csv':
+            stdout = u'Id,Name\n1,x\n'
+        else:
+            stdout = u'Id: 1\nName: x\n'
+        return ssh._command_result(
+            stdout.encode('utf-8'), b'', 0, output_format)
+
+    def test_read_through(self):
+        """Identical info and list calls run a single command"""
+        for _ in range(3):
+            self.assertEqual(
+                Org.info({u'id': 1}), {u'id': u'1', u'name': u'x'})
+            self.assertEqual(
+                Org.list({u'search': u'name=x'}),
+                [{u'id': u'1', u'name': u'x'}],
+            )
+        Org.info({u'id': 2})
+        self.assertEqual(len(self.commands), 3)
+        self.assertEqual(
+            cache.get_cache().stats[u'organization'],
+            {'hits': 4, 'misses': 3, 'invalidations': 0},
+        )
+
+    def test_invalidate_on_change(self):
+        """Creating, updating or deleting a record invalidates the cache"""
+        changes = (
+            lambda: Org.create({u'name': u'x'}),
+            lambda: Org.update({u'id': 1, u'new-name': u'y'}),
+            lambda: Org.delete({u'id': 1}),
+            lambda: Org.add_subnet({u'id': 1, u'subnet-id': 1}),
+        )
+        Org.info({u'id': 1})
+        for change in changes:
+            del self.commands[:]
+            change()
+            Org.info({u'id': 1})
+            self.assertEqual(len(self.commands), 2)
+
+    def test_invalidate_related(self):
+        """A change invalidates the results of related commands"""
+        Repository.info({u'id': 1})
+        SyncPlan.info({u'id': 1})
+        Org.info({u'id': 1})
+        del self.commands[:]
+        Repository.update({u'id': 1, u'url': u'http://example.com'})
+        Repository.info({u'id': 1})
+        SyncPlan.info({u'id': 1})
+        self.assertEqual(len(self.commands), 2)
+        Org.delete({u'id': 1})
+        SyncPlan.info({u'id': 1})
+        self.assertEqual(len(self.commands), 4)
+
+
+class IterListTestCase(unittest2.TestCase):
+    """Tests for ``Base.iter_list`` and ``Base.exists``"""
+
+    def setUp(self):  # noqa
+        """Patch the settings and ``ssh.command``"""
+        patcher = mock.patch('robottelo.cli.base.settings')
+        settings = patcher.start()
+        settings.server.ssh_backend = 'paramiko'
+        settings.performance.time_hammer = False
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch('robottelo.cli.base.ssh.command', self.command)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.records = 25
+        self.pages = []
+
+    def command(self, cmd, output_format=None, timeout=None):
+        """Print the requested page of ``self.records`` records"""
+        cmd = cmd.decode('utf-8')
+        page = int(re.search(r'--page="(\d+)"', cmd).group(1))
+        per_page = int(re.search(r'--per-page="(\d+)"', cmd).group(1))
+        self.pages.append(page)
+        lines = [u'Id,Name']
+        for index in range((page - 1) * per_page,
+                           min(page * per_page, self.records)):
+            lines.append(u'{0},record{0}'.format(index))
+        stdout = u'\n'.join(lines) + u'\n'
+        return ssh._command_result(
+            stdout.encode('utf-8'), b'', 0, output_format)
+
+    def test_iter_list(self):
+        """All the records are listed, one page at a time"""
+        records = CLIClass.iter_list(page_size=10)
+        self.assertEqual(self.pages, [])
+        self.assertEqual(
+            [record[u'id'] for record in records],
+            [six.text_type(index) for index in range(25)],
+        )
+        self.assertEqual(self.pages, [1, 2, 3])
+
+    def test_iter_list_full_pages(self):
+        """An empty page ends the iteration after full pages"""
+        self.records = 20
+        self.assertEqual(len(list(CLIClass.iter_list(page_size=10))), 20)
+        self.assertEqual(self.pages, [1, 2, 3])
+
+    def test_iter_list_stops_early(self):
+        """Pages are only fetched when needed"""
+        records = CLIClass.iter_list(page_size=10)
+        for _ in range(10):
+            next(records)
+        self.assertEqual(self.pages, [1])
+        next(records)
+        self.assertEqual(self.pages, [1, 2])
+
+    def test_iter_list_prefetch(self):
+        """The next page is fetched while the current one is consumed"""
+        records = CLIClass.iter_list(page_size=10, prefetch=True)
+        self.assertEqual(next(records)[u'id'], u'0')
+        for _ in range(100):
+            if len(self.pages) == 2:
+                break
+            time.sleep(0.01)
+        self.assertEqual(self.pages, [1, 2])
+        self.assertEqual(len(list(records)), 24)
+        self.assertEqual(self.pages, [1, 2, 3])
+
+    def test_iter_list_prefetch_stops_early(self):
+        """Stopping early waits for the page being prefetched and logs its
+        error
+        """
+        fetched = []
+
+        def list_page(options):
+            """Fail to list the second page."""
+            fetched.append(options[u'page'])
+            if options[u'page'] == 2:
+                time.sleep(0.05)
+                raise CLIReturnCodeError(70, u'failed', u'failed')
+            return [{u'id': six.text_type(index)} for index in range(10)]
+
+        with mock.patch.object(CLIClass, 'list', side_effect=list_page):
+            with mock.patch.object(CLIClass, 'logger') as logger:
+                records = CLIClass.iter_list(page_size=10, prefetch=True)
+                next(records)
+                records.close()
+        self.assertEqual(fetched, [1, 2])
+        self.assertEqual(logger.warning.call_count, 1)
+        self.assertIn(u'failed', str(logger.warning.call_args))
+
+    def test_exists(self):
+        """Only the first matching record is fetched"""
+        result = CLIClass.exists(search=(u'name', u'record0'))
+        self.assertEqual(result, {u'id': u'0', u'name': u'record0'})
+        self.assertEqual(self.pages, [1])
+
+    def test_not_exists(self):
+        """An empty list is returned when nothing matches"""
+        self.records = 0
+        self.assertEqual(CLIClass.exists(search=(u'name', u'none')), [])
@@ -0,0 +1,239 @@
+"""Tests for module ``robottelo.cli.command_tree``."""
+import copy
+import six
+
+from robottelo.cli import command_tree
+from robottelo.cli.base import CLIReturnCodeError
+from robottelo.cli.org import Org
+from robottelo.ssh import _command_result
+from unittest2 import TestCase
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+TREE = {
+    'options': [{'name': 'username'}, {'name': 'password'}],
+    'subcommands': [
+        {
+            'name': 'organization',
+            'options': [],
+            'subcommands': [
+                {
+                    'name': 'info',
+                    'options': [{'name': 'id'}, {'name': 'name'}],
+                    'subcommands': [],
+                },
+            ],
+        },
+        {
+            'name': 'content-view',
+            'options': [],
+            'subcommands': [
+                {
+                    'name': 'version',
+                    'options': [],
+                    'subcommands': [
+                        {
+                            'name': 'info',
+                            'options': [{'name': 'id'}],
+                            'subcommands': [],
+                        },
+                    ],
+                },
+            ],
+        },
+    ],
+}
+
+
+class BuildIndexTestCase(TestCase):
+    """Tests for function ``build_index``."""
+
+    def test_build_index(self):
+        """Each command path is mapped to its options and subcommands"""
+        self.assertEqual(command_tree.build_index(TREE), {
+            u'': (
+                frozenset(('username', 'password')),
+                frozenset(('organization', 'content-view')),
+            ),
+            u'organization': (frozenset(), frozenset(('info',))),
+            u'organization info': (frozenset(('id', 'name')), frozenset()),
+            u'content-view': (frozenset(), frozenset(('version',))),
+            u'content-view version': (frozenset(), frozenset(('info',))),
+            u'content-view version info': (frozenset(('id',)), frozenset()),
+        })
+
+    def test_cached_tree(self):
+        """The tree shipped in the data files is loaded once"""
+        index = command_tree.get_index()
+        self.assertIs(command_tree.get_index(), index)
+        self.assertIn(u'id', index[u'organization info'][0])
+
+
+class ValidateTestCase(TestCase):
+    """Tests for function ``validate``."""
+
+    def setUp(self):  # noqa
+        self.index = command_tree.build_index(TREE)
+
+    def validate(self, command_base, command_sub, option_names=()):
+        """Validate the command against the test tree."""
+        command_tree.validate(
+            command_base, command_sub, option_names, self.index)
+
+    def test_valid(self):
+        """Known subcommands and options are accepted"""
+        self.validate('organization', 'info', ['id', 'name'])
+        self.validate('content-view version', 'info', ['id'])
+        self.validate('content-view', 'version info')
+
+    def test_unknown_option(self):
+        """Unknown options are rejected"""
+        with self.assertRaises(command_tree.CommandTreeError) as context:
+            self.validate('organization', 'info', ['id', 'label'])
+        self.assertEqual(context.exception.command, u'organization info')
+        self.assertIn(u"'--label'", context.exception.message)
+
+    def test_unknown_subcommand(self):
+        """Unknown subcommands of known commands are rejected"""
+        for command_base, command_sub in (
+                ('organization', 'inf'),
+                ('content-view', 'versions info'),
+                ('content-view version', 'promote')):
+            with self.assertRaises(command_tree.CommandTreeError):
+                self.validate(command_base, command_sub)
+
+    def test_missing_command(self):
+        """Commands missing from the tree are not checked"""
+        self.validate('docker', 'info', ['id'])
+
+    def test_arguments(self):
+        """Words after a command without subcommands are accepted"""
+        self.validate('organization', 'info argument', ['id'])
+
+
+class ConstructCommandTestCase(TestCase):
+    """Tests for the validation done by ``Base._construct_command``."""
+
+    def setUp(self):  # noqa
+        command_tree.enable()
+        self.addCleanup(command_tree.disable)
+
+    def test_valid(self):
+        """Valid commands are built"""
+        self.assertEqual(
+            Org._construct_command('info', {u'id': 1, u'bogus': None}),
+            u'organization info --id="1"',
+        )
+
+    def test_invalid(self):
+        """Invalid commands are rejected with the hammer usage error code"""
+        with self.assertRaises(CLIReturnCodeError) as context:
+            Org._construct_command('info', {u'id': 1, u'bogus': u'x'})
+        self.assertEqual(context.exception.return_code, 64)
+        self.assertIn(u'--bogus', context.exception.stderr)
+
+    def test_disabled(self):
+        """Nothing is checked when disabled"""
+        command_tree.disable()
+        Org._construct_command('info', {u'bogus': u'x'})
+
+
+class FetchCommandTreeTestCase(TestCase):
+    """Tests for function ``fetch_command_tree``."""
+
+    def setUp(self):  # noqa
+        """Answer the help commands with the help of ``self.helps``"""
+        self.helps = {
+            u'hammer': (
+                [(u'organization', u'Manipulate organizations')],
+                [u'username USERNAME', u'password PASSWORD'],
+            ),
+            u'hammer organization': (
+                [(u'info', u'Show an organization'),
+                 (u'list', u'List organizations')],
+                [],
+            ),
+            u'hammer organization info': ([], [u'id ID', u'name NAME']),
+            u'hammer organization list': ([], [u'search SEARCH']),
+        }
+        self.calls = []
+        patcher = mock.patch(
+            'robottelo.cli.command_tree.ssh.command_many', self.command_many)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def command_many(self, cmds, hostname=None, max_parallel=None):
+        """Record the commands run together and return their help"""
+        self.calls.append(cmds)
+        results = []
+        for cmd in cmds:
+            subcommands, options = self.helps[cmd[:-len(u' --help')]]
+            lines = [u'Usage:', u'    hammer', u'']
+            if subcommands:
+                lines.append(u'Subcommands:')
+                lines.extend(
+                    u' {0:<20} {1}'.format(name, description)
+                    for name, description in subcommands
+                )
+            lines.append(u'Options:')
+            lines.extend(
+                u' --{0:<20} {0} option'.format(option) for option in options)
+            results.append(_command_result(
+                u'\n'.join(lines).encode('utf-8'), b'', 0))
+        return results
+
+    def test_fetch(self):
+        """The help of each level is fetched at once"""
+        tree = command_tree.fetch_command_tree()
+        self.assertEqual(self.calls, [
+            [u'hammer --help'],
+            [u'hammer organization --help'],
+            [u'hammer organization info --help',
+             u'hammer organization list --help'],
+        ])
+        self.assertEqual(
+            [option['name'] for option in tree['options']],
+            [u'username', u'password'],
+        )
+        organization = tree['subcommands'][0]
+        self.assertEqual(organization['name'], u'organization')
+        self.assertEqual(
+            [subcommand['name'] for subcommand in organization['subcommands']],
+            [u'info', u'list'],
+        )
+        self.assertEqual(
+            [option['name']
+             for option in organization['subcommands'][0]['options']],
+            [u'id', u'name'],
+        )
+
+    def test_incremental(self):
+        """Commands without subcommands are only fetched if the help of
+        their parent changed
+        """
+        previous = command_tree.fetch_command_tree()
+        del self.calls[:]
+        self.assertEqual(
+            command_tree.fetch_command_tree(copy.deepcopy(previous)),
+            previous,
+        )
+        self.assertEqual(
+            self.calls, [[u'hammer --help'], [u'hammer organization --help']])
+
+        del self.calls[:]
+        self.helps[u'hammer organization'][0].append(
+            (u'delete', u'Delete an organization'))
+        self.helps[u'hammer organization delete'] = ([], [u'id ID'])
+        tree = command_tree.fetch_command_tree(previous)
+        self.assertEqual(self.calls, [
+            [u'hammer --help'],
+            [u'hammer organization --help'],
+            [u'hammer organization info --help',
+             u'hammer organization list --help',
+             u'hammer organization delete --help'],
+        ])
+        self.assertEqual(
+            len(tree['subcommands'][0]['subcommands']), 3)
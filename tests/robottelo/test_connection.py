@@ -0,0 +1,114 @@
+"""Tests for module ``robottelo.performance.connection``."""
+import six
+import threading
+
+from robottelo.performance import connection
+from robottelo.performance.candlepin import Candlepin
+from six.moves import BaseHTTPServer
+from unittest2 import TestCase
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+class KeepAliveHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Answer every request with an empty response, keeping the connection
+    open.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        """Keep the test output quiet."""
+
+    def _reply(self):
+        """Count the request and send an empty response."""
+        with self.server.lock:
+            self.server.requests.append((self.command, self.path))
+        self.send_response(204 if self.command == 'DELETE' else 200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    do_GET = do_DELETE = _reply  # noqa
+
+
+class ConnectionTestCase(TestCase):
+    """Tests for the sessions of :mod:`robottelo.performance.connection`."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = BaseHTTPServer.HTTPServer(
+            ('127.0.0.1', 0), KeepAliveHandler)
+        cls.server.lock = threading.Lock()
+        cls.server.requests = []
+        cls.thread = threading.Thread(target=cls.server.serve_forever)
+        cls.thread.daemon = True
+        cls.thread.start()
+        cls.url = 'http://127.0.0.1:{0}'.format(cls.server.server_address[1])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        connection.close_session()
+        self.addCleanup(connection.close_session)
+        with self.server.lock:
+            del self.server.requests[:]
+
+    def test_session_per_thread(self):
+        """Each thread has its own session"""
+        session = connection.get_session()
+        self.assertIs(connection.get_session(), session)
+        sessions = []
+        thread = threading.Thread(
+            target=lambda: sessions.append(connection.get_session()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(sessions[0], session)
+        self.assertFalse(session.verify)
+        self.assertEqual(
+            session.get_adapter(self.url)._pool_maxsize,
+            connection.DEFAULT_POOL_SIZE)
+
+    def test_connection_reused(self):
+        """Only the first request opens a connection"""
+        response, elapsed, connect = connection.timed_request(
+            'GET', self.url + '/first')
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(connect, 0)
+        self.assertGreaterEqual(elapsed, connect)
+        _, elapsed, connect = connection.timed_request(
+            'GET', self.url + '/second')
+        self.assertEqual(connect, 0)
+        self.assertGreater(elapsed, 0)
+
+    def test_close_session(self):
+        """Closing the session opens a new connection"""
+        connection.timed_request('GET', self.url)
+        connection.close_session()
+        _, _, connect = connection.timed_request('GET', self.url)
+        self.assertGreater(connect, 0)
+
+    def test_single_delete(self):
+        """Deletions reuse the connection and can report it apart"""
+        patcher = mock.patch('robottelo.performance.candlepin.settings')
+        settings = patcher.start()
+        self.addCleanup(patcher.stop)
+        settings.server.get_url.return_value = self.url
+        settings.server.get_credentials.return_value = ('admin', 'changeme')
+        request, connect = Candlepin.single_delete(
+            'uuid-1', 0, connect_time=True)
+        self.assertGreater(connect, 0)
+        self.assertGreater(request, 0)
+        elapsed = Candlepin.single_delete('uuid-2', 0)
+        self.assertGreater(elapsed, 0)
+        request, connect = Candlepin.single_delete(
+            'uuid-3', 0, connect_time=True)
+        self.assertEqual(connect, 0)
+        self.assertEqual(self.server.requests, [
+            ('DELETE', '/katello/api/systems/uuid-{0}'.format(index))
+            for index in (1, 2, 3)
+        ])
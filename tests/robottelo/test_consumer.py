@@ -0,0 +1,198 @@
+"""Tests for module ``robottelo.performance.consumer``."""
+import json
+import threading
+import uuid
+
+from robottelo.performance import consumer, driver
+from six.moves import BaseHTTPServer
+from six.moves.urllib.parse import parse_qs, urlparse
+from unittest2 import TestCase
+
+AUTH = ('admin', 'changeme')
+
+
+class CandlepinStubHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Answer the Candlepin requests of the simulated consumers."""
+
+    def log_message(self, *args):
+        """Keep the test output quiet."""
+
+    def _reply(self, status, body=None):
+        """Send ``body`` as JSON."""
+        content = json.dumps(body).encode('utf-8') if body is not None else b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _handle(self, method):
+        """Record the request and answer it like Candlepin."""
+        url = urlparse(self.path)
+        query = dict(
+            (name, values[0]) for name, values in parse_qs(url.query).items())
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length).decode('utf-8')) \
+            if length else None
+        server = self.server
+        with server.lock:
+            server.calls.append((
+                method, url.path, query, body,
+                'Authorization' in self.headers))
+        parts = url.path.strip('/').split('/')[1:]
+        if method == 'GET' and parts[0] == 'owners':
+            return self._reply(200, [
+                {'id': 'env-{0}'.format(query['name'])}])
+        if method == 'POST' and parts[-1] == 'consumers':
+            consumer_uuid = str(uuid.uuid4())
+            with server.lock:
+                server.consumers[consumer_uuid] = body
+            return self._reply(200, {
+                'uuid': consumer_uuid,
+                'name': body['name'],
+                'idCert': {'cert': 'CERT', 'key': 'KEY'},
+            })
+        if parts[0] == 'consumers' and parts[1] in server.consumers:
+            if method == 'POST' and parts[-1] == 'entitlements':
+                return self._reply(200, [{'pool': {'id': query['pool']}}])
+            if method == 'DELETE':
+                with server.lock:
+                    del server.consumers[parts[1]]
+                return self._reply(204)
+        return self._reply(404, {'displayMessage': 'Not found'})
+
+    def do_GET(self):  # noqa
+        """Handle a GET request."""
+        self._handle('GET')
+
+    def do_POST(self):  # noqa
+        """Handle a POST request."""
+        self._handle('POST')
+
+    def do_DELETE(self):  # noqa
+        """Handle a DELETE request."""
+        self._handle('DELETE')
+
+
+class StubServerTestCase(TestCase):
+    """Run a Candlepin stub server for the tests."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = BaseHTTPServer.HTTPServer(
+            ('127.0.0.1', 0), CandlepinStubHandler)
+        cls.server.lock = threading.Lock()
+        cls.server.calls = []
+        cls.server.consumers = {}
+        cls.thread = threading.Thread(target=cls.server.serve_forever)
+        cls.thread.daemon = True
+        cls.thread.start()
+        cls.base_url = 'http://127.0.0.1:{0}/rhsm/'.format(
+            cls.server.server_address[1])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        with self.server.lock:
+            del self.server.calls[:]
+            self.server.consumers.clear()
+        consumer._environments.clear()
+
+
+class SimulatedConsumerTestCase(StubServerTestCase):
+    """Tests for :class:`robottelo.performance.consumer.SimulatedConsumer`."""
+
+    def test_register_activation_key(self):
+        """Registering with an activation key sends the facts"""
+        client = consumer.SimulatedConsumer(
+            'client.example.net', self.base_url, AUTH)
+        self.assertGreater(client.register('org', activation_key='ak'), 0)
+        self.assertIn(client.uuid, self.server.consumers)
+        self.assertEqual(client.identity, {'cert': 'CERT', 'key': 'KEY'})
+        method, path, query, body, authorized = self.server.calls[0]
+        self.assertEqual((method, path), ('POST', '/rhsm/consumers'))
+        self.assertEqual(query, {'owner': 'org', 'activation_keys': 'ak'})
+        self.assertFalse(authorized)
+        self.assertEqual(body['name'], 'client.example.net')
+        self.assertEqual(
+            body['facts']['network.hostname'], 'client.example.net')
+
+    def test_register_attach_unregister(self):
+        """A consumer registers in an environment, attaches and leaves"""
+        client = consumer.SimulatedConsumer(base_url=self.base_url, auth=AUTH)
+        client.register('org', environment='Library')
+        consumer_uuid = client.uuid
+        client.attach('pool-1')
+        self.assertEqual(client.entitlements, [{'pool': {'id': 'pool-1'}}])
+        client.unregister()
+        self.assertIsNone(client.uuid)
+        self.assertEqual(self.server.consumers, {})
+        self.assertEqual(
+            [(method, path) for method, path, _, _, _ in self.server.calls],
+            [
+                ('GET', '/rhsm/owners/org/environments'),
+                ('POST', '/rhsm/environments/env-Library/consumers'),
+                ('POST',
+                 '/rhsm/consumers/{0}/entitlements'.format(consumer_uuid)),
+                ('DELETE', '/rhsm/consumers/{0}'.format(consumer_uuid)),
+            ]
+        )
+        self.assertTrue(all(call[4] for call in self.server.calls))
+
+    def test_environment_id_cached(self):
+        """The environment id is looked up once for all the consumers"""
+        for _ in range(3):
+            consumer.SimulatedConsumer(
+                base_url=self.base_url, auth=AUTH,
+            ).register('org', environment='Library')
+        self.assertEqual(
+            [call[0] for call in self.server.calls].count('GET'), 1)
+
+    def test_error(self):
+        """Unexpected responses raise an error"""
+        client = consumer.SimulatedConsumer(base_url=self.base_url, auth=AUTH)
+        client.uuid = 'unknown'
+        with self.assertRaises(consumer.ConsumerError) as context:
+            client.attach('pool-1')
+        self.assertIn('404', str(context.exception))
+
+
+class SimulatedOperationsTestCase(StubServerTestCase):
+    """Tests for the simulated consumer operations of
+    :mod:`robottelo.performance.driver`.
+    """
+
+    def test_register_ak(self):
+        """Each iteration registers a new consumer"""
+        result = driver.LoadDriver('simulated-register-ak', {
+            'ak_name': 'ak',
+            'org': 'org',
+            'base_url': self.base_url,
+            'auth': AUTH,
+        }).run(4, 5)
+        self.assertEqual(result.errors('register-ak'), [])
+        timings = result.timings('register-ak')
+        self.assertEqual(sorted(timings), ['thread-{0}'.format(worker)
+                                           for worker in range(4)])
+        self.assertTrue(all(
+            len(values) == 5 and all(value > 0 for value in values)
+            for values in timings.values()
+        ))
+        self.assertEqual(len(self.server.consumers), 20)
+
+    def test_lifecycle(self):
+        """Consumers are registered, attached and unregistered"""
+        result = driver.LoadDriver('simulated-lifecycle', {
+            'subscription_id': 'pool-1',
+            'org': 'org',
+            'environment': 'Library',
+            'base_url': self.base_url,
+            'auth': AUTH,
+        }).run(2, 3)
+        for stream in ('register', 'attach', 'unregister'):
+            self.assertEqual(result.errors(stream), [])
+            self.assertEqual(len(result.measures(stream)), 6)
+        self.assertEqual(self.server.consumers, {})
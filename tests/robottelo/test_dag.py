@@ -0,0 +1,133 @@
+"""Tests for module ``robottelo.cli.dag``."""
+import threading
+
+from robottelo.cli.dag import TaskGraph, TaskGraphError
+from unittest2 import TestCase
+
+
+class TaskGraphTestCase(TestCase):
+    """Tests for :class:`robottelo.cli.dag.TaskGraph`."""
+
+    def test_results(self):
+        """Each step gets the results of the steps it requires"""
+        graph = TaskGraph()
+        graph.add('org', lambda: 1)
+        graph.add('env', lambda org: org + 1, requires=('org',))
+        graph.add('product', lambda org: org + 2, requires=('org',))
+        graph.add(
+            'repo', lambda env, product: (env, product),
+            requires=('env', 'product'),
+        )
+        self.assertEqual(
+            graph.run(), {'org': 1, 'env': 2, 'product': 3, 'repo': (2, 3)})
+
+    def test_independent_steps_run_concurrently(self):
+        """Steps not depending on each other run at the same time"""
+        barrier = threading.Condition()
+        started = []
+
+        def step():
+            """Wait for the other step to start."""
+            with barrier:
+                started.append(None)
+                barrier.notify_all()
+                while len(started) < 2:
+                    barrier.wait(5)
+            return len(started)
+
+        graph = TaskGraph()
+        graph.add('first', step)
+        graph.add('second', step)
+        self.assertEqual(graph.run(), {'first': 2, 'second': 2})
+
+    def test_dependent_steps_wait(self):
+        """A step starts after the steps it requires finished"""
+        graph = TaskGraph()
+        graph.add('first', lambda: None)
+        graph.add('second', lambda first: None, requires=('first',))
+        graph.run()
+        self.assertLessEqual(
+            graph.timings['first'][1], graph.timings['second'][0])
+
+    def test_order(self):
+        """Steps are ordered after the steps they require"""
+        graph = TaskGraph()
+        graph.add('c', lambda a, b: None, requires=('a', 'b'))
+        graph.add('b', lambda a: None, requires=('a',))
+        graph.add('a', lambda: None)
+        self.assertEqual(graph.order(), ['a', 'b', 'c'])
+
+    def test_cycle(self):
+        """A dependency cycle is rejected before running any step"""
+        calls = []
+        graph = TaskGraph()
+        graph.add('a', lambda: calls.append('a'))
+        graph.add('b', lambda c: None, requires=('c',))
+        graph.add('c', lambda b: None, requires=('b',))
+        with self.assertRaises(TaskGraphError):
+            graph.run()
+        self.assertEqual(calls, [])
+
+    def test_unknown_step(self):
+        """Requiring an unknown step is rejected"""
+        graph = TaskGraph()
+        graph.add('a', lambda b: None, requires=('b',))
+        with self.assertRaises(TaskGraphError):
+            graph.run()
+
+    def test_duplicate_step(self):
+        """A step can not be added twice"""
+        graph = TaskGraph()
+        graph.add('a', lambda: None)
+        with self.assertRaises(TaskGraphError):
+            graph.add('a', lambda: None)
+
+    def test_failure(self):
+        """The error of a step is raised and its dependents do not run"""
+        calls = []
+
+        def fail():
+            """Raise an error."""
+            raise ValueError('failed')
+
+        graph = TaskGraph()
+        graph.add('a', fail)
+        graph.add('b', lambda a: calls.append('b'), requires=('a',))
+        with self.assertRaises(ValueError) as context:
+            graph.run()
+        self.assertEqual(str(context.exception), 'failed')
+        self.assertEqual(calls, [])
+        self.assertIn('a', graph.timings)
+        self.assertNotIn('b', graph.timings)
+
+    def test_critical_path(self):
+        """The critical path follows the steps which finished last"""
+        graph = TaskGraph()
+        for name, requires in (
+                ('org', ()),
+                ('env', ('org',)),
+                ('product', ('org',)),
+                ('repo', ('product',)),
+                ('promote', ('env', 'repo'))):
+            graph.add(name, lambda **kwargs: None, requires=requires)
+        graph.run()
+        # Fake the timings to not depend on the speed of the threads
+        graph.timings = {
+            'org': (0.0, 1.0),
+            'env': (1.0, 2.0),
+            'product': (1.0, 3.0),
+            'repo': (3.0, 6.0),
+            'promote': (6.0, 7.0),
+        }
+        self.assertEqual(
+            graph.critical_path(),
+            (['org', 'product', 'repo', 'promote'], 7.0)
+        )
+        report = graph.report()
+        self.assertIn(u'org > product > repo > promote (7.000s)', report)
+        self.assertIn(u'* repo', report)
+        self.assertIn(u'  env', report)
+
+    def test_critical_path_not_run(self):
+        """The critical path of a graph not run yet is empty"""
+        self.assertEqual(TaskGraph().critical_path(), ([], 0.0))
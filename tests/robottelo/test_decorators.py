@@ -1,8 +1,13 @@
 """Unit tests for :mod:`robottelo.decorators`."""
+import os
+import shutil
 import six
+import tempfile
+import threading
 
 from fauxfactory import gen_integer
 from robottelo import decorators
+from robottelo.cache import ObjectCache
 from robottelo.constants import BZ_CLOSED_STATUSES, BZ_OPEN_STATUSES
 from unittest2 import SkipTest, TestCase
 # (Too many public methods) pylint: disable=R0904
@@ -151,11 +156,13 @@ class BzBugIsOpenTestCase(TestCase):
 class CacheableTestCase(TestCase):
     """Tests for :func:`robottelo.decorators.cacheable`."""
     def setUp(self):
-        self.object_cache_patcher = mock.patch.dict(
-            'robottelo.decorators.OBJECT_CACHE')
+        self.object_cache_patcher = mock.patch(
+            'robottelo.decorators.OBJECT_CACHE', ObjectCache())
         self.object_cache = self.object_cache_patcher.start()
+        self.calls = []
 
         def make_foo(options):
+            self.calls.append(options)
             return {'id': 42}
 
         self.make_foo = decorators.cacheable(make_foo)
@@ -166,21 +173,84 @@ class CacheableTestCase(TestCase):
     def test_build_cache(self):
         """Create a new object and add it to the cache."""
         obj = self.make_foo(cached=True)
-        self.assertEqual(decorators.OBJECT_CACHE, {'foo': {'id': 42}})
-        self.assertEqual(id(decorators.OBJECT_CACHE['foo']), id(obj))
+        self.assertEqual(len(decorators.OBJECT_CACHE), 1)
+        self.assertIs(decorators.OBJECT_CACHE.get('foo'), obj)
 
     def test_return_from_cache(self):
         """Return an already cached object."""
         cache_obj = {'id': 42}
-        decorators.OBJECT_CACHE['foo'] = cache_obj
+        decorators.OBJECT_CACHE.set('foo', None, cache_obj)
         obj = self.make_foo(cached=True)
         self.assertEqual(id(cache_obj), id(obj))
+        self.assertEqual(self.calls, [])
 
     def test_create_and_not_add_to_cache(self):
         """Create a new object and not add it to the cache."""
         self.make_foo(cached=False)
-        self.assertNotIn('foo', decorators.OBJECT_CACHE)
-        self.assertEqual(decorators.OBJECT_CACHE, {})
+        self.assertIsNone(decorators.OBJECT_CACHE.get('foo'))
+        self.assertEqual(len(decorators.OBJECT_CACHE), 0)
+
+    def test_cache_by_options(self):
+        """Objects created with different options are cached apart."""
+        first = self.make_foo({'a': 1, 'b': None}, cached=True)
+        self.assertIs(self.make_foo({'a': 1}, cached=True), first)
+        self.make_foo({'a': 2}, cached=True)
+        self.assertEqual(self.calls, [{'a': 1, 'b': None}, {'a': 2}])
+        self.assertEqual(
+            decorators.OBJECT_CACHE.stats,
+            {'hits': 1, 'misses': 2, 'evictions': 0, 'expirations': 0},
+        )
+
+    def test_concurrent_calls(self):
+        """Concurrent calls with the same options create one object."""
+        threads = [
+            threading.Thread(target=self.make_foo, kwargs={'cached': True})
+            for _ in range(10)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self.calls), 1)
+
+
+class ObjectCachePersistenceTestCase(TestCase):
+    """Tests for the persistence of :data:`robottelo.decorators.OBJECT_CACHE`.
+    """
+    # (protected-access) pylint:disable=W0212
+    def setUp(self):
+        """Use a new cache and a temporary directory to save it."""
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        for name, value in (
+                ('OBJECT_CACHE', ObjectCache()),
+                ('_object_cache_configured', False),
+                ('_object_cache_path', None),
+                ('get_server_version', lambda: '6.2.0')):
+            patcher = mock.patch.object(decorators, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch('robottelo.decorators.settings')
+        settings = patcher.start()
+        self.addCleanup(patcher.stop)
+        settings.configured = True
+        settings.object_cache_dir = self.directory
+        settings.object_cache_ttl = 60
+        settings.server.hostname = 'sat.example.com'
+        self.make_foo = decorators.cacheable(lambda options: {'id': 42})
+
+    def test_save_and_load(self):
+        """Cached objects are saved at exit and loaded by the next run."""
+        self.make_foo({'a': 1}, cached=True)
+        self.assertEqual(decorators.OBJECT_CACHE.ttl, 60)
+        decorators._save_object_cache()
+        path = os.path.join(self.directory, 'sat.example.com-6.2.0.json')
+        self.assertTrue(os.path.exists(path))
+        decorators.OBJECT_CACHE.clear()
+        decorators._object_cache_configured = False
+        decorators._configure_object_cache()
+        self.assertEqual(
+            decorators.OBJECT_CACHE.get('<lambda>', {'a': 1}), {'id': 42})
 
 
 class RmBugIsOpenTestCase(TestCase):
@@ -0,0 +1,288 @@
+"""Tests for module ``robottelo.performance.driver``."""
+import threading
+import time
+
+from robottelo.performance import driver
+from unittest2 import TestCase
+
+
+@driver.register_operation('test-client', client=True, one_shot=True)
+def with_client(step, clients):
+    """Return the client of the worker."""
+    return clients[step.worker]
+
+
+@driver.register_operation('test-index')
+def item_index(step):
+    """Return the index of the operation."""
+    return step.index
+
+
+@driver.register_operation('test-steps', streams=('first', 'second'))
+def two_steps(step, factor=1):
+    """Return the timings of two steps."""
+    return (step.worker * factor, step.iteration * factor)
+
+
+class DoublingTestCase(TestCase):
+    """Tests for :func:`robottelo.performance.driver.doubling`."""
+
+    def test_doubling(self):
+        """Levels double up to the maximum, always included"""
+        self.assertEqual(driver.doubling(1), [1])
+        self.assertEqual(driver.doubling(8), [1, 2, 4, 8])
+        self.assertEqual(driver.doubling(10), [1, 2, 4, 8, 10])
+
+
+class LoadDriverTestCase(TestCase):
+    """Tests for :class:`robottelo.performance.driver.LoadDriver`."""
+
+    def test_run(self):
+        """Each worker runs its iterations and its timings are kept"""
+        def operation(step, offset):
+            """Return a timing made of the step."""
+            return offset + step.worker * 10 + step.iteration
+        result = driver.LoadDriver(operation, {'offset': 100}).run(3, 2)
+        self.assertEqual(result.concurrency, 3)
+        self.assertEqual(result.timings('operation'), {
+            'thread-0': [100, 101],
+            'thread-1': [110, 111],
+            'thread-2': [120, 121],
+        })
+        self.assertEqual(len(result.measures('operation')), 6)
+        self.assertEqual(result.errors('operation'), [])
+
+    def test_workers_run_concurrently(self):
+        """All the workers run at the same time"""
+        started = []
+        condition = threading.Condition()
+
+        def operation(step):
+            """Wait for all the workers to run."""
+            with condition:
+                started.append(step.worker)
+                condition.notify_all()
+                while len(started) < step.workers:
+                    condition.wait(5)
+            return len(started)
+        result = driver.LoadDriver(operation).run(4, 1)
+        self.assertEqual(
+            sorted(sum(result.timings('operation').values(), [])), [4] * 4)
+
+    def test_streams(self):
+        """Each step of an operation has its own stream"""
+        result = driver.LoadDriver('test-steps', {'factor': 2}).run(2, 2)
+        self.assertEqual(
+            result.timings('first'), {'thread-0': [0, 0], 'thread-1': [2, 2]})
+        self.assertEqual(
+            result.timings('second'), {'thread-0': [0, 2], 'thread-1': [0, 2]})
+
+    def test_warmup_cooldown(self):
+        """Warmup and cooldown iterations run but are not measured"""
+        phases = []
+        lock = threading.Lock()
+
+        def operation(step):
+            """Record the phase of the step."""
+            with lock:
+                phases.append((step.phase, step.iteration))
+            return step.iteration
+        result = driver.LoadDriver(
+            operation, warmup=2, cooldown=1).run(1, 3)
+        self.assertEqual(phases, [
+            (driver.WARMUP, 0), (driver.WARMUP, 1),
+            (driver.MEASURE, 0), (driver.MEASURE, 1), (driver.MEASURE, 2),
+            (driver.COOLDOWN, 0),
+        ])
+        self.assertEqual(result.timings('operation'), {'thread-0': [0, 1, 2]})
+
+    def test_errors(self):
+        """Failed operations are measured with their error"""
+        def operation(step):
+            """Fail on odd iterations."""
+            if step.iteration % 2:
+                raise ValueError('failed')
+            return 1.0
+        result = driver.LoadDriver(operation).run(1, 4)
+        self.assertEqual(
+            result.timings('operation'), {'thread-0': [1.0, None, 1.0, None]})
+        errors = result.errors('operation')
+        self.assertEqual([error.iteration for error in errors], [1, 3])
+        self.assertIn('failed', errors[0].error)
+
+    def test_ramp(self):
+        """The total iterations of each level are split between workers"""
+        levels = driver.LoadDriver(lambda step: 0).ramp(
+            driver.doubling(4), total_iterations=8)
+        self.assertEqual(
+            [(concurrency, len(result.measures('<lambda>')),
+              len(result.timings('<lambda>')['thread-0']))
+             for concurrency, result in levels],
+            [(1, 8, 8), (2, 8, 4), (4, 8, 2)]
+        )
+
+    def test_process_executor(self):
+        """Registered operations run in a process pool"""
+        result = driver.LoadDriver(
+            'test-steps', {'factor': 3}, executor='process').run(2, 1)
+        self.assertEqual(
+            result.timings('first'), {'thread-0': [0], 'thread-1': [3]})
+
+    def test_unknown(self):
+        """Unknown operations and executors are rejected"""
+        with self.assertRaises(driver.LoadDriverError):
+            driver.LoadDriver('unknown')
+        with self.assertRaises(driver.LoadDriverError):
+            driver.LoadDriver(lambda step: 0, executor='unknown')
+
+
+class OpenLoopTestCase(TestCase):
+    """Tests for :meth:`robottelo.performance.driver.LoadDriver.run_open_loop`
+    and the latency of its measures.
+    """
+
+    def test_schedule(self):
+        """Operations are scheduled at a constant rate"""
+        self.assertEqual(driver.schedule(4, 3), [0.0, 0.25, 0.5])
+        self.assertEqual(driver.schedule(2, 2, 10.0), [10.0, 10.5])
+
+    def test_run_open_loop(self):
+        """Operations are spread over the workers and keep their schedule"""
+        phases = []
+        lock = threading.Lock()
+
+        def operation(step):
+            """Record the phase of the step."""
+            with lock:
+                phases.append(step.phase)
+            return step.iteration
+        result = driver.LoadDriver(
+            operation, warmup=1, cooldown=1).run_open_loop(100, 5, 2)
+        self.assertEqual(sorted(phases), sorted(
+            [driver.WARMUP, driver.COOLDOWN] + [driver.MEASURE] * 5))
+        self.assertEqual(result.concurrency, 2)
+        self.assertEqual(
+            result.timings('operation'),
+            {'thread-0': [0, 1, 2], 'thread-1': [0, 1]})
+        measures = result.measures('operation')
+        intended = sorted(measure.intended for measure in measures)
+        for previous, following in zip(intended, intended[1:]):
+            self.assertAlmostEqual(following - previous, 0.01)
+        for measure in measures:
+            self.assertGreaterEqual(measure.start, measure.intended)
+
+    def test_index(self):
+        """Each measured operation gets its own index"""
+        for run in (
+                lambda load: load.run(4, 3),
+                lambda load: load.run_open_loop(1000, 10, 4)):
+            result = run(driver.LoadDriver('test-index', warmup=1))
+            indexes = sorted(sum(result.timings('test-index').values(), []))
+            self.assertEqual(indexes, list(range(len(indexes))))
+
+    def test_client_operations(self):
+        """Operations needing a client per worker do not run in open loop"""
+        self.assertFalse(driver.supports_open_loop('test-client'))
+        self.assertTrue(driver.supports_open_loop('test-index'))
+        load = driver.LoadDriver('test-client', {'clients': [0, 1]})
+        with self.assertRaises(driver.LoadDriverError):
+            load.run_open_loop(100, 4, 2)
+        self.assertEqual(
+            load.run(2, 1).timings('test-client'),
+            {'thread-0': [0], 'thread-1': [1]})
+
+    def test_one_shot_operations(self):
+        """One shot operations do not run warmup or cooldown iterations"""
+        with self.assertRaises(driver.LoadDriverError):
+            driver.LoadDriver('test-client', warmup=1)
+        with self.assertRaises(driver.LoadDriverError):
+            driver.LoadDriver('test-client', cooldown=1)
+
+    def test_latency_includes_wait(self):
+        """Operations waiting for a busy worker count their wait"""
+        def operation(step):
+            """Take longer than the time between two operations."""
+            time.sleep(0.05)
+            return 0
+        result = driver.LoadDriver(operation).run_open_loop(100, 4, 1)
+        measures = sorted(
+            result.measures('operation'), key=lambda measure: measure.start)
+        self.assertLess(measures[-1].duration, measures[-1].latency)
+        self.assertGreater(measures[-1].latency, 0.15)
+        duration = result.percentiles('operation', (100,))[100]
+        corrected = result.percentiles('operation', (100,), corrected=True)
+        self.assertGreater(corrected[100], duration)
+
+    def test_percentiles(self):
+        """Percentiles are computed from the measured durations"""
+        result = driver.LoadResult(1, {'operation': [[
+            driver.Measure(0, index, 10.0, duration, None, None, 9.0)
+            for index, duration in enumerate((1.0, 2.0, 3.0))
+        ]]})
+        self.assertEqual(
+            result.percentiles('operation', (0, 50, 100)),
+            {0: 1.0, 50: 2.0, 100: 3.0})
+        self.assertEqual(
+            result.percentiles('operation', (50,), corrected=True),
+            {50: 3.0})
+        self.assertEqual(driver.LoadResult(1, {'operation': [[]]})
+                         .percentiles('operation'), {})
+
+
+class KeepMeasuresTestCase(TestCase):
+    """Tests for :class:`robottelo.performance.driver.LoadDriver` keeping
+    only the statistics of the measures.
+    """
+
+    @staticmethod
+    def operation(step):
+        """Fail on the third iteration of the first worker."""
+        if step.worker == 0 and step.iteration == 2:
+            raise ValueError('failed')
+        return step.worker * 10.0 + step.iteration + 1
+
+    def test_statistics(self):
+        """Workers keep bucketed statistics of their timings"""
+        result = driver.LoadDriver(
+            self.operation, keep_measures=False, bucket_size=2).run(2, 4)
+        self.assertEqual(result.count('operation'), 8)
+        with self.assertRaises(driver.LoadDriverError):
+            result.timings('operation')
+        errors = result.errors('operation')
+        self.assertEqual(
+            [(error.worker, error.iteration) for error in errors], [(0, 2)])
+        self.assertEqual(result.measures('operation'), errors)
+        thread_stats = result.thread_stats('operation')
+        self.assertEqual(
+            [thread_stat.histogram.count for thread_stat in thread_stats],
+            [3, 4])
+        self.assertEqual(
+            [(bucket.min, bucket.max)
+             for bucket in thread_stats[1].complete_buckets()],
+            [(11.0, 12.0), (13.0, 14.0)])
+        self.assertEqual(
+            sorted(result.percentiles('operation', (50, 100))), [50, 100])
+
+    def test_open_loop_statistics(self):
+        """Open loop runs keep the statistics of each worker"""
+        result = driver.LoadDriver(
+            self.operation, keep_measures=False, bucket_size=1,
+        ).run_open_loop(200, 6, 2)
+        self.assertEqual(result.count('operation'), 6)
+        self.assertEqual(len(result.errors('operation')), 1)
+        self.assertEqual(
+            [len(thread_stat.complete_buckets())
+             for thread_stat in result.thread_stats('operation')],
+            [3, 3])
+        self.assertGreaterEqual(
+            result.percentiles('operation', (100,), corrected=True)[100],
+            0)
+
+    def test_statistics_from_measures(self):
+        """Statistics are computed when all the measures are kept"""
+        result = driver.LoadDriver(self.operation).run(2, 3)
+        self.assertEqual(result.count('operation'), 6)
+        self.assertEqual(
+            [thread_stat.histogram.count
+             for thread_stat in result.thread_stats('operation')],
+            [2, 3])
@@ -0,0 +1,177 @@
+"""Tests for module ``robottelo.cli.factory``."""
+import re
+import six
+
+from robottelo.cli import factory
+from robottelo.ssh import _command_result
+from unittest2 import TestCase
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+class RoundTripsTestCase(TestCase):
+    """Count the SSH round trips done by the ``make_*`` functions."""
+
+    #: Factories which only need an organization to create their entity
+    factories = (
+        'make_activation_key',
+        'make_architecture',
+        'make_compute_resource',
+        'make_content_view',
+        'make_domain',
+        'make_environment',
+        'make_host_collection',
+        'make_hostgroup',
+        'make_lifecycle_environment',
+        'make_location',
+        'make_medium',
+        'make_model',
+        'make_org',
+        'make_os',
+        'make_product',
+        'make_role',
+        'make_subnet',
+        'make_user',
+        'make_usergroup',
+    )
+
+    def setUp(self):
+        """Answer all hammer commands with a new entity."""
+        self.commands = []
+        patcher = mock.patch('robottelo.cli.base.settings')
+        patcher.start().server.ssh_backend = 'paramiko'
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch('robottelo.cli.base.ssh.command', self.command)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def command(self, cmd, output_format=None, timeout=None):
+        """Record ``cmd`` and return the output hammer would."""
+        cmd = cmd.decode('utf-8')
+        self.commands.append(cmd)
+        output = u'Message,Id,Name\nCreated,1,entity\n'
+        match = re.search(r'echo (robottelo-info-\w+)', cmd)
+        if match is not None:
+            output += u'{0}\nId: 1\nName: entity\n'.format(match.group(1))
+        elif u' info ' in cmd:
+            output = u'Id: 1\nName: entity\n'
+        return _command_result(output.encode('utf-8'), b'', 0, output_format)
+
+    def test_round_trips(self):
+        """Each factory creates and reads its entity in one round trip"""
+        round_trips = {}
+        for name in self.factories:
+            del self.commands[:]
+            entity = getattr(factory, name)({u'organization-id': u'1'})
+            self.assertEqual(entity[u'id'], u'1')
+            round_trips[name] = len(self.commands)
+        self.assertEqual(
+            round_trips, dict((name, 1) for name in self.factories))
+
+    def test_info_overridden(self):
+        """Factories of classes overriding info read their entity apart"""
+        entity = factory.make_registry({u'organization-id': u'1'})
+        self.assertEqual(entity[u'id'], u'1')
+        self.assertEqual(len(self.commands), 2)
+
+
+class SetupOrgTestCase(TestCase):
+    """Tests for the ``setup_org_for_*`` functions."""
+
+    def setUp(self):
+        """Record the steps run, replacing the factories and commands."""
+        self.steps = []
+        for name, result in (
+                ('make_activation_key', {'id': 'ak'}),
+                ('make_content_view', {'id': 'cv'}),
+                ('make_lifecycle_environment', {'id': 'env'}),
+                ('make_org', {'id': 'org'}),
+                ('make_product', {'id': 'product', 'name': 'Product'}),
+                ('make_repository', {'id': 'repo'}),
+                ('activationkey_add_subscription_to_repo', None)):
+            patcher = mock.patch.object(
+                factory, name, side_effect=self.step(name, result))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        for cli, methods in (
+                ('ContentView', ('add_repository', 'info', 'publish',
+                                 'version_promote')),
+                ('Repository', ('synchronize',))):
+            patcher = mock.patch.object(factory, cli)
+            cli_mock = patcher.start()
+            self.addCleanup(patcher.stop)
+            for method in methods:
+                result = {'versions': [{'id': 'cvv'}]}
+                getattr(cli_mock, method).side_effect = self.step(
+                    '{0}.{1}'.format(cli, method), result)
+
+    def step(self, name, result):
+        """Return a function recording the step ``name``."""
+        def run(*args, **kwargs):
+            """Record the step and return its result."""
+            self.steps.append((name, args))
+            return result
+        return run
+
+    def assert_before(self, first, second):
+        """Check that the step ``first`` ran before ``second``."""
+        names = [name for name, _ in self.steps]
+        self.assertLess(names.index(first), names.index(second))
+
+    def test_custom_repo(self):
+        """The custom repository setup creates every entity in order"""
+        result = factory.setup_org_for_a_custom_repo({u'url': u'http://repo'})
+        self.assertEqual(result, {
+            u'activationkey-id': 'ak',
+            u'content-view-id': 'cv',
+            u'lifecycle-environment-id': 'env',
+            u'organization-id': 'org',
+            u'product-id': 'product',
+            u'repository-id': 'repo',
+        })
+        self.assertEqual(len(self.steps), 12)
+        for first, second in (
+                ('make_org', 'make_lifecycle_environment'),
+                ('make_org', 'make_product'),
+                ('make_org', 'make_content_view'),
+                ('make_product', 'make_repository'),
+                ('make_repository', 'Repository.synchronize'),
+                ('Repository.synchronize', 'ContentView.publish'),
+                ('ContentView.add_repository', 'ContentView.publish'),
+                ('ContentView.publish', 'ContentView.version_promote'),
+                ('make_lifecycle_environment', 'ContentView.version_promote'),
+                ('ContentView.version_promote', 'make_activation_key'),
+                ('make_activation_key',
+                 'activationkey_add_subscription_to_repo')):
+            self.assert_before(first, second)
+        self.assertEqual(
+            self.steps[-1][1][0][u'subscription'], 'Product')
+
+    def test_custom_repo_given_entities(self):
+        """The given entities are used instead of creating new ones"""
+        result = factory.setup_org_for_a_custom_repo({
+            u'url': u'http://repo',
+            u'organization-id': 'given-org',
+            u'lifecycle-environment-id': 'given-env',
+            u'content-view-id': 'given-cv',
+        })
+        names = [name for name, _ in self.steps]
+        for name in ('make_org', 'make_lifecycle_environment',
+                     'make_content_view'):
+            self.assertNotIn(name, names)
+        self.assertEqual(result[u'organization-id'], 'given-org')
+        self.assertEqual(result[u'lifecycle-environment-id'], 'given-env')
+        self.assertEqual(result[u'content-view-id'], 'given-cv')
+
+    def test_custom_repo_failure(self):
+        """A failed step raises the factory error and stops the setup"""
+        factory.Repository.synchronize.side_effect = (
+            factory.CLIReturnCodeError(1, u'', u'sync failed'))
+        with self.assertRaises(factory.CLIFactoryError):
+            factory.setup_org_for_a_custom_repo({u'url': u'http://repo'})
+        names = [name for name, _ in self.steps]
+        self.assertNotIn('ContentView.publish', names)
+        self.assertNotIn('make_activation_key', names)
@@ -37,6 +37,64 @@ class ParseCSVTestCase(unittest2.TestCase):
             ]
         )
 
+    def test_parse_csv_multiline_value(self):
+        """Quoted values can span several lines"""
+        self.assertEqual(
+            hammer.parse_csv([u'Id,Description', u'1,"first', u'second"']),
+            [{u'id': u'1', u'description': u'first\nsecond'}]
+        )
+
+    def test_parse_csv_empty(self):
+        """Empty output gives no rows"""
+        self.assertEqual(hammer.parse_csv([]), [])
+
+
+class ParseCSVIterTestCase(unittest2.TestCase):
+    """Tests for parsing CSV hammer output lazily"""
+    def test_lazy(self):
+        """Rows are parsed as lines are read"""
+        read = []
+
+        def lines():
+            """Yield lines, recording which were read"""
+            for line in (u'Id,Name', u'1,first', u'2,second'):
+                read.append(line)
+                yield line
+
+        rows = hammer.parse_csv_iter(lines())
+        self.assertEqual(next(rows), {u'id': u'1', u'name': u'first'})
+        self.assertEqual(read, [u'Id,Name', u'1,first'])
+        self.assertEqual(list(rows), [{u'id': u'2', u'name': u'second'}])
+
+    def test_rows(self):
+        """Rows are read-only mappings sharing their header"""
+        first, second = hammer.parse_csv_iter(
+            [u'Id,Host Name', u'1,first', u'2,second'])
+        self.assertIs(first.header, second.header)
+        self.assertEqual(first[u'host-name'], u'first')
+        self.assertEqual(first.get(u'missing'), None)
+        self.assertEqual(sorted(first), [u'host-name', u'id'])
+        self.assertEqual(len(first), 2)
+        self.assertIn(u'id', first)
+        self.assertEqual(dict(second), {u'id': u'2', u'host-name': u'second'})
+        with self.assertRaises(TypeError):
+            first[u'id'] = u'3'
+
+    def test_mapping_methods(self):
+        """Rows have the methods of a mapping"""
+        row, = hammer.parse_csv_iter([u'Id,Name', u'1,first'])
+        self.assertEqual(list(row.values()), [u'1', u'first'])
+        self.assertEqual(
+            list(row.items()), [(u'id', u'1'), (u'name', u'first')])
+        self.assertEqual(list(row.keys()), [u'id', u'name'])
+
+    def test_short_row(self):
+        """Rows with less values than keys only have the first keys"""
+        row, = hammer.parse_csv_iter([u'Id,Name', u'1'])
+        self.assertEqual(row, {u'id': u'1'})
+        with self.assertRaises(KeyError):
+            row[u'name']  # pylint:disable=pointless-statement
+
 
 class ParseHelpTestCase(unittest2.TestCase):
     """Tests for parsing hammer help output"""
@@ -289,3 +347,37 @@ class ParseInfoTestCase(unittest2.TestCase):
                 ],
             }
         )
+
+    def test_parse_hash_attributes(self):
+        """Can parse attributes separated by '=>'"""
+        output = [
+            'Parameters:',
+            '    param1 => value1',
+            '    param 2 => value => 2',
+        ]
+        self.assertEqual(
+            hammer.parse_info(output),
+            {
+                'parameters': {
+                    'param1': 'value1',
+                    'param-2': 'value => 2',
+                },
+            }
+        )
+
+    def test_parse_many_numbered_items(self):
+        """Can parse numbered lists with more than nine items"""
+        output = ['Versions:']
+        for index in range(1, 301):
+            output.extend([
+                ' {0}) ID:      {0}'.format(index),
+                '    Version: {0}.0'.format(index),
+            ])
+        output.append('Lifecycle Environments:')
+        output.extend(
+            ' {0}) env {0}'.format(index) for index in range(1, 301))
+        result = hammer.parse_info(output)
+        self.assertEqual(len(result['versions']), 300)
+        self.assertEqual(
+            result['versions'][-1], {'id': '300', 'version': '300.0'})
+        self.assertEqual(result['lifecycle-environments'][-1], 'env 300')
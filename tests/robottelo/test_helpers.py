@@ -7,6 +7,8 @@ from robottelo.helpers import (
     escape_search,
     get_host_info,
     get_server_version,
+    install_katello_ca,
+    remove_katello_ca,
 )
 
 if six.PY2:
@@ -87,6 +89,67 @@ class GetHostInfoTestCase(unittest2.TestCase):
         self.assertEqual(message, 'Not able to parse release string ""')
 
 
+class KatelloCATestCase(unittest2.TestCase):
+    """Tests for ``install_katello_ca`` and ``remove_katello_ca``."""
+
+    def setUp(self):  # noqa
+        patcher = mock.patch('robottelo.helpers.settings')
+        settings = patcher.start()
+        settings.server.hostname = 'sat.example.com'
+        settings.server.get_cert_rpm_url.return_value = 'http://sat/ca.rpm'
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch('robottelo.helpers.ssh.command_batch')
+        self.command_batch = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def set_return_codes(self, *batches):
+        """Make each batch of commands return the return codes of one of
+        ``batches``.
+        """
+        self.command_batch.side_effect = [
+            [FakeSSHResult([], return_code) for return_code in return_codes]
+            for return_codes in batches
+        ]
+
+    def test_install(self):
+        """The rpm is installed and checked in a single batch"""
+        self.set_return_codes((1, 0))
+        install_katello_ca('client.example.com')
+        self.command_batch.assert_called_once_with([
+            'rpm -Uvh http://sat/ca.rpm',
+            'rpm -q katello-ca-consumer-sat.example.com',
+        ], 'client.example.com')
+
+    def test_install_fail(self):
+        """An error is raised if the rpm is not installed"""
+        self.set_return_codes((0, 1))
+        with self.assertRaises(AssertionError):
+            install_katello_ca('client.example.com')
+
+    def test_remove(self):
+        """The rpm is removed, then rhsm.conf is reset"""
+        self.set_return_codes((0, 1), (0, 0, 0, 0))
+        remove_katello_ca('client.example.com')
+        self.assertEqual(self.command_batch.call_count, 2)
+        self.assertEqual(
+            [len(call[0][0]) for call in self.command_batch.call_args_list],
+            [2, 4]
+        )
+
+    def test_remove_fail(self):
+        """rhsm.conf is left untouched if the rpm is still installed"""
+        self.set_return_codes((0, 0))
+        with self.assertRaises(AssertionError):
+            remove_katello_ca('client.example.com')
+        self.assertEqual(self.command_batch.call_count, 1)
+
+    def test_reset_rhsm_fail(self):
+        """An error is raised if rhsm.conf could not be reset"""
+        self.set_return_codes((0, 1), (0, 0, 1, 0))
+        with self.assertRaises(AssertionError):
+            remove_katello_ca('client.example.com')
+
+
 class FakeSSHResult(object):
     def __init__(self, stdout=None, return_code=None, stderr=None):
         self.stdout = stdout
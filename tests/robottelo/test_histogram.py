@@ -0,0 +1,70 @@
+"""Tests for module ``robottelo.histogram``."""
+import random
+
+from robottelo.histogram import Histogram
+from unittest2 import TestCase
+
+
+class HistogramTestCase(TestCase):
+    """Tests for class ``Histogram``."""
+
+    def test_empty(self):
+        """An empty histogram has no percentile"""
+        histogram = Histogram()
+        self.assertEqual(len(histogram), 0)
+        self.assertIsNone(histogram.percentile(50))
+        self.assertIsNone(histogram.mean)
+        self.assertIsNone(histogram.std)
+
+    def test_percentiles(self):
+        """Percentiles are within the relative error"""
+        rng = random.Random(0)
+        values = sorted(rng.lognormvariate(0, 2) for _ in range(20000))
+        histogram = Histogram(relative_error=0.01)
+        for value in values:
+            histogram.add(value)
+        for percent in (1, 10, 50, 90, 99, 99.9):
+            exact = values[int(percent / 100.0 * (len(values) - 1))]
+            self.assertAlmostEqual(
+                histogram.percentile(percent) / exact, 1, delta=0.011)
+        self.assertEqual(histogram.percentile(0), values[0])
+        self.assertEqual(histogram.percentile(100), values[-1])
+        self.assertAlmostEqual(histogram.mean, sum(values) / len(values))
+        self.assertLess(len(histogram._buckets), 1000)
+
+    def test_std(self):
+        """The standard deviation is the one of the values"""
+        histogram = Histogram()
+        for value in (2, 4, 4, 4, 5, 5, 7, 9):
+            histogram.add(value)
+        self.assertAlmostEqual(histogram.std, 2.0)
+
+    def test_zero(self):
+        """Values lower than ``min_value`` are counted"""
+        histogram = Histogram()
+        histogram.add(0)
+        histogram.add(0, count=2)
+        histogram.add(5)
+        self.assertEqual(histogram.count, 4)
+        self.assertEqual(histogram.percentile(50), 0)
+        self.assertEqual(histogram.percentile(100), 5)
+
+    def test_merge(self):
+        """Merged histograms count the values of both"""
+        first, second, both = Histogram(), Histogram(), Histogram()
+        for value in range(1, 101):
+            (first if value % 2 else second).add(value)
+            both.add(value)
+        first.merge(second)
+        self.assertEqual(first.count, both.count)
+        self.assertEqual(first.total, both.total)
+        self.assertAlmostEqual(first.std, both.std)
+        self.assertEqual((first.min, first.max), (1, 100))
+        self.assertEqual(
+            first.percentiles((50, 90)), both.percentiles((50, 90)))
+
+    def test_merge_different(self):
+        """Histograms with different parameters can not be merged"""
+        with self.assertRaises(ValueError):
+            Histogram(relative_error=0.01).merge(
+                Histogram(relative_error=0.05))
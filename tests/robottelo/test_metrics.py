@@ -0,0 +1,128 @@
+"""Tests for module ``robottelo.cli.metrics``."""
+import csv
+import json
+import os
+import shutil
+import six
+import tempfile
+
+from robottelo import ssh
+from robottelo.cli import metrics
+from robottelo.cli.base import CLIReturnCodeError
+from robottelo.cli.org import Org
+from unittest2 import TestCase
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+class ParseRealTimeTestCase(TestCase):
+    """Tests for function ``parse_real_time``."""
+
+    def test_parse(self):
+        """The last ``real`` time is returned"""
+        self.assertEqual(
+            metrics.parse_real_time(
+                u'warning\nreal 1.50\nuser 0.90\nsys 0.10\nreal 2.25\n'),
+            2.25,
+        )
+
+    def test_missing(self):
+        """``None`` is returned when there is no time"""
+        for stderr in (None, b'', u'', u'real\nreal x\n'):
+            self.assertIsNone(metrics.parse_real_time(stderr))
+
+
+class MetricsRegistryTestCase(TestCase):
+    """Tests for class ``MetricsRegistry``."""
+
+    def setUp(self):  # noqa
+        self.registry = metrics.MetricsRegistry()
+        for wall_time in range(1, 11):
+            self.registry.record(
+                u'organization list', wall_time, wall_time - 0.5, 10, 100)
+        self.registry.record(u'org info', 100, failed=True)
+
+    def test_summary(self):
+        """Commands are summarized, the slowest in total first"""
+        summary = self.registry.summary()
+        self.assertEqual(
+            [command for command, _ in summary],
+            [u'org info', u'organization list'],
+        )
+        org_list = summary[1][1]
+        self.assertEqual(org_list['calls'], 10)
+        self.assertEqual(org_list['failures'], 0)
+        self.assertEqual(org_list['bytes_sent'], 100)
+        self.assertEqual(org_list['bytes_received'], 1000)
+        self.assertEqual(org_list['wall_total'], 55)
+        self.assertEqual(org_list['wall_max'], 10)
+        self.assertAlmostEqual(
+            org_list['wall_percentiles'][50], 5, delta=0.1)
+        self.assertAlmostEqual(
+            org_list['real_percentiles'][90], 8.5, delta=0.1)
+        self.assertEqual(summary[0][1]['failures'], 1)
+        self.assertIsNone(summary[0][1]['real_percentiles'][50])
+
+    def test_export(self):
+        """The summary is exported as JSON and CSV"""
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        path = os.path.join(tmpdir, 'metrics')
+        with mock.patch.object(metrics, '_registry', self.registry):
+            metrics.export(path)
+        with open(path + '.json') as handler:
+            exported = json.load(handler)
+        self.assertEqual(
+            [command['command'] for command in exported],
+            [u'org info', u'organization list'],
+        )
+        with open(path + '.csv') as handler:
+            rows = list(csv.reader(handler))
+        self.assertEqual(rows[0], list(metrics.CSV_COLUMNS))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[2][:3], [u'organization list', u'10', u'0'])
+
+
+class ExecuteMetricsTestCase(TestCase):
+    """Tests for the metrics recorded by ``Base.execute``."""
+
+    def setUp(self):  # noqa
+        patcher = mock.patch('robottelo.cli.base.settings')
+        settings = patcher.start()
+        settings.server.ssh_backend = 'paramiko'
+        settings.performance.time_hammer = True
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch('robottelo.cli.base.ssh.command', self.command)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.registry = metrics.MetricsRegistry()
+        patcher = mock.patch.object(metrics, '_registry', self.registry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def command(self, cmd, output_format=None, timeout=None):
+        """Answer like hammer run with ``time -p``"""
+        return_code = 70 if b'fail' in cmd else 0
+        return ssh._command_result(
+            b'Id: 1\n', b'real 0.75\nuser 0.50\nsys 0.10\n', return_code)
+
+    def test_record(self):
+        """Each call is recorded under its command path"""
+        Org.info({u'id': 1})
+        Org.info({u'id': 2})
+        with self.assertRaises(CLIReturnCodeError):
+            Org.delete({u'name': u'fail'})
+        summary = dict(self.registry.summary())
+        self.assertEqual(
+            sorted(summary), [u'organization delete', u'organization info'])
+        org_info = summary[u'organization info']
+        self.assertEqual(org_info['calls'], 2)
+        self.assertEqual(org_info['failures'], 0)
+        self.assertEqual(org_info['bytes_received'], 2 * 35)
+        self.assertGreater(org_info['bytes_sent'], 0)
+        self.assertAlmostEqual(
+            org_info['real_percentiles'][50], 0.75, delta=0.01)
+        self.assertEqual(summary[u'organization delete']['failures'], 1)
@@ -0,0 +1,179 @@
+"""Tests for module ``robottelo.cli.pool``."""
+import itertools
+import six
+import threading
+import time
+
+from robottelo.cli import pool
+from unittest2 import TestCase
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+class Factory(object):
+    """Create and delete fake entities, remembering the calls."""
+
+    def __init__(self):
+        self.ids = itertools.count(1)
+        self.created = []
+        self.deleted = []
+        self.lock = threading.Lock()
+
+    def create(self, options):
+        """Return a new entity created with ``options``."""
+        with self.lock:
+            entity = dict(options, id=next(self.ids))
+            self.created.append(entity)
+        return entity
+
+    def delete(self, entity):
+        """Remember that ``entity`` was deleted."""
+        self.deleted.append(entity['id'])
+
+
+def wait_for(condition, timeout=5):
+    """Wait until ``condition()`` is true."""
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            raise AssertionError('Timed out')
+        time.sleep(0.01)
+
+
+class EntityPoolTestCase(TestCase):
+    """Tests for :class:`robottelo.cli.pool.EntityPool`."""
+
+    def setUp(self):
+        """Create a pool of 2 fake entities."""
+        self.factory = Factory()
+        self.pool = pool.EntityPool(
+            'org', self.factory.create, self.factory.delete, 2)
+        self.addCleanup(self.pool.close)
+
+    def test_miss_then_hits(self):
+        """The first entities are created at once, the next ones are pooled"""
+        self.assertEqual(self.pool.take()['id'], 1)
+        self.assertEqual(self.pool.take()['id'], 2)
+        wait_for(lambda: len(self.pool) == 2)
+        self.assertEqual(self.pool.take()['id'], 3)
+        self.assertEqual(self.pool.take()['id'], 4)
+        self.assertEqual((self.pool.hits, self.pool.misses), (2, 2))
+        wait_for(lambda: len(self.pool) == 2)
+        self.assertEqual(self.pool.created, 4)
+
+    def test_asked_once(self):
+        """The pool is not filled for options asked for only once"""
+        self.pool.take({u'organization-id': 1})
+        self.assertFalse(self.pool._filling)
+        self.assertEqual(len(self.pool), 0)
+        self.assertEqual(len(self.factory.created), 1)
+
+    def test_pool_by_options(self):
+        """Entities created with other options are not handed out"""
+        self.pool.take({u'organization-id': 1})
+        self.pool.take({u'organization-id': 1})
+        wait_for(lambda: len(self.pool) == 2)
+        entity = self.pool.take({u'organization-id': 2})
+        self.assertEqual(entity[u'organization-id'], 2)
+        self.assertEqual(self.pool.misses, 3)
+        entity = self.pool.take({u'organization-id': 1})
+        self.assertEqual(entity[u'organization-id'], 1)
+        self.assertEqual(self.pool.hits, 1)
+
+    def test_wait_avoided(self):
+        """The time taken to create the pooled entities handed out is
+        counted
+        """
+        def create(options):
+            """Take some time to create the entity."""
+            time.sleep(0.05)
+            return self.factory.create(options)
+        self.pool._create = create
+        self.pool.take()
+        self.pool.take()
+        wait_for(lambda: len(self.pool) == 2)
+        self.pool.take()
+        self.assertGreaterEqual(self.pool.wait_avoided, 0.04)
+
+    def test_close(self):
+        """Closing the pool deletes the entities not handed out"""
+        self.pool.take()
+        self.pool.take()
+        wait_for(lambda: len(self.pool) == 2)
+        self.assertEqual(self.pool.close(), 2)
+        self.assertEqual(sorted(self.factory.deleted), [3, 4])
+        self.assertEqual(len(self.pool), 0)
+        # A closed pool is not filled again
+        self.pool.take()
+        self.assertEqual(len(self.pool), 0)
+
+    def test_create_failure(self):
+        """A failure to create a pooled entity stops filling the pool"""
+        self.pool._create = mock.Mock(side_effect=[
+            {'id': 1}, {'id': 2}, ValueError('failed')])
+        self.assertEqual(self.pool.take(), {'id': 1})
+        self.assertEqual(self.pool.take(), {'id': 2})
+        wait_for(lambda: not self.pool._filling)
+        self.assertEqual(len(self.pool), 0)
+
+
+class PooledTestCase(TestCase):
+    """Tests for :func:`robottelo.cli.pool.pooled`."""
+
+    def setUp(self):
+        """Pool the ``product`` entities by organization."""
+        self.factory = Factory()
+        self.cli_object = mock.Mock()
+        self.cli_object.delete.side_effect = self.factory.delete
+
+        @pool.pooled(self.cli_object, scope=('organization-id',))
+        def make_product(options=None):
+            """Create a fake product."""
+            return self.factory.create(options)
+
+        self.make_product = make_product
+        pool.configure({'product': '1'}, scoped=True)
+        self.addCleanup(pool.close_all)
+        self.addCleanup(setattr, pool, '_scoped', False)
+        self.addCleanup(setattr, pool, '_sizes', None)
+
+    def test_default_options(self):
+        """Calls with default options take pooled entities"""
+        self.make_product({u'organization-id': 1})
+        self.make_product({u'organization-id': 1})
+        wait_for(lambda: len(pool._pools['product']) == 1)
+        self.assertEqual(self.make_product({u'organization-id': 1})['id'], 3)
+        self.assertEqual(pool._pools['product'].hits, 1)
+
+    def test_scoped_disabled(self):
+        """Entities created in an organization are not pooled by default"""
+        pool.configure({'product': '1'})
+        self.make_product({u'organization-id': 1})
+        self.make_product({u'organization-id': 1})
+        self.assertEqual(pool._pools, {})
+        self.assertEqual(len(self.factory.created), 2)
+
+    def test_other_options(self):
+        """Calls with other options always create a new entity"""
+        self.make_product({u'organization-id': 1, u'name': u'product'})
+        self.assertNotIn('product', pool._pools)
+        self.assertEqual(len(self.factory.created), 1)
+
+    def test_not_configured(self):
+        """Entities without a pool size are not pooled"""
+        pool.configure({'org': 1})
+        self.make_product({u'organization-id': 1})
+        self.assertEqual(pool._pools, {})
+
+    def test_close_all(self):
+        """Unused pooled entities are deleted with the CLI object"""
+        self.make_product({u'organization-id': 1})
+        self.make_product({u'organization-id': 1})
+        wait_for(lambda: len(pool._pools['product']) == 1)
+        self.assertIn(u'product', pool.report())
+        pool.close_all()
+        self.cli_object.delete.assert_called_once_with({u'id': 3})
+        self.assertEqual(pool._pools, {})
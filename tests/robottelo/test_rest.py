@@ -0,0 +1,245 @@
+"""Tests for module ``robottelo.cli.rest``."""
+import six
+import threading
+
+from robottelo.cli import rest
+from robottelo.cli.base import CLIReturnCodeError
+from robottelo.cli.org import Org
+from robottelo.cli.syncplan import SyncPlan
+from unittest2 import TestCase
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+class HandlesTestCase(TestCase):
+    """Tests for function ``robottelo.cli.rest.handles``."""
+
+    def test_disabled(self):
+        """Nothing is handled unless the backend is enabled"""
+        self.assertFalse(rest.handles('organization', 'create'))
+        with rest.enabled():
+            self.assertTrue(rest.handles('organization', 'create'))
+            with rest.enabled():
+                self.assertTrue(rest.handles('organization', 'create'))
+            self.assertTrue(rest.handles('organization', 'create'))
+        self.assertFalse(rest.handles('organization', 'create'))
+
+    def test_other_threads(self):
+        """The backend is enabled for the threads started in the block"""
+        results = []
+
+        def run():
+            """Check if the backend is enabled in the thread."""
+            results.append(rest.is_enabled())
+
+        with rest.enabled():
+            thread = threading.Thread(target=run)
+            thread.start()
+            thread.join()
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join()
+        self.assertEqual(results, [True, False])
+
+    def test_unknown_entity(self):
+        """Entities without endpoint are not handled"""
+        with rest.enabled():
+            self.assertFalse(rest.handles('ping', 'list'))
+
+    def test_name_options(self):
+        """Options resolved by hammer are not handled"""
+        with rest.enabled():
+            self.assertFalse(rest.handles(
+                'product', 'create', {u'organization': u'org'}))
+            self.assertFalse(rest.handles(
+                'user', 'create', {u'locations': u'loc1,loc2'}))
+            self.assertTrue(rest.handles(
+                'product', 'create', {u'organization-id': u'1'}))
+
+    def test_required_params(self):
+        """Path parameters and ids are required"""
+        with rest.enabled():
+            self.assertFalse(rest.handles('sync-plan', 'list'))
+            self.assertTrue(rest.handles(
+                'sync-plan', 'list', {u'organization-id': u'1'}))
+            self.assertFalse(rest.handles(
+                'organization', 'info', {u'name': u'org'}))
+            self.assertTrue(rest.handles(
+                'organization', 'info', {u'id': u'1'}))
+
+
+class ConversionTestCase(TestCase):
+    """Tests for the conversion of options and results."""
+
+    def test_api_params(self):
+        """Hammer options are converted to API parameters"""
+        self.assertEqual(
+            rest._api_params({
+                u'name': u'foo',
+                u'organization-ids': u'1,2',
+                u'per-page': 10000,
+                u'description': None,
+                u'enabled': False,
+            }),
+            {
+                u'name': u'foo',
+                u'organization_ids': [u'1', u'2'],
+                u'per_page': 10000,
+            }
+        )
+
+    def test_to_hammer(self):
+        """API values are shown as hammer shows them"""
+        self.assertEqual(
+            rest._to_hammer({
+                u'id': 1,
+                u'organization_id': 2,
+                u'description': None,
+                u'enabled': True,
+                u'locations': [{u'id': 3, u'name': u'loc'}],
+            }),
+            {
+                u'id': u'1',
+                u'organization-id': u'2',
+                u'description': u'',
+                u'enabled': u'yes',
+                u'locations': [u'loc'],
+            }
+        )
+
+    def test_to_hammer_row(self):
+        """List rows only have the scalar fields"""
+        self.assertEqual(
+            rest._to_hammer_row({
+                u'id': 1,
+                u'name': u'org',
+                u'locations': [],
+                u'parent': {u'id': 2},
+            }),
+            {u'id': u'1', u'name': u'org'}
+        )
+
+
+class GetSessionTestCase(TestCase):
+    """Tests for function ``robottelo.cli.rest.get_session``."""
+
+    def setUp(self):
+        """Patch the settings and start with no sessions."""
+        patcher = mock.patch('robottelo.cli.rest.settings')
+        settings = patcher.start()
+        settings.server.get_credentials.return_value = (u'admin', u'pass')
+        self.addCleanup(patcher.stop)
+        rest._state.sessions = {}
+        self.addCleanup(setattr, rest._state, 'sessions', {})
+
+    def test_session_per_user(self):
+        """Each user has its own session, the server user by default"""
+        session = rest.get_session()
+        self.assertEqual(session.auth, (u'admin', u'pass'))
+        self.assertIs(rest.get_session((u'admin', u'pass')), session)
+        user_session = rest.get_session((u'user', u'secret'))
+        self.assertEqual(user_session.auth, (u'user', u'secret'))
+        self.assertIsNot(user_session, session)
+
+
+class ExecuteTestCase(TestCase):
+    """Tests for the CRUD commands run through the REST backend."""
+
+    def setUp(self):
+        """Patch the session and the settings."""
+        patcher = mock.patch('robottelo.cli.rest.get_session')
+        self.get_session = patcher.start()
+        self.session = self.get_session.return_value
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch('robottelo.cli.rest.settings')
+        patcher.start().server.get_url.return_value = 'https://example.com'
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch('robottelo.cli.base.ssh.command')
+        self.command = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.response = self.session.request.return_value
+        self.response.status_code = 200
+        self.response.content = b'{}'
+
+    def test_create(self):
+        """Create returns the whole entity in one request"""
+        self.response.json.return_value = {u'id': 1, u'name': u'org'}
+        with rest.enabled():
+            result = Org.create({u'name': u'org'})
+        self.assertEqual(result, {u'id': u'1', u'name': u'org'})
+        self.session.request.assert_called_once_with(
+            'POST',
+            'https://example.com/katello/api/v2/organizations',
+            json={u'organization': {u'name': u'org'}},
+        )
+        self.assertEqual(self.command.call_count, 0)
+
+    def test_with_user(self):
+        """Requests are sent as the user of the CLI wrapper"""
+        self.response.json.return_value = {u'id': 1, u'name': u'org'}
+        with rest.enabled():
+            Org.with_user(u'user', u'secret').create({u'name': u'org'})
+            Org.with_user(u'user', u'secret').info({u'id': 1})
+        self.assertEqual(
+            self.get_session.call_args_list,
+            [mock.call((u'user', u'secret'))] * 2,
+        )
+        self.assertEqual(self.command.call_count, 0)
+
+    def test_list(self):
+        """List uses a nested endpoint with query parameters"""
+        self.response.json.return_value = {
+            u'results': [{u'id': 1, u'name': u'plan'}]}
+        with rest.enabled():
+            result = SyncPlan.list({u'organization-id': 5})
+        self.assertEqual(result, [{u'id': u'1', u'name': u'plan'}])
+        self.session.request.assert_called_once_with(
+            'GET',
+            'https://example.com/katello/api/v2/organizations/5/sync_plans',
+            params={u'per_page': 10000},
+        )
+
+    def test_info_update_delete(self):
+        """Info, update and delete use the entity path"""
+        self.response.json.return_value = {u'id': 1}
+        with rest.enabled():
+            Org.info({u'id': 1})
+            self.assertEqual(
+                Org.update({u'id': 1, u'new-name': u'org'}),
+                [{u'message': u'Organization updated'}],
+            )
+            self.assertEqual(
+                Org.delete({u'id': 1}), [u'Organization deleted', u''])
+        self.assertEqual(
+            [call[0] for call in self.session.request.call_args_list],
+            [
+                ('GET', 'https://example.com/katello/api/v2/organizations/1'),
+                ('PUT', 'https://example.com/katello/api/v2/organizations/1'),
+                ('DELETE',
+                 'https://example.com/katello/api/v2/organizations/1'),
+            ]
+        )
+
+    def test_error(self):
+        """API errors are raised as CLIReturnCodeError"""
+        self.response.status_code = 422
+        self.response.text = u'Name has already been taken'
+        with rest.enabled():
+            with self.assertRaises(CLIReturnCodeError) as context:
+                Org.create({u'name': u'org'})
+        self.assertEqual(context.exception.return_code, 65)
+        self.assertEqual(
+            context.exception.stderr, u'Name has already been taken')
+
+    def test_fallback(self):
+        """Commands the backend does not handle run hammer"""
+        self.command.return_value.return_code = 0
+        self.command.return_value.stderr = u''
+        self.command.return_value.stdout = []
+        with rest.enabled():
+            Org.info({u'name': u'org'})
+        self.assertEqual(self.session.request.call_count, 0)
+        self.assertEqual(self.command.call_count, 1)
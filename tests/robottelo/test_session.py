@@ -0,0 +1,159 @@
+"""Tests for module ``robottelo.cli.session``."""
+import six
+
+from robottelo.cli import session
+from robottelo.cli.base import CLIReturnCodeError
+from robottelo.cli.org import Org
+from robottelo.ssh import SSHCommandResult
+from unittest2 import TestCase
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+class SessionTestCase(TestCase):
+    """Tests for the login functions."""
+
+    def setUp(self):  # noqa
+        patcher = mock.patch('robottelo.cli.session.settings')
+        settings = patcher.start()
+        settings.server.hostname = 'sat.example.com'
+        settings.locale = 'en_US.UTF-8'
+        self.addCleanup(patcher.stop)
+        self.addCleanup(session.invalidate)
+        self.scripts = []
+        self.login_return_code = 0
+
+    def run_remote(self, script):
+        """Record the login script."""
+        self.scripts.append(script)
+        return SSHCommandResult(
+            [], u'Invalid credentials', self.login_return_code)
+
+    def test_home(self):
+        """Each user has its own home directory"""
+        self.assertNotEqual(session.home(u'admin'), session.home(u'other'))
+        self.assertTrue(session.home(u'admin').startswith(
+            session.SESSIONS_DIR + u'/'))
+        self.assertEqual(
+            session.environment(u'admin'),
+            u'HOME={0}'.format(session.home(u'admin')),
+        )
+
+    def test_login_once(self):
+        """A user logs in once, and again if the password changes"""
+        session.login(u'admin', u'changeme', self.run_remote)
+        session.login(u'admin', u'changeme', self.run_remote)
+        self.assertEqual(len(self.scripts), 1)
+        self.assertIn(
+            u'HOME={0} LANG=en_US.UTF-8 hammer auth login basic '
+            u'-u admin -p changeme'.format(session.home(u'admin')),
+            self.scripts[0],
+        )
+        self.assertIn(u':use_sessions: true', self.scripts[0])
+        session.login(u'other', u'changeme', self.run_remote)
+        session.login(u'admin', u'new password', self.run_remote)
+        self.assertEqual(len(self.scripts), 3)
+        self.assertIn(u"-p 'new password'", self.scripts[2])
+
+    def test_login_error(self):
+        """A failed login raises an exception and is not remembered"""
+        self.login_return_code = 129
+        for _ in range(2):
+            with self.assertRaises(session.HammerSessionError) as context:
+                session.login(u'admin', u'wrong', self.run_remote)
+            self.assertEqual(context.exception.return_code, 129)
+        self.assertEqual(len(self.scripts), 2)
+
+    def test_invalidate(self):
+        """Invalidated users log in again"""
+        session.login(u'admin', u'changeme', self.run_remote)
+        session.login(u'other', u'changeme', self.run_remote)
+        session.invalidate(u'admin')
+        session.login(u'admin', u'changeme', self.run_remote)
+        session.login(u'other', u'changeme', self.run_remote)
+        self.assertEqual(len(self.scripts), 3)
+
+    def test_run_expired(self):
+        """The command runs again after a new login if the session
+        expired
+        """
+        responses = [
+            SSHCommandResult([], u'Session has expired', 129),
+            SSHCommandResult([u'ok'], u'', 0),
+        ]
+        execute = mock.Mock(side_effect=responses)
+        response = session.run(
+            u'admin', u'changeme', execute, self.run_remote)
+        self.assertEqual(response.stdout, [u'ok'])
+        self.assertEqual(execute.call_count, 2)
+        self.assertEqual(len(self.scripts), 2)
+
+    def test_run_error(self):
+        """Other errors are returned"""
+        execute = mock.Mock(
+            return_value=SSHCommandResult([], u'Error: not found', 65))
+        response = session.run(
+            u'admin', u'changeme', execute, self.run_remote)
+        self.assertEqual(response.return_code, 65)
+        self.assertEqual(execute.call_count, 1)
+
+
+class BaseSessionTestCase(TestCase):
+    """Tests for the hammer commands run with sessions."""
+
+    def setUp(self):  # noqa
+        patcher = mock.patch('robottelo.cli.base.settings')
+        settings = patcher.start()
+        settings.server.ssh_backend = 'paramiko'
+        settings.performance.time_hammer = False
+        settings.locale = 'en_US.UTF-8'
+        settings.server.admin_username = u'admin'
+        settings.server.admin_password = u'changeme'
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch('robottelo.cli.session.settings', settings)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch('robottelo.cli.base.ssh.command')
+        self.command = patcher.start()
+        self.command.return_value = SSHCommandResult(
+            [u'Id: 1', u''], u'', 0)
+        self.addCleanup(patcher.stop)
+        session.enable()
+        self.addCleanup(session.disable)
+
+    def commands(self):
+        """Return the commands run."""
+        return [
+            call[0][0].decode('utf-8')
+            for call in self.command.call_args_list
+        ]
+
+    def test_reuse_session(self):
+        """The credentials are only passed to the login"""
+        Org.info({u'id': 1})
+        Org.info({u'id': 2})
+        Org.with_user(u'other', u'secret').info({u'id': 3})
+        commands = self.commands()
+        self.assertEqual(len(commands), 5)
+        self.assertIn(u'hammer auth login', commands[0])
+        self.assertIn(u'hammer auth login', commands[3])
+        self.assertIn(u'-u other -p secret', commands[3])
+        for command, user in (
+                (commands[1], u'admin'),
+                (commands[2], u'admin'),
+                (commands[4], u'other')):
+            self.assertTrue(command.startswith(
+                u'{0} LANG='.format(session.environment(user))))
+            self.assertNotIn(u' -p ', command)
+
+    def test_login_error(self):
+        """A failed login raises ``CLIReturnCodeError``"""
+        self.command.return_value = SSHCommandResult(
+            [], u'Invalid username or password', 129)
+        with self.assertRaises(CLIReturnCodeError) as context:
+            Org.with_user(u'admin', u'wrong').info({u'id': 1})
+        self.assertEqual(context.exception.return_code, 129)
+        self.assertEqual(self.command.call_count, 1)
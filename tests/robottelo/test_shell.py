@@ -0,0 +1,235 @@
+"""Tests for module ``robottelo.cli.shell``."""
+import os
+import six
+import socket
+
+from robottelo.cli import shell
+from unittest2 import TestCase
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+class MockChannel(object):
+    """A mock ``paramiko.Channel`` returning the output added to it."""
+
+    def __init__(self):
+        self.closed = False
+        self.output = b''
+        self._read_fd, self._write_fd = os.pipe()
+        os.write(self._write_fd, b'x')
+
+    def fileno(self):
+        """Return an always readable file descriptor."""
+        return self._read_fd
+
+    def recv_ready(self):
+        """Tell whether there is output to read."""
+        return len(self.output) > 0
+
+    def recv(self, nbytes):
+        """Read output."""
+        data, self.output = self.output[:nbytes], self.output[nbytes:]
+        return data
+
+    def close(self):
+        """Close the pipe."""
+        if not self.closed:
+            os.close(self._read_fd)
+            os.close(self._write_fd)
+        self.closed = True
+
+
+class MockShellChannel(MockChannel):
+    """A mock ``paramiko.Channel`` running ``hammer shell``.
+
+    Each command line sent is answered by calling ``respond`` with it, which
+    returns the ``stdout`` output or a tuple of the ``stdout`` and ``stderr``
+    outputs. The sentinel gets the error hammer prints for an unknown
+    sub-command on :attr:`errors`, the channel reading ``stderr``. If
+    ``respond`` returns ``None`` the process stops.
+
+    """
+    def __init__(self, respond):
+        super(MockShellChannel, self).__init__()
+        self.respond = respond
+        self.errors = MockChannel()
+        self.command = None
+        self.exited = False
+
+    def get_pty(self, term, width):  # pylint:disable=unused-argument
+        """Do nothing, a terminal is not needed."""
+
+    def exec_command(self, cmd):
+        """Record the command and print the welcome message."""
+        self.command = cmd
+        self.output += (
+            b'Welcome to the hammer interactive shell\r\n\r\n' +
+            shell.PROMPT.encode('utf-8')
+        )
+
+    def sendall(self, data):
+        """Answer each command line found in ``data``."""
+        for line in data.decode('utf-8').splitlines():
+            if line.startswith(u'robottelo-end-'):
+                answer = (
+                    u'', u"Error: No such sub-command '{0}'.\n".format(line))
+            else:
+                answer = self.respond(line)
+            if answer is None:
+                self.exited = True
+                return
+            if not isinstance(answer, tuple):
+                answer = (answer, u'')
+            self.output += (answer[0] + shell.PROMPT).encode('utf-8')
+            self.errors.output += answer[1].encode('utf-8')
+
+    def exit_status_ready(self):
+        """Tell whether the process stopped."""
+        return self.exited
+
+    def close(self):
+        """Close the pipes."""
+        super(MockShellChannel, self).close()
+        self.errors.close()
+
+
+class HammerShellTestCase(TestCase):
+    """Tests for class ``robottelo.cli.shell.HammerShell``."""
+
+    def setUp(self):
+        """Make the sessions use mock channels answering ``self.respond``."""
+        self.channels = []
+
+        def open_channels(session, fifo):  # pylint:disable=unused-argument
+            """Create a new mock channel."""
+            channel = MockShellChannel(lambda line: self.respond(line))
+            self.channels.append(channel)
+            return channel, channel.errors
+        patcher = mock.patch.object(
+            shell.HammerShell, '_open_channels', open_channels)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch('robottelo.cli.shell.settings')
+        patcher.start().locale = 'en_US.UTF-8'
+        self.addCleanup(patcher.stop)
+        self.session = shell.HammerShell('example.com', 'admin', 'changeme')
+        self.addCleanup(self.session.close)
+
+    def respond(self, line):
+        """Answer with the command line, in a CSV output."""
+        return u'Command\r\n{0}\r\n'.format(line)
+
+    def test_start(self):
+        """The shell is started once and reused"""
+        self.session.run(u'organization list')
+        self.session.run(u'location list')
+        self.assertEqual(len(self.channels), 1)
+        self.assertIn(b'hammer -u admin -p changeme shell 2>/tmp/',
+                      self.channels[0].command)
+
+    def test_run(self):
+        """Only the output of the command is returned"""
+        output, errors = self.session.run(u'organization list')
+        self.assertEqual(output, u'Command\norganization list\n')
+        self.assertEqual(errors, u'')
+
+    def test_stderr(self):
+        """The stderr output is returned apart, without the sentinel"""
+        self.respond = lambda line: (
+            u'',
+            u'Could not create the organization:\n'
+            u'  Name has already been taken\n'
+        )
+        output, errors = self.session.run(u'organization create')
+        self.assertEqual(output, u'')
+        self.assertEqual(
+            errors,
+            u'Could not create the organization:\n'
+            u'  Name has already been taken\n'
+        )
+
+    def test_echo(self):
+        """The command line is removed from the output if echoed"""
+        self.respond = lambda line: u'{0}\r\nok\r\n'.format(line)
+        output, _ = self.session.run(u'organization list')
+        self.assertEqual(output, u'ok\n')
+
+    def test_restart(self):
+        """A shell which stopped is restarted on the next command"""
+        self.session.run(u'organization list')
+        self.channels[0].exited = True
+        output, _ = self.session.run(u'location list')
+        self.assertEqual(output, u'Command\nlocation list\n')
+        self.assertEqual(len(self.channels), 2)
+        self.assertTrue(self.channels[0].closed)
+
+    def test_crash(self):
+        """A crash while running a command is reported"""
+        self.respond = lambda line: None
+        with self.assertRaises(shell.HammerShellError):
+            self.session.run(u'organization list')
+        self.assertTrue(self.channels[0].closed)
+        del self.respond
+        self.session.run(u'organization list')
+        self.assertEqual(len(self.channels), 2)
+
+    def test_timeout(self):
+        """The shell is stopped if a command takes too long"""
+        self.respond = lambda line: u''
+        self.session.run(u'organization list')
+        with mock.patch.object(self.channels[0], 'sendall'):
+            with self.assertRaises(socket.timeout):
+                self.session.run(u'organization list', timeout=0.1)
+        self.assertTrue(self.channels[0].closed)
+
+
+class CommandTestCase(TestCase):
+    """Tests for function ``robottelo.cli.shell.command``."""
+
+    def setUp(self):
+        """Patch the sessions."""
+        patcher = mock.patch('robottelo.cli.shell.get_session')
+        self.session = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
+    def run_command(self, output, errors=u'', output_format='csv'):
+        """Run a command printing ``output`` and ``errors``."""
+        self.session.run.return_value = (output, errors)
+        return shell.command(u'organization list', 'admin', 'changeme',
+                             output_format=output_format)
+
+    def test_csv(self):
+        """CSV output is parsed"""
+        result = self.run_command(u'Id,Name\n1,org\n')
+        self.assertEqual(result.return_code, 0)
+        self.assertEqual(result.stdout, [{u'id': u'1', u'name': u'org'}])
+        self.session.run.assert_called_once_with(
+            u'--output=csv organization list', None)
+
+    def test_stderr(self):
+        """Commands printing on stderr fail, stdout is kept apart"""
+        result = self.run_command(u'Id,Name\n', u'Some warning\n')
+        self.assertEqual(result.return_code, shell.ERROR_RETURN_CODE)
+        self.assertEqual(result.stderr, u'Some warning\n')
+        self.assertEqual(result.stdout, [u'Id,Name', u''])
+
+    def test_error_message(self):
+        """Error messages printed on stdout fail the command"""
+        result = self.run_command(u'Error: failed\n')
+        self.assertEqual(result.return_code, shell.ERROR_RETURN_CODE)
+
+    def test_malformed_output(self):
+        """Outputs not matching the output format fail the command"""
+        result = self.run_command(
+            u'Id,Name\n1,org\nUnexpected, failure, text\n')
+        self.assertEqual(result.return_code, shell.ERROR_RETURN_CODE)
+        result = self.run_command(u'{"id": 1', output_format='json')
+        self.assertEqual(result.return_code, shell.ERROR_RETURN_CODE)
+        result = self.run_command(
+            u'Organization deleted\n', output_format=None)
+        self.assertEqual(result.return_code, 0)
+        result = self.run_command(u'')
+        self.assertEqual(result.return_code, 0)
@@ -1,7 +1,11 @@
+# -*- encoding: utf-8 -*-
 """Tests for module ``robottelo.ssh``."""
 # (too-many-public-methods) pylint: disable=R0904
 import os
 import six
+import subprocess
+import threading
+import time
 
 from robottelo import ssh
 from unittest2 import TestCase
@@ -12,6 +16,21 @@ else:
     from unittest import mock
 
 
+class MockTransport(object):
+    """A mock ``paramiko.Transport`` object."""
+    def __init__(self):
+        self.active = True
+        self.keepalive = None
+
+    def is_active(self):
+        """Return whether the transport is active."""
+        return self.active
+
+    def set_keepalive(self, interval):
+        """Record the keepalive interval."""
+        self.keepalive = interval
+
+
 class MockSSHClient(object):
     """A mock ``paramiko.SSHClient`` object."""
     def __init__(self):
@@ -30,6 +49,7 @@ class MockSSHClient(object):
         self.hostname = None
         self.username = None
         self.key_filename = None
+        self.transport = MockTransport()
 
     def set_missing_host_key_policy(self, policy):  # pylint:disable=W0613
         """A no-op stub method."""
@@ -58,6 +78,10 @@ class MockSSHClient(object):
         """A no-op stub method."""
         self.close_ += 1
 
+    def get_transport(self):
+        """Return the mock transport."""
+        return self.transport
+
 
 class SSHTestCase(TestCase):
     """Tests for module ``robottelo.ssh``."""
@@ -90,3 +114,386 @@ class SSHTestCase(TestCase):
         self.assertEqual(connection.set_missing_host_key_policy_, 1)
         self.assertEqual(connection.connect_, 1)
         self.assertEqual(connection.close_, 1)
+
+
+class SSHConnectionPoolTestCase(TestCase):
+    """Tests for class ``robottelo.ssh.SSHConnectionPool``."""
+
+    def setUp(self):
+        """Make the pool use ``MockSSHClient`` objects."""
+        patcher = mock.patch(
+            'robottelo.ssh._call_paramiko_sshclient', MockSSHClient)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.pool = ssh.SSHConnectionPool(
+            max_size=2, idle_timeout=60, keepalive_interval=15)
+
+    def test_reuse_connection(self):
+        """A released connection is handed out again and kept open."""
+        with self.pool.connection('example.com', 'nobody', 'key') as first:
+            pass
+        with self.pool.connection('example.com', 'nobody', 'key') as second:
+            pass
+        self.assertIs(first, second)
+        self.assertEqual(first.connect_, 1)
+        self.assertEqual(first.close_, 0)
+        self.assertEqual(first.transport.keepalive, 15)
+
+    def test_connection_per_key(self):
+        """Different credentials or hosts do not share connections."""
+        with self.pool.connection('example.com', 'nobody', 'key') as first:
+            pass
+        with self.pool.connection('example.org', 'nobody', 'key') as second:
+            pass
+        self.assertIsNot(first, second)
+        self.assertEqual(second.hostname, 'example.org')
+
+    def test_discard_inactive_connection(self):
+        """A connection whose transport died is closed and replaced."""
+        with self.pool.connection('example.com', 'nobody', 'key') as first:
+            pass
+        first.transport.active = False
+        with self.pool.connection('example.com', 'nobody', 'key') as second:
+            pass
+        self.assertIsNot(first, second)
+        self.assertEqual(first.close_, 1)
+
+    def test_discard_on_error(self):
+        """A connection which raised an error is not reused."""
+        clients = []
+        with self.assertRaises(ValueError):
+            with self.pool.connection('example.com', 'nobody', 'key') as cn:
+                clients.append(cn)
+                raise ValueError()
+        self.assertEqual(clients[0].close_, 1)
+        with self.pool.connection('example.com', 'nobody', 'key') as second:
+            self.assertIsNot(clients[0], second)
+
+    def test_idle_eviction(self):
+        """Connections idle for longer than ``idle_timeout`` are closed."""
+        with self.pool.connection('example.com', 'nobody', 'key') as first:
+            pass
+        with mock.patch('robottelo.ssh.time.time', return_value=(
+                time.time() + 120)):
+            with self.pool.connection(
+                    'example.com', 'nobody', 'key') as second:
+                pass
+        self.assertIsNot(first, second)
+        self.assertEqual(first.close_, 1)
+
+    def test_max_size(self):
+        """Callers wait for a connection when ``max_size`` is reached."""
+        first = self.pool.acquire('example.com', 'nobody', 'key')
+        second = self.pool.acquire('example.com', 'nobody', 'key')
+        acquired = []
+        waiter = threading.Thread(target=lambda: acquired.append(
+            self.pool.acquire('example.com', 'nobody', 'key')))
+        waiter.start()
+        waiter.join(0.2)
+        self.assertEqual(acquired, [])
+        self.pool.release(second, 'example.com', 'nobody', 'key')
+        waiter.join(5)
+        self.assertEqual(acquired, [second])
+        self.assertIsNot(first, second)
+
+    def test_acquire_timeout(self):
+        """Waiting for a connection fails once the timeout expires."""
+        self.pool.acquire('example.com', 'nobody', 'key')
+        second = self.pool.acquire('example.com', 'nobody', 'key')
+        with self.assertRaises(ssh.socket.timeout):
+            self.pool.acquire('example.com', 'nobody', 'key', timeout=0.1)
+        self.pool.release(second, 'example.com', 'nobody', 'key')
+        self.assertIs(
+            self.pool.acquire('example.com', 'nobody', 'key', timeout=0.1),
+            second
+        )
+
+    def test_idle_eviction_in_background(self):
+        """Idle connections are closed without waiting for another call."""
+        self.pool.idle_timeout = 0.1
+        with self.pool.connection('example.com', 'nobody', 'key') as first:
+            pass
+        deadline = time.time() + 5
+        while first.close_ == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(first.close_, 1)
+        self.assertEqual(
+            self.pool._idle, {('example.com', 'nobody', 'key'): []})
+
+    def test_close_all(self):
+        """``close_all`` closes the idle connections."""
+        with self.pool.connection('example.com', 'nobody', 'key') as first:
+            pass
+        self.pool.close_all()
+        self.assertEqual(first.close_, 1)
+
+
+class MockChannel(object):
+    """A mock ``paramiko.Channel`` with all its output already available.
+
+    A pipe with pending data provides the file descriptor used by
+    ``select``, so the channel is always readable.
+
+    """
+    def __init__(self, transport, stdout, stderr, return_code):
+        self.transport = transport
+        self.stdout = stdout
+        self.stderr = stderr
+        self.return_code = return_code
+        self.command = None
+        self.eof_received = False
+        self._read_fd, self._write_fd = os.pipe()
+        os.write(self._write_fd, b'x')
+
+    def exec_command(self, cmd):
+        """Record the command and make its output available."""
+        self.command = cmd
+        self.eof_received = True
+
+    def fileno(self):
+        """Return an always readable file descriptor."""
+        return self._read_fd
+
+    def recv_ready(self):
+        """Tell whether there is ``stdout`` data to read."""
+        return len(self.stdout) > 0
+
+    def recv(self, nbytes):
+        """Read ``stdout`` data."""
+        data, self.stdout = self.stdout[:nbytes], self.stdout[nbytes:]
+        return data
+
+    def recv_stderr_ready(self):
+        """Tell whether there is ``stderr`` data to read."""
+        return len(self.stderr) > 0
+
+    def recv_stderr(self, nbytes):
+        """Read ``stderr`` data."""
+        data, self.stderr = self.stderr[:nbytes], self.stderr[nbytes:]
+        return data
+
+    def recv_exit_status(self):
+        """Return the command exit status."""
+        return self.return_code
+
+    def close(self):
+        """Close the pipe and tell the transport the channel is closed."""
+        os.close(self._read_fd)
+        os.close(self._write_fd)
+        self.transport.open_channels -= 1
+
+
+class MockChannelTransport(object):
+    """A mock ``paramiko.Transport`` creating :class:`MockChannel` objects.
+
+    The output of each command is ``<command> output`` and the exit status
+    is its position in the list of opened channels.
+
+    """
+    def __init__(self):
+        self.open_channels = 0
+        self.max_open_channels = 0
+        self.channels = []
+
+    def open_session(self):
+        """Open a new mock channel."""
+        self.open_channels += 1
+        self.max_open_channels = max(
+            self.max_open_channels, self.open_channels)
+        channel = MockChannel(self, b'', b'', len(self.channels))
+        self.channels.append(channel)
+        return channel
+
+
+class CommandManyTestCase(TestCase):
+    """Tests for function ``robottelo.ssh.command_many``."""
+
+    def setUp(self):
+        """Patch the connection pool to use a mock transport."""
+        self.transport = MockChannelTransport()
+        original_open_session = self.transport.open_session
+
+        def open_session():
+            """Fill the output of the channel once it is created."""
+            channel = original_open_session()
+            channel.stdout = u'{0} out\n[rails] noise'.format(
+                len(self.transport.channels)).encode('utf-8')
+            channel.stderr = b'\x1b[31merror\x1b[0m'
+            return channel
+        self.transport.open_session = open_session
+
+        client = mock.Mock()
+        client.get_transport.return_value = self.transport
+        connection = mock.MagicMock()
+        connection.__enter__.return_value = client
+        patcher = mock.patch(
+            'robottelo.ssh._get_pooled_connection', return_value=connection)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_results_in_order(self):
+        """Every command gets its own cleaned up result, in order."""
+        results = ssh.command_many(
+            ['cmd{0}'.format(i) for i in range(5)], hostname='example.com')
+        self.assertEqual(
+            [channel.command for channel in self.transport.channels],
+            ['cmd{0}'.format(i) for i in range(5)]
+        )
+        self.assertEqual(
+            [result.stdout for result in results],
+            [[u'{0} out'.format(i)] for i in range(1, 6)]
+        )
+        self.assertEqual(
+            [result.return_code for result in results], list(range(5)))
+        self.assertEqual(results[0].stderr, u'error')
+
+    def test_max_parallel(self):
+        """No more than ``max_parallel`` channels are open at a time."""
+        ssh.command_many(
+            ['cmd'] * 7, hostname='example.com', max_parallel=3)
+        self.assertEqual(len(self.transport.channels), 7)
+        self.assertEqual(self.transport.max_open_channels, 3)
+        self.assertEqual(self.transport.open_channels, 0)
+
+
+class CommandBatchTestCase(TestCase):
+    """Tests for function ``robottelo.ssh.command_batch``."""
+
+    def setUp(self):
+        """Run the batch scripts locally instead of on a mock transport."""
+        self.scripts = []
+        patcher = mock.patch('robottelo.ssh._get_pooled_connection')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch(
+            'robottelo.ssh._run_on_transport', self.run_on_transport)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_on_transport(self, transport, cmds, max_parallel, timeout):
+        """Run the script with the local shell."""
+        [script] = cmds
+        self.scripts.append(script)
+        process = subprocess.Popen(
+            ['sh', '-c', script],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        stdout, stderr = process.communicate()
+        return [(stdout, stderr, process.returncode)]
+
+    def test_results(self):
+        """Every command gets its own output and return code."""
+        results = ssh.command_batch(
+            [
+                u'echo out; echo err >&2',
+                u'printf "a\\nb"; exit 3',
+                u"echo 'single' \"double\" \\$HOME",
+                u'cd / && pwd',
+                u'pwd; exit 0',
+                u'true',
+            ],
+            hostname='example.com',
+        )
+        self.assertEqual(len(self.scripts), 1)
+        self.assertEqual(
+            [(result.stdout, result.stderr, result.return_code)
+             for result in results],
+            [
+                ([u'out', u''], u'err\n', 0),
+                ([u'a', u'b'], b'', 3),
+                ([u'single double $HOME', u''], b'', 0),
+                ([u'/', u''], b'', 0),
+                ([os.getcwd(), u''], b'', 0),
+                (b'', b'', 0),
+            ]
+        )
+
+    def test_output_format(self):
+        """The output of every command is parsed."""
+        results = ssh.command_batch(
+            [u'printf "Id,Name\\n1,a\\n"'] * 2,
+            hostname='example.com',
+            output_format='csv',
+        )
+        self.assertEqual(
+            [result.stdout for result in results],
+            [[{u'id': u'1', u'name': u'a'}]] * 2,
+        )
+
+    def test_stop_on_error(self):
+        """The commands following a failure are not run."""
+        results = ssh.command_batch(
+            [u'true', u'false', u'echo not run'],
+            hostname='example.com',
+            stop_on_error=True,
+        )
+        self.assertEqual(
+            [result.return_code for result in results], [0, 1])
+
+    def test_script_error(self):
+        """A failure of the script itself raises an exception."""
+        with mock.patch('robottelo.ssh.BATCH_SCRIPT', u'exit 2'):
+            with self.assertRaises(ssh.SSHBatchError):
+                ssh.command_batch([u'true'], hostname='example.com')
+
+
+class CommandStreamTestCase(TestCase):
+    """Tests for function ``robottelo.ssh.command_stream``."""
+
+    def setUp(self):
+        """Patch the connection pool to use a mock transport."""
+        self.transport = MockChannelTransport()
+        original_open_session = self.transport.open_session
+
+        def open_session():
+            """Fill the output of the channel once it is created."""
+            channel = original_open_session()
+            channel.stdout = u'\x1b[32mfirst\x1b[0m\r\nsécond\nlast'.encode(
+                'utf-8')
+            channel.stderr = b'\x1b[31merror\x1b[0m'
+            channel.return_code = 2
+            return channel
+        self.transport.open_session = open_session
+
+        client = mock.Mock()
+        client.get_transport.return_value = self.transport
+        connection = mock.MagicMock()
+        connection.__enter__.return_value = client
+        patcher = mock.patch(
+            'robottelo.ssh._get_pooled_connection', return_value=connection)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_lines(self):
+        """Lines are decoded and cleaned up, even if split across chunks."""
+        stream = ssh.command_stream('cmd', 'example.com', chunk_size=3)
+        self.assertEqual(list(stream), [u'first', u'sécond', u'last'])
+        self.assertEqual(stream.return_code, 2)
+        self.assertEqual(stream.stderr, u'error')
+        self.assertEqual(self.transport.open_channels, 0)
+
+    def test_early_termination(self):
+        """Closing the stream early closes the channel."""
+        lines = []
+        with ssh.command_stream('cmd', 'example.com', chunk_size=3) as stream:
+            for line in stream:
+                lines.append(line)
+                break
+        self.assertEqual(lines, [u'first'])
+        self.assertIsNone(stream.return_code)
+        self.assertEqual(self.transport.open_channels, 0)
+
+    def test_callback(self):
+        """Returning ``False`` from the callback stops reading."""
+        lines = []
+
+        def callback(line):
+            """Collect lines until the second one."""
+            lines.append(line)
+            return len(lines) < 2
+        result = ssh.command_stream('cmd', 'example.com').for_each_line(
+            callback)
+        self.assertEqual(lines, [u'first', u'sécond'])
+        self.assertIsNone(result.stdout)
+        self.assertIsNone(result.return_code)
@@ -0,0 +1,101 @@
+"""Tests for module ``robottelo.ssh_async``."""
+import six
+import socket
+import sys
+
+from tests.robottelo import test_ssh
+from unittest2 import TestCase, skipIf
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+# robottelo.ssh_async uses async/await, a syntax error before Python 3.5
+HAS_ASYNC = sys.version_info >= (3, 5)
+if HAS_ASYNC:
+    from robottelo import ssh_async
+    import asyncio
+
+
+@skipIf(not HAS_ASYNC, 'robottelo.ssh_async requires Python 3.5+')
+class AsyncCommandTestCase(TestCase):
+    """Tests for the coroutines and adapters of ``robottelo.ssh_async``."""
+
+    def setUp(self):
+        """Make the connection pool hand out a mock client."""
+        self.transport = test_ssh.MockChannelTransport()
+        original_open_session = self.transport.open_session
+
+        def open_session():
+            """Fill the output of the channel once it is created."""
+            channel = original_open_session()
+            channel.stdout = b'out\n[rails] noise'
+            channel.stderr = b'\x1b[31merror\x1b[0m'
+            channel.return_code = 3
+            return channel
+        self.transport.open_session = open_session
+
+        self.client = mock.Mock()
+        self.client.get_transport.return_value = self.transport
+        self.pool = mock.Mock(max_size=2)
+        self.pool.acquire.return_value = self.client
+        patcher = mock.patch(
+            'robottelo.ssh.get_connection_pool', return_value=self.pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.addCleanup(asyncio.set_event_loop, None)
+        self.addCleanup(self.loop.close)
+
+    def test_async_command(self):
+        """``async_command`` returns the same result as ``ssh.command``."""
+        result = self.loop.run_until_complete(
+            ssh_async.async_command('ls', hostname='example.com'))
+        self.assertEqual(result.stdout, [u'out'])
+        self.assertEqual(result.stderr, u'error')
+        self.assertEqual(result.return_code, 3)
+        self.assertEqual(self.transport.channels[0].command, 'ls')
+        self.pool.release.assert_called_once_with(
+            self.client, 'example.com', mock.ANY, mock.ANY, discard=False)
+
+    def test_concurrent_commands(self):
+        """Many commands can run concurrently on the same event loop."""
+        results = self.loop.run_until_complete(asyncio.gather(*[
+            ssh_async.async_command(
+                'cmd{0}'.format(i), hostname='example.com')
+            for i in range(10)
+        ]))
+        self.assertEqual(len(results), 10)
+        self.assertEqual(self.pool.acquire.call_count, 10)
+        self.assertEqual(self.pool.release.call_count, 10)
+        self.assertEqual(self.transport.open_channels, 0)
+
+    def test_timeout(self):
+        """A command without output for ``timeout`` seconds is aborted and
+        its connection discarded.
+
+        """
+        def open_session():
+            """Return a channel which never produces output."""
+            channel = mock.Mock(eof_received=False)
+            channel.recv_ready.return_value = False
+            channel.recv_stderr_ready.return_value = False
+            channel.fileno.return_value = read_fd
+            return channel
+        read_fd, write_fd = test_ssh.os.pipe()
+        self.addCleanup(test_ssh.os.close, read_fd)
+        self.addCleanup(test_ssh.os.close, write_fd)
+        self.transport.open_session = open_session
+        with self.assertRaises(socket.timeout):
+            self.loop.run_until_complete(ssh_async.async_command(
+                'sleep 10', hostname='example.com', timeout=0.1))
+        self.pool.release.assert_called_once_with(
+            self.client, 'example.com', mock.ANY, mock.ANY, discard=True)
+
+    def test_sync_command(self):
+        """The synchronous adapter runs the command on a background loop."""
+        result = ssh_async.command('ls', hostname='example.com')
+        self.assertEqual(result.stdout, [u'out'])
+        self.assertEqual(result.return_code, 3)
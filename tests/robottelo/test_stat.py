@@ -0,0 +1,83 @@
+"""Tests for module ``robottelo.performance.stat``."""
+import csv
+import os
+import tempfile
+
+from robottelo.histogram import Histogram
+from robottelo.performance import stat
+from unittest2 import TestCase
+
+
+class ThreadStatTestCase(TestCase):
+    """Tests for :class:`robottelo.performance.stat.ThreadStat`."""
+
+    def test_buckets(self):
+        """Timings are counted by bucket of iterations"""
+        thread_stat = stat.ThreadStat(bucket_size=2)
+        for iteration in range(5):
+            thread_stat.add(iteration, iteration + 1.0)
+        thread_stat.add(5, None)
+        self.assertEqual(thread_stat.iterations, 6)
+        self.assertEqual(thread_stat.histogram.count, 5)
+        buckets = thread_stat.complete_buckets()
+        self.assertEqual(
+            [(bucket.min, bucket.max) for bucket in buckets],
+            [(1.0, 2.0), (3.0, 4.0), (5.0, 5.0)])
+
+    def test_incomplete_bucket(self):
+        """The last bucket is left out if its iterations did not all run"""
+        thread_stat = stat.ThreadStat(bucket_size=2)
+        for iteration in range(3):
+            thread_stat.add(iteration, 1.0)
+        self.assertEqual(len(thread_stat.complete_buckets()), 1)
+        self.assertEqual(stat.ThreadStat().complete_buckets(), [])
+
+    def test_merge(self):
+        """Merged statistics count the timings of all threads by bucket"""
+        thread_stats = [stat.ThreadStat(bucket_size=2) for _ in range(3)]
+        for thread, thread_stat in enumerate(thread_stats):
+            for iteration in range(4):
+                thread_stat.add(iteration, thread * 10.0 + iteration + 1)
+        merged = stat.merge_thread_stats(thread_stats)
+        self.assertEqual(merged.histogram.count, 12)
+        self.assertEqual(
+            [(bucket.count, bucket.min, bucket.max)
+             for bucket in merged.complete_buckets()],
+            [(6, 1.0, 22.0), (6, 3.0, 24.0)])
+        self.assertEqual(thread_stats[0].histogram.count, 4)
+        with self.assertRaises(ValueError):
+            merged.merge(stat.ThreadStat(bucket_size=3))
+
+
+class GenerateStatTestCase(TestCase):
+    """Tests for
+    :func:`robottelo.performance.stat.generate_stat_from_histograms`.
+    """
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp()
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+
+    def test_generate_stat(self):
+        """A row is written for each bucket"""
+        histogram = Histogram()
+        for value in (1.0, 2.0, 3.0, 4.0):
+            histogram.add(value)
+        stat_dict = stat.generate_stat_from_histograms(
+            'client-0', [('1-4', histogram), ('5-8', Histogram())], self.path)
+        self.assertEqual(list(stat_dict), [0])
+        minimum, median, maximum, std = stat_dict[0]
+        self.assertEqual((minimum, maximum), (1.0, 4.0))
+        self.assertAlmostEqual(median, 2.0, delta=0.02)
+        self.assertAlmostEqual(std, 1.118, places=3)
+        with open(self.path) as handler:
+            rows = list(csv.reader(handler))
+        self.assertEqual(rows[1], ['client-0'])
+        self.assertEqual(
+            rows[2],
+            ['bucket', 'min', 'median', 'mean', 'max', 'std',
+             '90%', '95%', '99%'])
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[3][0], '1-4')
+        self.assertEqual(float(rows[3][3]), 2.5)